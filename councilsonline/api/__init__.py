@@ -41,6 +41,8 @@ from councilsonline.api.requests import (
 	update_spisc_application,
 	create_draft_request,
 	update_draft_request,
+	autosave_draft_patch,
+	flush_draft_autosave,
 	load_draft_request,
 	submit_request,
 	assign_request,
@@ -135,6 +137,7 @@ from councilsonline.api.social_services import (
 	override_eligibility,
 	get_eligibility_result,
 	run_fraud_check,
+	run_fraud_sweep,
 	check_duplicate_application,
 	check_beneficiary_status,
 	detect_identity_fraud
@@ -152,7 +155,7 @@ __all__ = [
 	'search_australia_addresses', 'search_philippines_addresses',
 	# Requests
 	'create_rc_application', 'create_spisc_application', 'update_spisc_application',
-	'create_draft_request', 'update_draft_request', 'load_draft_request',
+	'create_draft_request', 'update_draft_request', 'autosave_draft_patch', 'flush_draft_autosave', 'load_draft_request',
 	'submit_request', 'assign_request', 'get_request_form_meta',
 	'get_request_type_config', 'send_request_message', 'get_request_communications',
 	'get_user_requests', 'get_request_summary_data', 'send_request_notification',
@@ -184,5 +187,5 @@ __all__ = [
 	'notify_kyc_submission', 'create_household_record', 'update_household_member',
 	'verify_household_by_barangay', 'get_household_record', 'calculate_eligibility',
 	'override_eligibility', 'get_eligibility_result', 'run_fraud_check',
-	'check_duplicate_application', 'check_beneficiary_status', 'detect_identity_fraud'
+	'run_fraud_sweep', 'check_duplicate_application', 'check_beneficiary_status', 'detect_identity_fraud'
 ]
@@ -9,6 +9,7 @@ import frappe
 from frappe import _
 from frappe.utils import cint
 import json
+from councilsonline.utils.form_schema import get_compiled_schema
 
 
 def get_request_type_steps(request_type, council_code=None):
@@ -23,125 +24,21 @@ def get_request_type_steps(request_type, council_code=None):
 		dict: Steps configuration with sections and fields
 	"""
 	try:
-		# Get request type document
-		rt_doc = frappe.get_doc("Request Type", request_type)
+		# Served from the compiled form schema (see councilsonline.utils.form_schema)
+		schema = get_compiled_schema(request_type, council_code)
 
 		# If no step_configs, return empty (fallback to hardcoded flow)
-		if not rt_doc.step_configs:
+		if not schema["uses_config"]:
 			return {
 				"steps": [],
 				"uses_config": False,
 				"message": "No step configuration found. Using default hardcoded flow."
 			}
 
-		steps = []
-
-		# Load base step configuration
-		for step_config in rt_doc.step_configs:
-			if not step_config.is_enabled:
-				continue
-
-			step_data = {
-				"step_number": step_config.step_number,
-				"step_code": step_config.step_code,
-				"step_title": step_config.step_title,
-				"step_component": step_config.step_component or "DynamicStepRenderer",
-				"is_enabled": step_config.is_enabled,
-				"is_required": step_config.is_required,
-				"show_on_review": step_config.show_on_review,
-				"depends_on": step_config.depends_on,
-				"sections": []
-			}
-
-			# FLATTENED STRUCTURE: Query sections by parent_step_code instead of nested parent
-			# Sections are now stored directly under Request Type with a parent_step_code link
-			sections = frappe.get_all(
-				"Request Type Step Section",
-				filters={
-					"parent": rt_doc.name,  # Parent is now Request Type, not Step Config
-					"parenttype": "Request Type",
-					"parent_step_code": step_config.step_code  # Link via step_code
-				},
-				fields=["name", "section_code", "section_title", "section_type", "sequence",
-				        "is_enabled", "is_required", "show_on_review", "depends_on"],
-				order_by="sequence asc"
-			)
-
-			for section in sections:
-				if not section.is_enabled:
-					continue
-
-				section_data = {
-					"section_code": section.section_code,
-					"section_title": section.section_title,
-					"section_type": section.section_type,
-					"sequence": section.sequence,
-					"is_enabled": section.is_enabled,
-					"is_required": section.is_required,
-					"show_on_review": section.show_on_review,
-					"depends_on": section.depends_on,
-					"fields": []
-				}
-
-				# FLATTENED STRUCTURE: Query fields by parent_section_code instead of nested parent
-				# Fields are now stored directly under Request Type with a parent_section_code link
-				fields = frappe.get_all(
-					"Request Type Step Field",
-					filters={
-						"parent": rt_doc.name,  # Parent is now Request Type, not Section
-						"parenttype": "Request Type",
-						"parent_section_code": section.section_code  # Link via section_code
-					},
-					fields=["field_name", "field_label", "field_type", "is_required", "options",
-					        "default_value", "depends_on", "validation", "show_on_review", "review_label"]
-				)
-
-				for field in fields:
-					field_data = {
-						"field_name": field.field_name,
-						"field_label": field.field_label,
-						"field_type": field.field_type,
-						"is_required": field.is_required,
-						"options": field.options,
-						"default_value": field.default_value,
-						"depends_on": field.depends_on,
-						"validation": field.validation,
-						"show_on_review": field.show_on_review,
-						"review_label": field.review_label or field.field_label
-					}
-					section_data["fields"].append(field_data)
-
-				step_data["sections"].append(section_data)
-
-			steps.append(step_data)
-
-		# NOTE: Payment and bank details steps are now defined in Request Type configuration
-		# (not injected here). To add payment collection or bank details steps:
-		# 1. Add step_config, step_sections, and step_fields to Request Type JSON
-		# 2. Use depends_on conditions if steps should be conditional
-		# 3. Set collects_payment or make_payment flags for accounting/reporting purposes
-		#
-		# This approach allows:
-		# - Customizable payment workflows per council
-		# - Configuration-driven forms (no code changes)
-		# - Flexible field requirements and validation
-		#
-		# Example: SPISC could add a bank_details step to its configuration
-		# Example: RC could add a payment_collection step for lodgement fees
-
-		# REMOVED: Hardcoded payment step injection (Phase 2.4)
-		# Previous code injected payment_collection and bank_details steps based on flags
-		# Now these should be added to Request Type configuration instead
-
-		# Apply council-specific overrides if provided
-		if council_code:
-			steps = apply_council_step_overrides(steps, request_type, council_code)
-
-		# Sort by step_number
-		steps = sorted(steps, key=lambda x: x.get("step_number", 999))
-
+		# NOTE: Payment and bank details steps are defined in Request Type configuration
+		# (not injected here). Council-specific overrides are applied at compile time.
 		return {
-			"steps": steps,
+			"steps": schema["steps"],
 			"uses_config": True,
 			"request_type": request_type,
 			"council_code": council_code
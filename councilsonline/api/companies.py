@@ -17,6 +17,7 @@ from frappe import _
 from frappe.utils import cint
 import secrets
 from datetime import datetime
+from councilsonline.utils.link_enrichment import get_linked_values
 
 
 @frappe.whitelist()
@@ -485,12 +486,18 @@ def get_company_users(company_name):
 
 	users = []
 
+	# Resolve all member names in one query
+	user_info = get_linked_values(
+		"User",
+		[row.user for row in company.admin_users + company.linked_users],
+		["full_name"]
+	)
+
 	# Add admin users
 	for admin in company.admin_users:
-		user_doc = frappe.get_doc("User", admin.user)
 		users.append({
 			"email": admin.user,
-			"full_name": user_doc.full_name,
+			"full_name": user_info.get(admin.user, {}).get("full_name"),
 			"role": "Admin",
 			"designation": admin.designation,
 			"added_date": admin.added_date,
@@ -501,10 +508,9 @@ def get_company_users(company_name):
 
 	# Add linked users
 	for linked_user in company.linked_users:
-		user_doc = frappe.get_doc("User", linked_user.user)
 		users.append({
 			"email": linked_user.user,
-			"full_name": user_doc.full_name,
+			"full_name": user_info.get(linked_user.user, {}).get("full_name"),
 			"role": linked_user.role,
 			"designation": None,
 			"added_date": linked_user.added_date,
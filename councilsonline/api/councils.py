@@ -8,6 +8,7 @@ Council Configuration & Management API - Handles council settings, statistics, a
 import frappe
 from frappe import _
 from frappe.utils import cint, getdate
+from councilsonline.utils.link_enrichment import enrich_links
 
 
 @frappe.whitelist()
@@ -254,11 +255,8 @@ def get_council_requests(council_code):
         order_by="modified desc"
     )
 
-    # Enrich with council name
-    for req in requests:
-        if req.get("council"):
-            council_name = frappe.db.get_value("Council", req["council"], "council_name")
-            req["council_name"] = council_name
+    # Enrich with council name (single query for all councils)
+    enrich_links(requests, "council", "Council", {"council_name": "council_name"})
 
     return requests
 
@@ -8,9 +8,12 @@ Council Meeting Management API - Handles meeting booking, scheduling, rescheduli
 import frappe
 from frappe import _
 from frappe.utils import cint, flt, getdate, add_days, get_datetime, now_datetime, today
-from datetime import datetime, timedelta, time as datetime_time
+from datetime import datetime, timedelta
 import json
 
+from councilsonline.councilsonline.doctype.request.request import decode_cursor, encode_cursor
+from councilsonline.utils.availability import find_available_slots, get_business_hours, merge_busy_intervals
+
 
 @frappe.whitelist()
 def book_council_meeting(request_id=None, request_type_code=None, meeting_type="Pre-Application Meeting",
@@ -596,69 +599,125 @@ def complete_meeting(meeting_id, meeting_notes=None, outcome_summary=None,
         frappe.throw(_("Failed to complete meeting: {0}").format(str(e)))
 
 
+# Unscheduled meetings sort by when they were requested
+MEETING_SORT_KEY = "COALESCE(m.scheduled_start, m.requested_date, m.creation)"
+
+
 @frappe.whitelist()
-def get_user_meetings(status=None, from_date=None, to_date=None):
+def get_user_meetings(status=None, from_date=None, to_date=None, cursor=None, page_size=20):
     """
-    Get meetings for the current user (either as applicant or council planner)
+    Get meetings for the current user (as requester, council planner or Request owner)
+
+    Meetings are selected, permission-checked and joined to their Request in a
+    single query. Pass ``cursor`` (an empty string for the first page) to page
+    through results with keyset pagination.
 
     Args:
         status: Filter by status (optional)
         from_date: Filter meetings from this date (optional)
         to_date: Filter meetings until this date (optional)
+        cursor: Opaque cursor from a previous response's ``next_cursor`` (optional)
+        page_size: Items per page in cursor mode (default: 20, max: 100)
 
     Returns:
-        list: User's meetings
+        list: User's meetings, latest first
+        In cursor mode: {"data", "page_size", "next_cursor", "has_more"}
     """
     try:
         user = frappe.session.user
-
-        filters = {
-            "docstatus": ["<", 2]  # Not cancelled documents
-        }
+        values = {"user": user}
+        conditions = ["m.docstatus < 2"]  # Not cancelled documents
 
         # Add status filter if provided
         if status:
-            filters["status"] = status
+            conditions.append("m.status = %(status)s")
+            values["status"] = status
 
         # Date range filters
         if from_date:
-            filters["scheduled_start"] = [">=", from_date]
+            conditions.append("m.scheduled_start >= %(from_date)s")
+            values["from_date"] = from_date
         if to_date:
-            if "scheduled_start" in filters:
-                filters["scheduled_start"] = [[">=", from_date], ["<=", to_date]]
-            else:
-                filters["scheduled_start"] = ["<=", to_date]
-
-        # Get meetings where user is applicant or council planner
-        meetings = frappe.get_all(
-            "Council Meeting",
-            filters=filters,
-            fields=[
-                "name", "request", "meeting_type", "status", "scheduled_start", "scheduled_end",
-                "meeting_format", "meeting_location", "requester_name", "council_planner",
-                "requested_date", "event"
-            ],
-            order_by="scheduled_start desc"
-        )
-
-        # Filter for user's meetings (permission check)
-        user_meetings = []
+            conditions.append("m.scheduled_start <= %(to_date)s")
+            values["to_date"] = to_date
+
+        permission_condition = get_meeting_permission_condition(user)
+        if permission_condition:
+            conditions.append(permission_condition)
+
+        limit_clause = ""
+        if cursor is not None:
+            page_size = min(100, max(1, int(page_size)))
+            position = decode_cursor(cursor)
+            if position:
+                conditions.append("""({sort_key} < %(cursor_value)s
+                    OR ({sort_key} = %(cursor_value)s AND m.name < %(cursor_name)s))""".format(
+                    sort_key=MEETING_SORT_KEY
+                ))
+                values["cursor_value"], values["cursor_name"] = position
+            # Fetch one extra row to know whether another page exists
+            limit_clause = f"LIMIT {page_size + 1}"
+
+        meetings = frappe.db.sql("""
+            SELECT
+                m.name, m.request, m.meeting_type, m.status, m.scheduled_start, m.scheduled_end,
+                m.meeting_format, m.meeting_location, m.requester_name, m.council_planner,
+                m.requested_date, m.event, r.request_number, NULL AS council,
+                {sort_key} AS sort_key
+            FROM `tabCouncil Meeting` m
+            LEFT JOIN `tabRequest` r ON r.name = m.request
+            WHERE {conditions}
+            ORDER BY sort_key DESC, m.name DESC
+            {limit_clause}
+        """.format(
+            sort_key=MEETING_SORT_KEY,
+            conditions=" AND ".join(conditions),
+            limit_clause=limit_clause
+        ), values, as_dict=True)
+
+        if cursor is None:
+            for meeting in meetings:
+                meeting.pop("sort_key")
+            return meetings
+
+        has_more = len(meetings) > page_size
+        meetings = meetings[:page_size]
+        next_cursor = encode_cursor(meetings[-1].sort_key, meetings[-1].name) if has_more else None
         for meeting in meetings:
-            meeting_doc = frappe.get_doc("Council Meeting", meeting.name)
-            if meeting_doc.has_permission("read"):
-                # Get request number
-                request_doc = frappe.get_doc("Request", meeting.request)
-                meeting.request_number = request_doc.request_number
-                meeting.council = request_doc.council
-                user_meetings.append(meeting)
+            meeting.pop("sort_key")
 
-        return user_meetings
+        return {
+            "data": meetings,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": has_more
+        }
 
     except Exception as e:
         frappe.log_error(f"Get User Meetings Error: {str(e)}", "Meeting API Error")
         frappe.throw(_("Failed to get user meetings: {0}").format(str(e)))
 
 
+def get_meeting_permission_condition(user):
+    """
+    SQL condition for the Council Meetings a user may read (Council Meeting aliased
+    as ``m``, its Request as ``r``), mirroring council_meeting.has_permission
+
+    Returns:
+        str: Condition using the %(user)s parameter, or None for roles that
+        can read every meeting
+    """
+    roles = frappe.get_roles(user)
+    if "System Manager" in roles or "Consent Planner" in roles:
+        return None
+
+    return """(
+        m.requested_by = %(user)s
+        OR m.council_planner = %(user)s
+        OR r.owner = %(user)s
+    )"""
+
+
 @frappe.whitelist()
 def get_meeting_config(council_code, meeting_type="Council Meeting"):
 	"""
@@ -738,39 +797,7 @@ def get_available_meeting_slots(council_code, meeting_type="Council Meeting", st
 		buffer_time = cint(council.get("meeting_buffer_time") or 15)
 
 		# Get business hours
-		business_hours = {}
-		if council.get("business_hours"):
-			for bh in council.business_hours:
-				if bh.is_open:
-					# Convert timedelta to time objects if needed
-					start_time = bh.start_time
-					end_time = bh.end_time
-
-					# If they're timedelta objects, convert them
-					if isinstance(start_time, timedelta):
-						total_seconds = int(start_time.total_seconds())
-						hours = total_seconds // 3600
-						minutes = (total_seconds % 3600) // 60
-						start_time = datetime_time(hours, minutes)
-
-					if isinstance(end_time, timedelta):
-						total_seconds = int(end_time.total_seconds())
-						hours = total_seconds // 3600
-						minutes = (total_seconds % 3600) // 60
-						end_time = datetime_time(hours, minutes)
-
-					business_hours[bh.day_of_week] = {
-						"start_time": start_time,
-						"end_time": end_time
-					}
-		else:
-			# Default business hours (Monday-Friday, 9 AM - 5 PM)
-			default_hours = {
-				"start_time": datetime_time(9, 0),
-				"end_time": datetime_time(17, 0)
-			}
-			for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]:
-				business_hours[day] = default_hours
+		business_hours = get_business_hours(council.get("business_hours"))
 
 		# Get all booked events in the date range
 		booked_events = frappe.get_all(
@@ -783,59 +810,27 @@ def get_available_meeting_slots(council_code, meeting_type="Council Meeting", st
 			fields=["starts_on", "ends_on"]
 		)
 
-		# Convert booked events to list of datetime ranges
-		booked_slots = []
-		for event in booked_events:
-			booked_slots.append({
-				"start": event.starts_on,
-				"end": event.ends_on
-			})
-
-		# Generate available slots
-		available_slots = []
-		current_date = start_date
-
-		while current_date <= end_date:
-			day_name = current_date.strftime("%A")
-
-			# Check if council is open on this day
-			if day_name not in business_hours:
-				current_date += timedelta(days=1)
-				continue
-
-			day_hours = business_hours[day_name]
-			day_start = datetime.combine(current_date, day_hours["start_time"])
-			day_end = datetime.combine(current_date, day_hours["end_time"])
-
-			# Generate time slots for this day
-			current_slot_start = day_start
-
-			while current_slot_start + timedelta(minutes=meeting_duration) <= day_end:
-				current_slot_end = current_slot_start + timedelta(minutes=meeting_duration)
-
-				# Check if this slot conflicts with any booked event
-				is_available = True
-				for booked in booked_slots:
-					# Check for overlap
-					if (current_slot_start < booked["end"] and current_slot_end > booked["start"]):
-						is_available = False
-						break
-
-				# Add slot if available
-				if is_available:
-					available_slots.append({
-						"start": current_slot_start.isoformat(),
-						"end": current_slot_end.isoformat(),
-						"start_display": current_slot_start.strftime("%Y-%m-%d %I:%M %p"),
-						"end_display": current_slot_end.strftime("%I:%M %p"),
-						"day": day_name,
-						"duration_minutes": meeting_duration
-					})
-
-				# Move to next slot (with buffer time)
-				current_slot_start += timedelta(minutes=meeting_duration + buffer_time)
-
-			current_date += timedelta(days=1)
+		# Sort and merge booked events once, then sweep each day (past slots are skipped)
+		busy = merge_busy_intervals([(event.starts_on, event.ends_on) for event in booked_events])
+		free_slots = find_available_slots(
+			start_date, end_date, business_hours, busy,
+			duration_minutes=meeting_duration,
+			step_minutes=meeting_duration + buffer_time,
+			earliest=now_datetime()
+		)
+
+		available_slots = [
+			{
+				"start": slot_start.isoformat(),
+				"end": slot_end.isoformat(),
+				"start_display": slot_start.strftime("%Y-%m-%d %I:%M %p"),
+				"end_display": slot_end.strftime("%I:%M %p"),
+				"day": slot_date.strftime("%A"),
+				"duration_minutes": meeting_duration
+			}
+			for slot_date, day_free_slots in free_slots.items()
+			for slot_start, slot_end in day_free_slots
+		]
 
 		return {
 			"success": True,
@@ -47,7 +47,7 @@ def request_invoice(request_id):
 				return {
 					"success": True,
 					"invoice_number": existing_payment,
-					"email": request.requester_email or frappe.db.get_value("User", request.requester, "email"),
+					"email": request.requester_email,
 					"message": "Invoice resent successfully"
 				}
 			else:
@@ -83,14 +83,14 @@ def request_invoice(request_id):
 			return {
 				"success": True,
 				"invoice_number": payment.name,
-				"email": request.requester_email or frappe.db.get_value("User", request.requester, "email"),
+				"email": request.requester_email,
 				"warning": "Invoice created but email sending failed. Please contact support."
 			}
 
 		return {
 			"success": True,
 			"invoice_number": payment.name,
-			"email": request.requester_email or frappe.db.get_value("User", request.requester, "email")
+			"email": request.requester_email
 		}
 
 	except Exception as e:
@@ -11,6 +11,10 @@ from frappe.utils import cint, flt, getdate
 import json
 from datetime import datetime
 from councilsonline.utils.rate_limit import rate_limit
+from councilsonline.utils import draft_buffer
+from councilsonline.utils.link_enrichment import enrich_links
+from councilsonline.utils.form_schema import get_compiled_schema, resolve_request_type_name
+from councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter import get_request_counters
 
 
 def create_rc_application(request_name, data):
@@ -869,31 +873,9 @@ def create_draft_request(data=None, current_step=None, total_steps=None):
         import json
         full_data_json = json.dumps(data, default=str)
 
-        # Generate draft request number
-        # Format: DRAFT-YYYY-XXXX (e.g., DRAFT-2025-0001)
-        from frappe.utils import nowdate
-        year = nowdate()[:4]
-        # Get the last draft number for this year - using parameterized query to prevent SQL injection
-        last_draft = frappe.db.sql("""
-            SELECT request_number
-            FROM `tabRequest`
-            WHERE request_number LIKE %(pattern)s
-            ORDER BY creation DESC
-            LIMIT 1
-        """, {"pattern": f"DRAFT-{year}-%"}, as_dict=True)
-
-        if last_draft:
-            # Extract number and increment
-            last_num = int(last_draft[0]['request_number'].split('-')[-1])
-            draft_number = f"DRAFT-{year}-{str(last_num + 1).zfill(4)}"
-        else:
-            # First draft of the year
-            draft_number = f"DRAFT-{year}-0001"
-
-        # Create request document
+        # Create request document (request_number is allocated in Request.autoname)
         request_doc = frappe.get_doc({
             "doctype": "Request",
-            "request_number": draft_number,
             "request_type": request_type,
             "request_category": category,
             "brief_description": data.get("brief_description"),
@@ -1006,6 +988,9 @@ def update_draft_request(request_id, data, current_step=None, total_steps=None):
         current_step = current_step or data.pop("current_step", None)
         total_steps = total_steps or data.pop("total_steps", None)
 
+        # Write pending autosave patches first so they cannot overwrite this full save later
+        draft_buffer.flush_draft_buffer(request_id)
+
         # Get the request document
         request_doc = frappe.get_doc("Request", request_id)
 
@@ -1093,6 +1078,79 @@ def update_draft_request(request_id, data, current_step=None, total_steps=None):
         raise
 
 
+@frappe.whitelist(methods=["POST"])
+def autosave_draft_patch(request_id, patch, current_step=None, total_steps=None, flush=0):
+    """
+    Autosave a draft with a JSON merge-patch instead of the full form
+
+    Patches are coalesced in a Redis write-behind buffer and written to the
+    database when the step changes, when ``flush`` is set, on submit, or by the
+    scheduled flush job. Use update_draft_request for a full save.
+
+    Args:
+        request_id: ID of the draft request
+        patch: JSON merge-patch (RFC 7386) of changed form fields; null removes a key
+        current_step: Current step in the form (1-indexed)
+        total_steps: Total number of steps in the form
+        flush: Write the buffer to the database immediately
+
+    Returns:
+        dict: {"success", "request_id", "flushed"}
+    """
+    if isinstance(patch, str):
+        patch = json.loads(patch)
+    if not isinstance(patch, dict):
+        frappe.throw(_("Draft patch must be a JSON object"))
+
+    request = frappe.db.get_value("Request", request_id, ["requester", "docstatus"], as_dict=True)
+    if not request:
+        frappe.throw(_("Request {0} not found").format(request_id), frappe.DoesNotExistError)
+    if request.requester != frappe.session.user:
+        frappe.throw(_("You don't have permission to update this request"), frappe.PermissionError)
+    if request.docstatus != 0:
+        frappe.throw(_("Only draft requests can be updated"))
+
+    previous = draft_buffer.get_buffer(request_id)
+    step_changed = bool(
+        previous and current_step is not None
+        and str(previous.get("step")) != str(current_step)
+    )
+
+    draft_buffer.buffer_patch(request_id, patch, current_step, total_steps)
+
+    flushed = False
+    if cint(flush) or step_changed:
+        flushed = draft_buffer.flush_draft_buffer(request_id)
+
+    return {
+        "success": True,
+        "request_id": request_id,
+        "flushed": flushed
+    }
+
+
+@frappe.whitelist(methods=["POST"])
+def flush_draft_autosave(request_id):
+    """
+    Write any buffered autosave patches for a draft to the database
+
+    Args:
+        request_id: ID of the draft request
+
+    Returns:
+        dict: {"success", "request_id", "flushed"}
+    """
+    requester = frappe.db.get_value("Request", request_id, "requester")
+    if requester != frappe.session.user:
+        frappe.throw(_("You don't have permission to update this request"), frappe.PermissionError)
+
+    return {
+        "success": True,
+        "request_id": request_id,
+        "flushed": draft_buffer.flush_draft_buffer(request_id)
+    }
+
+
 @frappe.whitelist()
 def load_draft_request(request_id):
     """
@@ -1125,6 +1183,9 @@ def load_draft_request(request_id):
             except:
                 frappe.log_error(f"Failed to parse draft data for {request_id}")
 
+        # Include autosave patches that have not been flushed yet
+        form_data = draft_buffer.apply_buffered_patch(request_id, form_data)
+
         return {
             "success": True,
             "request_id": request_doc.name,
@@ -1154,6 +1215,9 @@ def submit_request(request_id):
         dict: Success message and request number
     """
     try:
+        # Write pending autosave patches before submitting
+        draft_buffer.flush_draft_buffer(request_id)
+
         doc = frappe.get_doc("Request", request_id)
 
         # Validate user has permission
@@ -1305,99 +1369,12 @@ def get_request_type_config(request_type_code=None):
         if isinstance(request_type_code, dict):
             request_type_code = request_type_code.get('name') or request_type_code.get('type_code')
 
-        # Try to find by type_code first, then by name
-        request_type = frappe.get_value(
-            "Request Type",
-            {"type_code": request_type_code},
-            ["name", "type_code", "type_name", "category", "description", "base_fee",
-             "processing_sla_days", "fee_calculation_method"],
-            as_dict=True
-        )
-
+        # Resolve type_code or name, then serve the compiled (cached) schema
+        request_type = resolve_request_type_name(request_type_code)
         if not request_type:
-            # Try finding by name
-            try:
-                request_type_doc = frappe.get_doc("Request Type", request_type_code)
-                request_type = {"name": request_type_doc.name}
-            except:
-                frappe.throw(f"Request Type {request_type_code} not found")
-        else:
-            # Get the full document to access child tables
-            request_type_doc = frappe.get_doc("Request Type", request_type.name)
-
-        # Get steps configuration from new flattened structure
-        steps = []
-        if hasattr(request_type_doc, 'step_configs') and request_type_doc.step_configs:
-            for step_config in request_type_doc.step_configs:
-                # Build step data
-                step_data = {
-                    "step_number": step_config.step_number,
-                    "step_title": step_config.step_title,
-                    "step_code": step_config.step_code,
-                    "step_component": step_config.step_component if hasattr(step_config, 'step_component') else "DynamicStepRenderer",
-                    "is_enabled": step_config.is_enabled if hasattr(step_config, 'is_enabled') else 1,
-                    "is_required": step_config.is_required if hasattr(step_config, 'is_required') else 1,
-                    "show_on_review": step_config.show_on_review if hasattr(step_config, 'show_on_review') else 1,
-                    "sections": []
-                }
-
-                # Get sections for this step
-                if hasattr(request_type_doc, 'step_sections'):
-                    for section in request_type_doc.step_sections:
-                        if section.parent_step_code == step_config.step_code:
-                            section_data = {
-                                "section_code": section.section_code,
-                                "section_title": section.section_title,
-                                "section_type": section.section_type if hasattr(section, 'section_type') else "Section",
-                                "sequence": section.sequence if hasattr(section, 'sequence') else 1,
-                                "is_enabled": section.is_enabled if hasattr(section, 'is_enabled') else 1,
-                                "is_required": section.is_required if hasattr(section, 'is_required') else 1,
-                                "depends_on": section.depends_on if hasattr(section, 'depends_on') else None,
-                                "show_on_review": section.show_on_review if hasattr(section, 'show_on_review') else 1,
-                                "fields": []
-                            }
-
-                            # Get fields for this section
-                            if hasattr(request_type_doc, 'step_fields'):
-                                for field in request_type_doc.step_fields:
-                                    if field.parent_section_code == section.section_code:
-                                        section_data["fields"].append({
-                                            "field_name": field.field_name,
-                                            "field_label": field.field_label,
-                                            "field_type": field.field_type,
-                                            "is_required": field.is_required if hasattr(field, 'is_required') else 0,
-                                            "options": field.options if hasattr(field, 'options') else None,
-                                            "description": field.description if hasattr(field, 'description') else None,
-                                            "default_value": field.default_value if hasattr(field, 'default_value') else None,
-                                            "depends_on": field.depends_on if hasattr(field, 'depends_on') else None,
-                                            "show_on_review": field.show_on_review if hasattr(field, 'show_on_review') else 1,
-                                            "review_label": field.review_label if hasattr(field, 'review_label') else None,
-                                            "parent_section_code": field.parent_section_code if hasattr(field, 'parent_section_code') else None,
-                                            "validation": field.validation if hasattr(field, 'validation') else None,
-                                            "read_only": field.read_only if hasattr(field, 'read_only') else 0,
-                                        })
-
-                            step_data["sections"].append(section_data)
-
-                steps.append(step_data)
+            frappe.throw(f"Request Type {request_type_code} not found")
 
-        return {
-            "name": request_type_doc.name,
-            "type_code": request_type_doc.type_code,
-            "type_name": request_type_doc.type_name,
-            "category": request_type_doc.category,
-            "description": request_type_doc.description if hasattr(request_type_doc, 'description') else "",
-            "base_fee": request_type_doc.base_fee,
-            "processing_sla_days": request_type_doc.processing_sla_days,
-            "fee_calculation_method": request_type_doc.fee_calculation_method,
-            "requires_property": request_type_doc.requires_property if hasattr(request_type_doc, 'requires_property') else 1,
-            "requires_payment": request_type_doc.requires_payment if hasattr(request_type_doc, 'requires_payment') else 1,
-            "council_meeting_available": request_type_doc.council_meeting_available if hasattr(request_type_doc, 'council_meeting_available') else 1,
-            "collect_payment": request_type_doc.collect_payment if hasattr(request_type_doc, 'collect_payment') else 0,
-            "make_payment": request_type_doc.make_payment if hasattr(request_type_doc, 'make_payment') else 0,
-            "default_response_role": request_type_doc.default_response_role if hasattr(request_type_doc, 'default_response_role') else None,
-            "steps": steps
-        }
+        return get_compiled_schema(request_type)["config"]
 
     except Exception as e:
         frappe.log_error(f"Get Request Type Config Error: {str(e)}", "Request Type API Error")
@@ -1623,17 +1600,12 @@ def get_user_requests(status=None):
             order_by="modified desc"
         )
 
-        # Add computed fields for each request
-        for req in requests:
-            if req.get("requester"):
-                user_info = frappe.db.get_value(
-                    "User", req["requester"],
-                    ["full_name", "email", "phone"], as_dict=True
-                )
-                if user_info:
-                    req["requester_name"] = user_info.get("full_name")
-                    req["requester_email"] = user_info.get("email")
-                    req["requester_phone"] = user_info.get("phone")
+        # Add computed fields for all requests with a single User query
+        enrich_links(requests, "requester", "User", {
+            "requester_name": "full_name",
+            "requester_email": "email",
+            "requester_phone": "phone"
+        })
 
         return requests
 
@@ -1659,26 +1631,9 @@ def get_request_summary_data(request_id):
         request_doc = frappe.get_doc("Request", request_id)
         request_type = request_doc.request_type
 
-        # Get tasks count (all tasks)
-        tasks_count = frappe.db.count("Project Task", {
-            "request": request_id
-        })
-
-        # Get open tasks count
-        open_tasks_count = frappe.db.count("Project Task", {
-            "request": request_id,
-            "status": ["in", ["Open", "In Progress", "Working"]]
-        })
-
-        # Get council meetings count
-        meetings_count = frappe.db.count("Council Meeting", {
-            "request": request_id
-        })
-
-        # Get communications count
-        communications_count = frappe.db.count("Communication Log", {
-            "request": request_id
-        })
+        # Get tasks, open tasks, meetings and communications counts
+        # from the materialised per-request counters (single primary-key read)
+        counters = get_request_counters(request_id)
 
         # Get assessment project status if exists
         assessment_project = frappe.db.get_value("Assessment Project",
@@ -1729,10 +1684,10 @@ def get_request_summary_data(request_id):
         return {
             "success": True,
             "request_type": request_type,
-            "tasks_count": tasks_count,
-            "open_tasks_count": open_tasks_count,
-            "meetings_count": meetings_count,
-            "communications_count": communications_count,
+            "tasks_count": counters.tasks_count,
+            "open_tasks_count": counters.open_tasks_count,
+            "meetings_count": counters.meetings_count,
+            "communications_count": counters.communications_count,
             "assessment_status": assessment_status,
             "current_stage": current_stage,
             "assessment_project_name": assessment_project_name,
@@ -11,6 +11,18 @@ from frappe.utils import cint, getdate, now_datetime, get_datetime
 from datetime import datetime, timedelta, time as datetime_time
 import json
 
+from councilsonline.utils.availability import (
+	get_business_hours,
+	get_team_available_slots,
+	make_etag
+)
+from councilsonline.utils.slot_holds import (
+	HOLD_TTL,
+	acquire_slot_hold,
+	get_slot_hold,
+	release_slot_hold
+)
+
 
 @frappe.whitelist()
 def get_team_config(team_code):
@@ -65,7 +77,8 @@ def get_team_config(team_code):
 
 
 @frappe.whitelist()
-def get_available_slots(team_code, start_date=None, end_date=None, duration_minutes=None, appointment_type=None):
+def get_available_slots(team_code, start_date=None, end_date=None, duration_minutes=None, appointment_type=None,
+						if_none_match=None):
 	"""
 	Get available appointment time slots for a team based on business hours and existing bookings
 
@@ -75,9 +88,11 @@ def get_available_slots(team_code, start_date=None, end_date=None, duration_minu
 		end_date: End date for availability check (YYYY-MM-DD)
 		duration_minutes: Override duration in minutes (optional)
 		appointment_type: Type of appointment for filtering (optional)
+		if_none_match: ETag from a previous response (optional; the If-None-Match header also works)
 
 	Returns:
-		dict: Available time slots grouped by date
+		dict: Available time slots grouped by date, with an "etag"; when the
+		etag matches, only {"success": True, "not_modified": True, "etag"}
 	"""
 	try:
 		team = frappe.get_doc("Council Team", team_code)
@@ -118,115 +133,46 @@ def get_available_slots(team_code, start_date=None, end_date=None, duration_minu
 		max_daily = cint(team.max_daily_appointments or 20)
 
 		# Get business hours
-		business_hours = team.get_business_hours_dict()
-		if not business_hours:
-			# Default business hours (Monday-Friday, 9 AM - 5 PM)
-			default_hours = {
-				"start_time": datetime_time(9, 0),
-				"end_time": datetime_time(17, 0)
-			}
-			for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]:
-				business_hours[day] = default_hours
-
-		# Get all booked appointments in the date range
-		booked_appointments = frappe.get_all(
-			"Scheduled Appointment",
-			filters={
-				"team": team_code,
-				"scheduled_date": ["between", [start_date, end_date]],
-				"status": ["in", ["Scheduled", "Confirmed"]]
-			},
-			fields=["scheduled_start", "scheduled_end", "scheduled_date"]
+		business_hours = get_business_hours(team.business_hours)
+
+		# Served from per-day snapshots; only uncached days query bookings
+		free_slots = get_team_available_slots(
+			team_code, start_date, end_date, business_hours,
+			duration_minutes=appointment_duration,
+			buffer_minutes=buffer_time,
+			earliest=earliest_booking,
+			max_daily=max_daily
 		)
 
-		# Convert booked appointments to list of datetime ranges
-		booked_slots = []
-		daily_counts = {}
-		for appt in booked_appointments:
-			booked_slots.append({
-				"start": get_datetime(appt.scheduled_start),
-				"end": get_datetime(appt.scheduled_end)
-			})
-			date_str = str(appt.scheduled_date)
-			daily_counts[date_str] = daily_counts.get(date_str, 0) + 1
-
-		# Generate available slots
+		# Format available slots
 		available_slots = []
 		slots_by_date = {}
-		current_date = start_date
-
-		while current_date <= end_date:
-			day_name = current_date.strftime("%A")
-			date_str = current_date.isoformat()
-
-			# Check if team is open on this day
-			if day_name not in business_hours:
-				current_date += timedelta(days=1)
-				continue
-
-			# Check max daily appointments
-			if daily_counts.get(date_str, 0) >= max_daily:
-				current_date += timedelta(days=1)
-				continue
-
-			day_hours = business_hours[day_name]
-			day_start = datetime.combine(current_date, day_hours["start_time"])
-			day_end = datetime.combine(current_date, day_hours["end_time"])
-
-			# Skip slots in the past
-			if day_start < earliest_booking:
-				day_start = earliest_booking
-				# Round up to next slot boundary
-				minutes = day_start.minute
-				if minutes % 15 != 0:
-					day_start = day_start.replace(minute=(minutes // 15 + 1) * 15 % 60)
-					if (minutes // 15 + 1) * 15 >= 60:
-						day_start += timedelta(hours=1)
-
-			day_slots = []
-			current_slot_start = day_start
-
-			while current_slot_start + timedelta(minutes=appointment_duration) <= day_end:
-				current_slot_end = current_slot_start + timedelta(minutes=appointment_duration)
-
-				# Check if this slot conflicts with any booked appointment
-				is_available = True
-				for booked in booked_slots:
-					# Check for overlap (including buffer)
-					buffer_start = booked["start"] - timedelta(minutes=buffer_time)
-					buffer_end = booked["end"] + timedelta(minutes=buffer_time)
-					if (current_slot_start < buffer_end and current_slot_end > buffer_start):
-						is_available = False
-						break
-
-				# Add slot if available
-				if is_available:
-					slot = {
-						"start": current_slot_start.isoformat(),
-						"end": current_slot_end.isoformat(),
-						"start_display": current_slot_start.strftime("%I:%M %p"),
-						"end_display": current_slot_end.strftime("%I:%M %p"),
-						"date": date_str,
-						"day": day_name,
-						"duration_minutes": appointment_duration
-					}
-					available_slots.append(slot)
-					day_slots.append(slot)
-
-				# Move to next slot
-				current_slot_start += timedelta(minutes=appointment_duration + buffer_time)
-
-			if day_slots:
-				slots_by_date[date_str] = {
+		for slot_date, day_free_slots in free_slots.items():
+			date_str = slot_date.isoformat()
+			day_name = slot_date.strftime("%A")
+
+			day_slots = [
+				{
+					"start": slot_start.isoformat(),
+					"end": slot_end.isoformat(),
+					"start_display": slot_start.strftime("%I:%M %p"),
+					"end_display": slot_end.strftime("%I:%M %p"),
 					"date": date_str,
 					"day": day_name,
-					"date_display": current_date.strftime("%A, %B %d, %Y"),
-					"slots": day_slots
+					"duration_minutes": appointment_duration
 				}
+				for slot_start, slot_end in day_free_slots
+			]
+			available_slots.extend(day_slots)
+
+			slots_by_date[date_str] = {
+				"date": date_str,
+				"day": day_name,
+				"date_display": slot_date.strftime("%A, %B %d, %Y"),
+				"slots": day_slots
+			}
 
-			current_date += timedelta(days=1)
-
-		return {
+		response = {
 			"success": True,
 			"slots": available_slots,
 			"slots_by_date": slots_by_date,
@@ -242,6 +188,15 @@ def get_available_slots(team_code, start_date=None, end_date=None, duration_minu
 			}
 		}
 
+		# Unchanged availability is answered with a small 200 body: a bare 304
+		# carries no JSON, which frappe-ui treats as a failed call
+		etag = make_etag(response)
+		if etag in (if_none_match, frappe.get_request_header("If-None-Match")):
+			return {"success": True, "not_modified": True, "etag": etag}
+
+		response["etag"] = etag
+		return response
+
 	except Exception as e:
 		frappe.log_error(f"Get Available Slots Error: {str(e)}")
 		return {
@@ -250,11 +205,94 @@ def get_available_slots(team_code, start_date=None, end_date=None, duration_minu
 		}
 
 
+@frappe.whitelist()
+def hold_appointment_slot(team_code, scheduled_start, scheduled_end):
+	"""
+	Hold a slot for a few minutes while the user completes the booking form
+
+	Args:
+		team_code: Team code
+		scheduled_start: Start datetime (ISO format)
+		scheduled_end: End datetime (ISO format)
+
+	Returns:
+		dict: Hold token to pass to book_appointment, and seconds until it expires
+	"""
+	team = frappe.get_cached_doc("Council Team", team_code)
+	if not team.is_active or not team.enable_scheduling:
+		frappe.throw(_("Scheduling is not available for this team"))
+
+	start_dt = get_datetime(scheduled_start)
+	end_dt = get_datetime(scheduled_end)
+	validate_min_notice(team, start_dt)
+
+	if get_overlapping_appointments(team_code, start_dt, end_dt):
+		return {
+			"success": False,
+			"error": _("This time slot is no longer available. Please select another slot.")
+		}
+
+	hold_token = acquire_slot_hold(team_code, start_dt, end_dt)
+	if not hold_token:
+		return {
+			"success": False,
+			"error": _("This time slot is being booked by someone else. Please select another slot.")
+		}
+
+	return {
+		"success": True,
+		"hold_token": hold_token,
+		"expires_in": HOLD_TTL
+	}
+
+
+@frappe.whitelist()
+def release_appointment_slot(hold_token):
+	"""
+	Release a slot hold (e.g. the user went back to pick another time)
+
+	Args:
+		hold_token: Token from hold_appointment_slot
+	"""
+	hold = get_slot_hold(hold_token)
+	if hold and hold["user"] == frappe.session.user:
+		release_slot_hold(hold_token)
+
+	return {"success": True}
+
+
+def validate_min_notice(team, start_dt):
+	"""Ensure a slot starts at least the team's minimum notice from now"""
+	min_notice = timedelta(hours=cint(team.min_notice_hours or 24))
+	if start_dt < datetime.now() + min_notice:
+		frappe.throw(_("Appointments must be booked at least {0} hours in advance").format(
+			team.min_notice_hours or 24
+		))
+
+
+def get_overlapping_appointments(team_code, start_dt, end_dt, for_update=False):
+	"""
+	Get active appointments of a team that overlap [start_dt, end_dt)
+
+	With ``for_update`` the read is a locking read: it sees rows committed
+	after the transaction's snapshot was taken and blocks concurrent writers
+	of the scanned range until commit.
+	"""
+	return frappe.db.sql("""
+		SELECT name FROM `tabScheduled Appointment`
+		WHERE team = %s
+		AND status IN ('Scheduled', 'Confirmed')
+		AND scheduled_start < %s
+		AND scheduled_end > %s
+		{lock}
+	""".format(lock="FOR UPDATE" if for_update else ""), (team_code, end_dt, start_dt))
+
+
 @frappe.whitelist()
 def book_appointment(team_code, scheduled_start, scheduled_end, appointment_type,
 					 location=None, purpose=None, contact_name=None, contact_email=None,
 					 contact_phone=None, reference_doctype=None, reference_name=None,
-					 request_id=None, council_code=None):
+					 request_id=None, council_code=None, hold_token=None):
 	"""
 	Book an appointment slot
 
@@ -272,6 +310,8 @@ def book_appointment(team_code, scheduled_start, scheduled_end, appointment_type
 		reference_name: Reference document name (optional)
 		request_id: Associated Request ID (optional)
 		council_code: Council code (optional)
+		hold_token: Token from hold_appointment_slot (optional; without it, or
+			once it has expired, the slot is held just for the duration of this call)
 
 	Returns:
 		dict: Appointment details
@@ -287,92 +327,94 @@ def book_appointment(team_code, scheduled_start, scheduled_end, appointment_type
 		start_dt = get_datetime(scheduled_start)
 		end_dt = get_datetime(scheduled_end)
 
-		# Validate minimum notice period
-		min_notice = timedelta(hours=cint(team.min_notice_hours or 24))
-		if start_dt < datetime.now() + min_notice:
-			frappe.throw(_("Appointments must be booked at least {0} hours in advance").format(
-				team.min_notice_hours or 24
-			))
-
-		# Use database lock to prevent race conditions
-		# Lock the team row while we check and create the appointment
-		frappe.db.sql(
-			"SELECT name FROM `tabCouncil Team` WHERE name = %s FOR UPDATE",
-			(team_code,)
-		)
-
-		# Validate the slot is still available (with overlap check)
-		overlapping = frappe.db.sql("""
-			SELECT name FROM `tabScheduled Appointment`
-			WHERE team = %s
-			AND status IN ('Scheduled', 'Confirmed')
-			AND (
-				(scheduled_start <= %s AND scheduled_end > %s)
-				OR (scheduled_start < %s AND scheduled_end >= %s)
-				OR (scheduled_start >= %s AND scheduled_end <= %s)
-			)
-		""", (team_code, scheduled_start, scheduled_start, scheduled_end, scheduled_end,
-			  scheduled_start, scheduled_end))
-
-		if overlapping:
-			frappe.throw(_("This time slot is no longer available. Please select another slot."))
-
-		# Get council if provided
-		council = None
-		if council_code:
-			council = frappe.db.get_value("Council", {"council_code": council_code}, "name")
-
-		# Create appointment
-		appointment = frappe.get_doc({
-			"doctype": "Scheduled Appointment",
-			"appointment_type": appointment_type,
-			"team": team_code,
-			"status": "Scheduled",
-			"scheduled_start": scheduled_start,
-			"scheduled_end": scheduled_end,
-			"scheduled_date": start_dt.date(),
-			"location": location or team.default_location,
-			"purpose": purpose,
-			"contact_name": contact_name,
-			"contact_email": contact_email,
-			"contact_phone": contact_phone,
-			"reference_doctype": reference_doctype,
-			"reference_name": reference_name,
-			"request": request_id,
-			"council": council,
-			"booked_by": frappe.session.user,
-			"booked_at": now_datetime()
-		})
-
-		appointment.insert(ignore_permissions=True)
-
-		# Auto-confirm if team has auto_confirm_appointments enabled
-		if team.auto_confirm_appointments:
-			appointment.status = "Confirmed"
-			appointment.confirmed_at = now_datetime()
-			appointment.save(ignore_permissions=True)
-
-		frappe.db.commit()
-
-		return {
-			"success": True,
-			"appointment_id": appointment.name,
-			"appointment_type": appointment_type,
-			"scheduled_start": appointment.scheduled_start,
-			"scheduled_end": appointment.scheduled_end,
-			"location": appointment.location,
-			"status": appointment.status,
-			"message": _("Appointment {0} for {1}").format(
-				"confirmed" if team.auto_confirm_appointments else "booked successfully",
-				start_dt.strftime("%A, %B %d at %I:%M %p")
+		validate_min_notice(team, start_dt)
+
+		# Overlapping slots contend on their shared hold cells; the team row is never locked
+		hold = get_slot_hold(hold_token) if hold_token else None
+		if (not hold or hold["team"] != team_code or hold["user"] != frappe.session.user
+				or hold["start"] != start_dt.isoformat() or hold["end"] != end_dt.isoformat()):
+			# No hold, or it expired: the slot can still be booked if nobody else holds it
+			hold_token = acquire_slot_hold(team_code, start_dt, end_dt)
+			if not hold_token:
+				frappe.throw(_("This time slot is no longer available. Please select another slot."))
+
+		try:
+			return create_appointment(
+				team, start_dt, end_dt, scheduled_start, scheduled_end, appointment_type,
+				location, purpose, contact_name, contact_email, contact_phone,
+				reference_doctype, reference_name, request_id, council_code
 			)
-		}
+		finally:
+			release_slot_hold(hold_token)
 
 	except Exception as e:
 		frappe.log_error(f"Book Appointment Error: {str(e)}")
 		frappe.throw(_("Failed to book appointment: {0}").format(str(e)))
 
 
+def create_appointment(team, start_dt, end_dt, scheduled_start, scheduled_end, appointment_type,
+					   location, purpose, contact_name, contact_email, contact_phone,
+					   reference_doctype, reference_name, request_id, council_code):
+	"""Insert and commit an appointment for a held slot"""
+	team_code = team.name
+
+	# A plain read would use the snapshot taken at the request's first query,
+	# before the hold, and miss bookings committed since; lock and read current rows
+	if get_overlapping_appointments(team_code, start_dt, end_dt, for_update=True):
+		frappe.throw(_("This time slot is no longer available. Please select another slot."))
+
+	# Get council if provided
+	council = None
+	if council_code:
+		council = frappe.db.get_value("Council", {"council_code": council_code}, "name")
+
+	# Create appointment
+	appointment = frappe.get_doc({
+		"doctype": "Scheduled Appointment",
+		"appointment_type": appointment_type,
+		"team": team_code,
+		"status": "Scheduled",
+		"scheduled_start": scheduled_start,
+		"scheduled_end": scheduled_end,
+		"scheduled_date": start_dt.date(),
+		"location": location or team.default_location,
+		"purpose": purpose,
+		"contact_name": contact_name,
+		"contact_email": contact_email,
+		"contact_phone": contact_phone,
+		"reference_doctype": reference_doctype,
+		"reference_name": reference_name,
+		"request": request_id,
+		"council": council,
+		"booked_by": frappe.session.user,
+		"booked_at": now_datetime()
+	})
+
+	appointment.insert(ignore_permissions=True)
+
+	# Auto-confirm if team has auto_confirm_appointments enabled
+	if team.auto_confirm_appointments:
+		appointment.status = "Confirmed"
+		appointment.confirmed_at = now_datetime()
+		appointment.save(ignore_permissions=True)
+
+	frappe.db.commit()
+
+	return {
+		"success": True,
+		"appointment_id": appointment.name,
+		"appointment_type": appointment_type,
+		"scheduled_start": appointment.scheduled_start,
+		"scheduled_end": appointment.scheduled_end,
+		"location": appointment.location,
+		"status": appointment.status,
+		"message": _("Appointment {0} for {1}").format(
+			"confirmed" if team.auto_confirm_appointments else "booked successfully",
+			start_dt.strftime("%A, %B %d at %I:%M %p")
+		)
+	}
+
+
 @frappe.whitelist()
 def cancel_appointment(appointment_id, reason=None):
 	"""
@@ -603,6 +603,87 @@ def get_eligibility_result(request_id):
 	}
 
 
+@frappe.whitelist()
+def rescore_eligibility(request_type=None, requests=None, rescore=1):
+	"""
+	Evaluate eligibility for many requests in a background job
+
+	Args:
+		request_type: Evaluate every Request of this type that is not cancelled (optional)
+		requests: JSON list of Request IDs (optional; used instead of request_type)
+		rescore: Replace existing results (manual overrides are always kept)
+
+	Returns:
+		dict: Job ID and number of requests queued; poll get_eligibility_batch_status
+	"""
+	if not frappe.has_permission("Eligibility Criteria Result", "create"):
+		frappe.throw(_("You do not have permission to evaluate eligibility"))
+
+	if requests:
+		request_ids = frappe.parse_json(requests) if isinstance(requests, str) else list(requests)
+	elif request_type:
+		request_ids = frappe.get_all(
+			"Request",
+			filters={"request_type": request_type, "docstatus": ["<", 2]},
+			pluck="name",
+			order_by="name asc"
+		)
+	else:
+		frappe.throw(_("Provide a request type or a list of requests"))
+
+	from councilsonline.eligibility_engine import set_batch_status
+
+	job_id = frappe.generate_hash(length=12)
+	set_batch_status(job_id, {"status": "Queued", "processed": 0, "total": len(request_ids)})
+	frappe.enqueue(
+		method="councilsonline.eligibility_engine.run_eligibility_batch",
+		queue="long",
+		timeout=3600,
+		request_names=request_ids,
+		rescore=bool(frappe.utils.cint(rescore)),
+		job_id=job_id
+	)
+
+	return {
+		"success": True,
+		"job_id": job_id,
+		"queued": len(request_ids)
+	}
+
+
+@frappe.whitelist()
+def get_eligibility_batch_status(job_id):
+	"""
+	Get progress of a background eligibility evaluation
+
+	Returns:
+		dict: status, processed, total and evaluated/skipped/eligible counts
+	"""
+	from councilsonline.eligibility_engine import get_batch_status
+
+	status = get_batch_status(job_id)
+	if not status:
+		return {"success": False, "message": "Unknown or expired eligibility job"}
+
+	return {"success": True, **status}
+
+
+@frappe.whitelist()
+def get_eligibility_rule_stats(request_type):
+	"""
+	Get how often each eligibility criterion of a Request Type ran, was met, and how long it took
+
+	Returns:
+		dict: criteria list of calls, met, total_ms and avg_us
+	"""
+	if not frappe.has_permission("Request Type", "write"):
+		frappe.throw(_("You do not have permission to view eligibility rule statistics"))
+
+	from councilsonline.eligibility_rules import get_rule_stats
+
+	return {"success": True, "criteria": get_rule_stats(request_type)}
+
+
 # ================================
 # Payout & Disbursement APIs
 # ================================
@@ -855,6 +936,30 @@ def run_fraud_check(user_email):
 		raise
 
 
+@frappe.whitelist()
+def run_fraud_sweep(full=0):
+	"""
+	Queue a fraud sweep over all beneficiaries (System Manager only)
+
+	Args:
+		full: Rescan every user instead of those changed since the last sweep
+
+	Returns:
+		dict: Whether the sweep was queued
+	"""
+	if "System Manager" not in frappe.get_roles():
+		frappe.throw(_("Only System Managers can run a fraud sweep"), frappe.PermissionError)
+
+	frappe.enqueue(
+		method="councilsonline.fraud_detector.run_fraud_sweep",
+		queue="long",
+		timeout=3600,
+		incremental=not frappe.utils.cint(full)
+	)
+
+	return {"success": True, "mode": "Full" if frappe.utils.cint(full) else "Incremental"}
+
+
 @frappe.whitelist()
 def check_duplicate_application(user_email, request_type):
 	"""
@@ -953,13 +1058,15 @@ def check_beneficiary_status(user_email):
 
 
 @frappe.whitelist()
-def detect_identity_fraud(philsys_id=None, sss_number=None):
+def detect_identity_fraud(philsys_id=None, sss_number=None, user=None):
 	"""
 	Detect potential identity fraud by checking for duplicate IDs
 
 	Args:
 		philsys_id: PhilSys National ID
 		sss_number: SSS Number
+		user: Also return likely duplicates of this user's identity from the
+			duplicate-identity index (similar names, birth dates and barangays)
 
 	Returns:
 		dict: Identity fraud detection results
@@ -995,12 +1102,19 @@ def detect_identity_fraud(philsys_id=None, sss_number=None):
 					"users": sss_users
 				})
 
+		similar_identities = []
+		if user:
+			from councilsonline.utils.identity_match import get_identity_candidates
+
+			similar_identities = get_identity_candidates(user)
+
 		fraud_detected = len(duplicates) > 0
 
 		return {
 			"success": True,
 			"fraud_detected": fraud_detected,
 			"duplicates": duplicates,
+			"similar_identities": similar_identities,
 			"message": f"Found {len(duplicates)} duplicate ID(s)" if fraud_detected else "No duplicate IDs found"
 		}
 
@@ -1009,6 +1123,88 @@ def detect_identity_fraud(philsys_id=None, sss_number=None):
 		raise
 
 
+@frappe.whitelist()
+def rebuild_identity_index():
+	"""
+	Queue a full rebuild of the duplicate-identity index (System Manager only)
+
+	Returns:
+		dict: Whether the rebuild was queued
+	"""
+	if "System Manager" not in frappe.get_roles():
+		frappe.throw(_("Only System Managers can rebuild the identity index"), frappe.PermissionError)
+
+	frappe.enqueue(
+		method="councilsonline.utils.identity_match.rebuild_identity_index",
+		queue="long",
+		timeout=3600
+	)
+
+	return {"success": True}
+
+
+@frappe.whitelist()
+def get_linked_households(household=None, user=None, account_number=None, gcash_number=None):
+	"""
+	Get households linked to a household, person, bank account or GCash number
+	through shared members and payment accounts
+
+	Args:
+		household: Household Record name
+		user: User (as head, member or account holder)
+		account_number: Bank account number
+		gcash_number: GCash mobile number
+
+	Returns:
+		dict: Linked Household Record names
+	"""
+	if not frappe.has_permission("Household Graph Node", "read"):
+		frappe.throw(_("You do not have permission to view household links"))
+
+	from councilsonline.utils.household_graph import (
+		account_node,
+		gcash_node,
+		get_linked_households as get_linked,
+		household_node,
+		person_node
+	)
+
+	if household:
+		node = household_node(household)
+	elif user:
+		node = person_node(user)
+	elif account_number:
+		node = account_node(account_number)
+	elif gcash_number:
+		node = gcash_node(gcash_number)
+	else:
+		frappe.throw(_("Provide a household, user, account number or GCash number"))
+
+	households = get_linked(node[0]) if node else []
+	return {"success": True, "households": households, "count": len(households)}
+
+
+@frappe.whitelist()
+def get_household_networks(min_households=2, limit=50):
+	"""
+	Get groups of households linked through shared members or payment accounts, largest first
+
+	Args:
+		min_households: Only groups linking at least this many households
+		limit: Maximum number of groups
+
+	Returns:
+		dict: Groups with their component id and household, person and account counts
+	"""
+	if not frappe.has_permission("Household Graph Node", "read"):
+		frappe.throw(_("You do not have permission to view household links"))
+
+	from councilsonline.utils.household_graph import get_large_components
+
+	networks = get_large_components(frappe.utils.cint(min_households), frappe.utils.cint(limit))
+	return {"success": True, "networks": networks}
+
+
 @frappe.whitelist()
 def update_user_company_role(company_name, user_email, new_role):
 	"""
@@ -242,9 +242,152 @@ def show_config_pack(context, pack_name):
 		frappe.destroy()
 
 
+@click.command("rebuild-request-counters")
+@click.option("--request", help="Rebuild counters for a single Request only")
+@pass_context
+def rebuild_request_counters(context, request=None):
+	"""Rebuild materialised Request activity counters from source tables
+
+	Example:
+	  bench --site mysite rebuild-request-counters
+	  bench --site mysite rebuild-request-counters --request RC-2025-001
+	"""
+	from councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter import (
+		rebuild_counters,
+		rebuild_all_counters,
+	)
+
+	site = get_site(context)
+
+	frappe.init(site=site)
+	frappe.connect()
+
+	try:
+		if request:
+			rebuild_counters(request)
+			click.echo(f"Rebuilt activity counters for {request}")
+		else:
+			rebuilt = rebuild_all_counters()
+			click.echo(f"Rebuilt activity counters for {rebuilt} requests")
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("reconcile-cost-ledger")
+@click.option("--request", help="Reconcile a single Request only")
+@pass_context
+def reconcile_cost_ledger(context, request=None):
+	"""Reconcile the cost ledger with Project Tasks and rebuild Request and Assessment Project totals
+
+	Example:
+	  bench --site mysite reconcile-cost-ledger
+	  bench --site mysite reconcile-cost-ledger --request RC-2025-001
+	"""
+	from councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry import (
+		reconcile_cost_ledger as reconcile,
+	)
+
+	site = get_site(context)
+
+	frappe.init(site=site)
+	frappe.connect()
+
+	try:
+		result = reconcile(request)
+		click.echo(
+			f"Posted {result['entries']} reconciliation entries; "
+			f"rebuilt totals for {result['requests']} requests and {result['projects']} assessment projects"
+		)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("fraud-sweep")
+@click.option("--full", is_flag=True, help="Rescan every user instead of those changed since the last sweep")
+@pass_context
+def fraud_sweep(context, full=False):
+	"""Score beneficiaries with the fraud rules and open or refresh investigation cases
+
+	Example:
+	  bench --site mysite fraud-sweep
+	  bench --site mysite fraud-sweep --full
+	"""
+	from councilsonline.fraud_detector import run_fraud_sweep
+
+	site = get_site(context)
+
+	frappe.init(site=site)
+	frappe.connect()
+
+	try:
+		result = run_fraud_sweep(incremental=not full)
+		click.echo(
+			f"{result['mode']} sweep: {result['flagged']} high-risk users; "
+			f"{result['created']} cases opened, {result['updated']} updated"
+		)
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-identity-index")
+@pass_context
+def rebuild_identity_index(context):
+	"""Rebuild the duplicate-identity blocking keys and match candidates for all KYC users and household members
+
+	Example:
+	  bench --site mysite rebuild-identity-index
+	"""
+	from councilsonline.utils.identity_match import rebuild_identity_index as rebuild
+
+	site = get_site(context)
+
+	frappe.init(site=site)
+	frappe.connect()
+
+	try:
+		result = rebuild()
+		click.echo(
+			f"Indexed {result['identities']} identities in {result['blocks']} blocks "
+			f"({result['skipped_blocks']} oversized blocks skipped); {result['candidates']} candidate pairs"
+		)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-household-graph")
+@pass_context
+def rebuild_household_graph(context):
+	"""Rebuild the household graph (households, members, bank accounts, GCash numbers) and its components
+
+	Example:
+	  bench --site mysite rebuild-household-graph
+	"""
+	from councilsonline.utils.household_graph import rebuild_household_graph as rebuild
+
+	site = get_site(context)
+
+	frappe.init(site=site)
+	frappe.connect()
+
+	try:
+		result = rebuild()
+		click.echo(f"Rebuilt {result['nodes']} nodes and {result['edges']} links in {result['components']} components")
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
 # Export commands for registration in hooks.py
 commands = [
 	install_config_packs,
 	list_config_packs,
 	show_config_pack,
+	rebuild_request_counters,
+	reconcile_cost_ledger,
+	fraud_sweep,
+	rebuild_identity_index,
+	rebuild_household_graph,
 ]
@@ -3,14 +3,15 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import get_datetime, now_datetime, add_days, getdate
-from councilsonline.councilsonline.doctype.request.request import calculate_working_days_between
+from frappe.utils import now_datetime
+from councilsonline.utils.statutory_clock import get_clock_metrics
 
 
 class AssessmentProject(Document):
 	def validate(self):
 		"""Validate assessment project data"""
 		self.validate_unique_request()
+		self.load_ledger_totals()
 		self.calculate_clock_metrics()
 		self.update_current_stage()
 
@@ -24,45 +25,24 @@ class AssessmentProject(Document):
 			if existing:
 				frappe.throw(f"Assessment Project already exists for Request {self.request}")
 
+	def load_ledger_totals(self):
+		"""Keep the ledger-maintained totals from the database, not from a stale copy of the form"""
+		if not self.is_new():
+			self.actual_hours, self.actual_cost = frappe.db.get_value(
+				self.doctype, self.name, ["actual_hours", "actual_cost"]
+			) or (self.actual_hours, self.actual_cost)
+
 	def calculate_clock_metrics(self):
 		"""Calculate statutory clock metrics with exclusions"""
 		if not self.started_date or not self.statutory_clock_days:
 			return
 
-		# Calculate total days excluded from clock suspensions
-		total_excluded = 0
-		for exclusion in self.clock_exclusions:
-			if exclusion.working_days_excluded:
-				total_excluded += exclusion.working_days_excluded
-
-		self.total_days_excluded = total_excluded
+		# Overlapping and open suspensions are merged, so each day is excluded once
+		exclusions = [(e.started_date, e.ended_date) for e in self.clock_exclusions]
 
-		# Calculate working days elapsed (excluding suspensions)
+		# Calculate working days elapsed, remaining, excluded and the working-day deadline
 		try:
-			start_dt = get_datetime(self.started_date)
-			now_dt = now_datetime()
-
-			# Calculate gross working days between start and now
-			gross_days = calculate_working_days_between(start_dt, now_dt)
-
-			# Net working days = gross days - excluded days
-			self.working_days_elapsed = max(0, gross_days - total_excluded)
-
-			# Working days remaining
-			self.working_days_remaining = max(
-				0,
-				self.statutory_clock_days - self.working_days_elapsed
-			)
-
-			# Calculate statutory deadline
-			# Start with clock days + excluded days to get gross days needed
-			gross_days_needed = self.statutory_clock_days + total_excluded
-
-			# Add gross days to start date to get deadline
-			self.statutory_deadline = add_days(
-				getdate(self.started_date),
-				gross_days_needed
-			)
+			self.update(get_clock_metrics(self.started_date, self.statutory_clock_days, exclusions))
 
 		except Exception as e:
 			frappe.log_error(f"Error calculating clock metrics: {str(e)}")
@@ -83,25 +63,12 @@ class AssessmentProject(Document):
 		self.current_stage = "All Stages Complete"
 
 	def rollup_time_and_cost(self):
-		"""Rollup actual hours and cost from linked Project Tasks"""
-		# Get all Project Tasks linked to this assessment project
-		tasks = frappe.get_all(
-			"Project Task",
-			filters={"assessment_project": self.name},
-			fields=["name", "actual_hours", "total_cost"]
-		)
-
-		total_hours = 0
-		total_cost = 0
+		"""Rollup actual hours and cost from the cost ledger of linked Project Tasks"""
+		from councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry import get_ledger_totals
 
-		for task in tasks:
-			if task.actual_hours:
-				total_hours += task.actual_hours
-			if task.total_cost:
-				total_cost += task.total_cost
-
-		self.actual_hours = total_hours
-		self.actual_cost = total_cost
+		totals = get_ledger_totals("assessment_project", self.name).get(self.name) or {}
+		self.actual_hours = totals.get("hours", 0)
+		self.actual_cost = totals.get("cost", 0)
 
 	def create_stages_from_template(self):
 		"""Create stage instances from assessment template"""
@@ -134,109 +101,16 @@ class AssessmentProject(Document):
 		"""
 		Auto-create Project Tasks from Task Templates for all stages
 		This creates a complete project plan with all tasks assigned
+
+		The plan is computed in memory and inserted in one statement (see
+		councilsonline.utils.task_plan).
 		"""
+		from councilsonline.utils.task_plan import materialise_task_plan
+
 		if not self.stages:
 			frappe.throw("No stages found. Create stages from template first.")
 
-		total_tasks_created = 0
-
-		for stage_instance in self.stages:
-			# Get all task templates for this stage type
-			from councilsonline.councilsonline.doctype.task_template.task_template import get_tasks_for_stage_type
-
-			task_templates = get_tasks_for_stage_type(stage_instance.stage_type)
-
-			if not task_templates:
-				frappe.msgprint(
-					f"No task templates found for stage type: {stage_instance.stage_type}",
-					indicator="orange"
-				)
-				continue
-
-			created_tasks_in_stage = []
-
-			# Batch fetch all templates to avoid N+1 query
-			template_names = [t.name for t in task_templates]
-			templates_data = frappe.get_all(
-				"Task Template",
-				filters={"name": ["in", template_names]},
-				fields=["*"]
-			)
-			# Create lookup map
-			templates_map = {t.name: t for t in templates_data}
-
-			for template_data in task_templates:
-				# Get template from pre-fetched map
-				template = templates_map.get(template_data.name)
-				if not template:
-					continue
-				# Convert dict to object-like access
-				class TemplateObj:
-					def __init__(self, data):
-						for key, value in data.items():
-							setattr(self, key, value)
-				template = TemplateObj(template)
-
-				# Calculate due date based on stage timeline and task sequence
-				task_due_date = self.calculate_task_due_date(
-					stage_instance,
-					template.estimated_hours,
-					created_tasks_in_stage
-				)
-
-				# Determine assignee based on team/role
-				assignee = self.get_assignee_for_task(
-					template.required_role,
-					template.required_team
-				)
-
-				# Render task description with context
-				task_description = self.render_task_description(template, stage_instance)
-
-				# Calculate start date (same as due date - estimated hours converted to days)
-				from datetime import timedelta
-				estimated_days = template.estimated_hours / 8 if template.estimated_hours else 0
-				task_start_date = task_due_date - timedelta(days=estimated_days)
-
-				# Create Project Task
-				task = frappe.get_doc({
-					"doctype": "Project Task",
-					"title": template.task_title,
-					"description": task_description,
-					"assessment_project": self.name,
-					"assessment_stage": stage_instance.stage_name,
-					"request": self.request,
-					"assigned_by": self.project_owner or frappe.session.user,
-					"assigned_to": assignee,
-					"assigned_role": template.required_role,
-					"estimated_hours": template.estimated_hours,
-					"priority": template.priority,
-					"start_date": task_start_date.date() if hasattr(task_start_date, 'date') else task_start_date,
-					"due_date": task_due_date,
-					"checklist_template": template.checklist_template,
-					"task_type": "Auto",  # Mark as auto-generated
-					"status": "Open"
-				})
-
-				task.insert(ignore_permissions=True)
-
-				created_tasks_in_stage.append({
-					"task": task.name,
-					"template": template.name,
-					"estimated_hours": template.estimated_hours,
-					"task_type": template.task_type
-				})
-
-				total_tasks_created += 1
-
-				# Link first task as primary task for stage
-				if template.task_sequence == 1:
-					stage_instance.db_set("primary_task", task.name, update_modified=False)
-
-			# Update stage estimated hours from sum of task hours
-			if created_tasks_in_stage:
-				total_stage_hours = sum(t["estimated_hours"] for t in created_tasks_in_stage)
-				stage_instance.db_set("estimated_hours", total_stage_hours, update_modified=False)
+		total_tasks_created = materialise_task_plan(self)
 
 		frappe.db.commit()
 
@@ -248,88 +122,11 @@ class AssessmentProject(Document):
 
 		return total_tasks_created
 
-	def calculate_task_due_date(self, stage_instance, task_hours, previous_tasks):
-		"""
-		Calculate task due date based on assessment timeline and task dependencies
-
-		Args:
-			stage_instance: Assessment Stage Instance
-			task_hours: Estimated hours for this task
-			previous_tasks: List of tasks already created in this stage
-
-		Returns:
-			date: Calculated due date
-		"""
-		# Start from assessment project start date
-		from frappe.utils import add_to_date
-
-		start_date = get_datetime(self.started_date) if self.started_date else now_datetime()
-
-		# Add hours from all previous sequential tasks
-		# (Parallel tasks don't affect timeline)
-		total_previous_hours = 0
-		for task_data in previous_tasks:
-			if task_data.get("task_type") == "Sequential":
-				total_previous_hours += task_data["estimated_hours"]
-
-		# Convert hours to working days (assume 8-hour workday)
-		working_days_offset = int((total_previous_hours + task_hours) / 8)
-
-		# Add working days to start date
-		from councilsonline.councilsonline.doctype.request.request import add_working_days
-		due_date = add_working_days(start_date, working_days_offset)
-
-		return due_date
-
-	def get_assignee_for_task(self, required_role, required_team):
-		"""
-		Get user to assign task to based on role and team
-
-		Priority:
-		1) Team member with required role
-		2) Any user with required role
-		3) Project owner (fallback)
-
-		Args:
-			required_role: Role required for the task
-			required_team: Preferred team (optional)
-
-		Returns:
-			str: User email to assign to
-		"""
-		# Option 1: Find user with required role in required team
-		if required_team:
-			team_members = self.get_team_members(required_team)
-			for member in team_members:
-				user_roles = frappe.get_roles(member)
-				if required_role in user_roles:
-					return member
-
-		# Option 2: Find any user with required role (prefer active users)
-		users_with_role = frappe.get_all(
-			"Has Role",
-			filters={
-				"role": required_role,
-				"parenttype": "User"
-			},
-			fields=["parent"],
-			limit=1
-		)
-
-		if users_with_role:
-			user = users_with_role[0].parent
-			# Check if user is enabled
-			if frappe.db.get_value("User", user, "enabled"):
-				return user
-
-		# Option 3: Fallback to project owner
-		return self.project_owner or frappe.session.user
-
 	def get_team_members(self, team_name):
 		"""
 		Get list of users in a team
 
-		TODO: Integrate with Team DocType or User Groups once implemented
+		Teams are User Groups named after the Task Template's required team.
 
 		Args:
 			team_name: Team name
@@ -337,46 +134,14 @@ class AssessmentProject(Document):
 		Returns:
 			list: List of user emails in the team
 		"""
-		# For now, return empty list
-		# In future, integrate with User Groups or custom Team DocType
-		# Example:
-		# if frappe.db.exists("User Group", team_name):
-		#     return frappe.get_doc("User Group", team_name).get_members()
-
-		return []
-
-	def render_task_description(self, template, stage_instance):
-		"""
-		Render task description with context variables using Jinja2
-
-		Args:
-			template: Task Template document
-			stage_instance: Assessment Stage Instance
-
-		Returns:
-			str: Rendered description with context
-		"""
-		if not template.task_description:
-			return ""
+		if not team_name or not frappe.db.exists("User Group", team_name):
+			return []
 
-		# Get request document for context
-		request = frappe.get_doc("Request", self.request) if self.request else None
-
-		context = {
-			"request": request,
-			"stage": stage_instance,
-			"project": self,
-			"doc": request  # Alias for Jinja compatibility
-		}
-
-		# Use Jinja2 to render dynamic descriptions
-		try:
-			from frappe.utils.jinja import render_template
-			return render_template(template.task_description, context)
-		except Exception as e:
-			frappe.log_error(f"Error rendering task description: {str(e)}")
-			# Return plain description if rendering fails
-			return template.task_description
+		return frappe.get_all(
+			"User Group Member",
+			filters={"parent": team_name, "parenttype": "User Group"},
+			pluck="user"
+		)
 
 	def add_clock_exclusion(self, exclusion_type, reference_doctype=None, reference_name=None):
 		"""Add a clock exclusion period (e.g., RFI, S37)"""
@@ -444,3 +209,16 @@ def create_tasks_from_template(assessment_project_name):
 		"tasks_created": tasks_created,
 		"stages": len(doc.stages)
 	}
+
+
+@frappe.whitelist()
+def get_task_schedule(assessment_project_name):
+	"""
+	API method to get the critical-path schedule of a project's tasks
+
+	Returns earliest/latest start and finish, slack and the critical path
+	"""
+	from councilsonline.utils.task_schedule import get_project_schedule
+
+	frappe.get_doc("Assessment Project", assessment_project_name).check_permission("read")
+	return get_project_schedule(assessment_project_name)
@@ -0,0 +1,226 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt, getdate, now
+
+from councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter import (
+	OPEN_TASK_STATUSES
+)
+
+
+WORKLOAD_FIELDS = ("open_hours", "open_tasks")
+MANAGER_ROLES = ("System Manager", "Council Manager")
+
+
+class AssigneeCapacity(Document):
+	"""Open workload and leave of a user, read by the assignment engine"""
+
+	def validate(self):
+		if self.unavailable_from and self.unavailable_until and getdate(self.unavailable_until) < getdate(self.unavailable_from):
+			frappe.throw("On Leave Until cannot be before On Leave From")
+
+
+def get_workload(doc):
+	"""
+	Workload contribution of a single Project Task
+
+	Returns:
+		dict: {"open_hours", "open_tasks"} for the task's assignee; empty when
+		the task is closed or unassigned
+	"""
+	if not doc.assigned_to or doc.status not in OPEN_TASK_STATUSES:
+		return {}
+	return {"open_hours": flt(doc.estimated_hours), "open_tasks": 1}
+
+
+def on_task_update(doc, method=None):
+	"""
+	doc_events hook (on_update) for Project Task
+
+	Moves the task's workload from its previous assignee to its current one,
+	so status, estimate and reassignment changes are all handled.
+	"""
+	before = doc.get_doc_before_save()
+	old = get_workload(before) if before else {}
+	new = get_workload(doc)
+
+	if before and before.assigned_to == doc.assigned_to:
+		apply_capacity_delta(doc.assigned_to, {field: new.get(field, 0) - old.get(field, 0) for field in WORKLOAD_FIELDS})
+		return
+
+	if before and before.assigned_to:
+		apply_capacity_delta(before.assigned_to, {field: -amount for field, amount in old.items()})
+	if doc.assigned_to:
+		apply_capacity_delta(doc.assigned_to, new, assigned=True)
+
+
+def on_task_delete(doc, method=None):
+	"""doc_events hook (after_delete) for Project Task"""
+	if doc.assigned_to:
+		apply_capacity_delta(doc.assigned_to, {field: -amount for field, amount in get_workload(doc).items()})
+
+
+def apply_capacity_delta(user, deltas, assigned=False):
+	"""
+	Atomically add workload deltas to a user's capacity row
+
+	If the row does not exist yet it is rebuilt from Project Task, which
+	already reflects the change being applied. If a concurrent first write
+	inserts the row in the meantime, the deltas are added to that row instead.
+
+	Args:
+		user: User
+		deltas: {"open_hours", "open_tasks"}
+		assigned: Also stamp last_assigned (the user was just given work)
+	"""
+	deltas = {field: amount for field, amount in deltas.items() if amount and field in WORKLOAD_FIELDS}
+	if not user or not (deltas or assigned):
+		return
+
+	if not frappe.db.exists("Assignee Capacity", user):
+		try:
+			rebuild_capacity(user)
+			return
+		except frappe.DuplicateEntryError:
+			# The other writer's row does not include this change yet
+			pass
+
+	assignments = [f"`{field}` = GREATEST(`{field}` + %({field})s, 0)" for field in deltas]
+	if assigned:
+		assignments.append("`last_assigned` = %(modified)s")
+	frappe.db.sql(f"""
+		UPDATE `tabAssignee Capacity`
+		SET {", ".join(assignments)}, `modified` = %(modified)s
+		WHERE `name` = %(user)s
+	""", {**deltas, "modified": now(), "user": user})
+
+
+def count_workload(user=None):
+	"""
+	Open estimated hours and open tasks per assignee with one GROUP BY query
+
+	Args:
+		user: Limit to one user (optional; all assignees when omitted)
+
+	Returns:
+		dict: {user: {"open_hours", "open_tasks"}}
+	"""
+	condition = "AND `assigned_to` = %(user)s" if user else ""
+	rows = frappe.db.sql(f"""
+		SELECT `assigned_to`, SUM(IFNULL(`estimated_hours`, 0)) AS open_hours, COUNT(*) AS open_tasks
+		FROM `tabProject Task`
+		WHERE `assigned_to` IS NOT NULL AND `status` IN %(open_statuses)s {condition}
+		GROUP BY `assigned_to`
+	""", {"user": user, "open_statuses": OPEN_TASK_STATUSES}, as_dict=True)
+
+	return {row.assigned_to: {"open_hours": flt(row.open_hours), "open_tasks": int(row.open_tasks)} for row in rows}
+
+
+def rebuild_capacity(user):
+	"""Recompute one user's workload from Project Task and store it; leave settings are kept"""
+	workload = count_workload(user).get(user) or {"open_hours": 0, "open_tasks": 0}
+
+	if frappe.db.exists("Assignee Capacity", user):
+		frappe.db.set_value(
+			"Assignee Capacity", user,
+			{**workload, "last_rebuilt": now()},
+			update_modified=True
+		)
+	else:
+		frappe.get_doc({
+			"doctype": "Assignee Capacity",
+			"user": user,
+			"last_rebuilt": now(),
+			**workload
+		}).db_insert()
+
+	return frappe._dict(user=user, **workload)
+
+
+def rebuild_all_capacity():
+	"""
+	Rebuild the workload of every user with open tasks or a capacity row
+
+	Existing rows are updated in place so leave and limits set by managers
+	survive; users seen for the first time get new rows.
+
+	Returns:
+		int: Number of capacity rows written
+	"""
+	workload = count_workload()
+	existing = set(frappe.get_all("Assignee Capacity", pluck="name"))
+	timestamp = now()
+
+	if existing:
+		frappe.db.bulk_update(
+			"Assignee Capacity",
+			{
+				user: {**(workload.get(user) or {"open_hours": 0, "open_tasks": 0}), "last_rebuilt": timestamp}
+				for user in existing
+			}
+		)
+
+	rows = [
+		(
+			user, user, timestamp, timestamp, "Administrator", "Administrator", timestamp, 1,
+			values["open_hours"], values["open_tasks"]
+		)
+		for user, values in workload.items()
+		if user not in existing
+	]
+	if rows:
+		frappe.db.bulk_insert(
+			"Assignee Capacity",
+			fields=[
+				"name", "user", "creation", "modified", "owner", "modified_by", "last_rebuilt",
+				"available_for_assignment", *WORKLOAD_FIELDS
+			],
+			values=rows
+		)
+
+	return len(existing) + len(rows)
+
+
+@frappe.whitelist()
+def rebuild_assignee_capacity(user=None):
+	"""
+	Rebuild workload for one user or all users (System Manager only)
+
+	Args:
+		user: User (optional; rebuilds all when omitted)
+	"""
+	if "System Manager" not in frappe.get_roles():
+		frappe.throw("Only System Managers can rebuild assignee capacity", frappe.PermissionError)
+
+	if user:
+		return {"success": True, "rebuilt": 1, "capacity": rebuild_capacity(user)}
+
+	return {"success": True, "rebuilt": rebuild_all_capacity()}
+
+
+@frappe.whitelist()
+def rebalance_assignments(assessment_project=None, role=None, strategy="Least Loaded", dry_run=0):
+	"""
+	Reassign open, not yet started Project Tasks across the holders of their role (managers only)
+
+	Args:
+		assessment_project: Limit to one Assessment Project (optional)
+		role: Limit to tasks needing this role (optional)
+		strategy: "Least Loaded" or "Round Robin"
+		dry_run: Return the planned moves without saving them
+
+	Returns:
+		dict: {"success", "moves": [{"task", "from", "to", "hours"}], "dry_run"}
+	"""
+	if not set(MANAGER_ROLES) & set(frappe.get_roles()):
+		frappe.throw("Only managers can rebalance task assignments", frappe.PermissionError)
+
+	from councilsonline.utils.assignment import rebalance_open_tasks
+
+	dry_run = cint(dry_run)
+	moves = rebalance_open_tasks(
+		assessment_project=assessment_project, role=role, strategy=strategy, dry_run=dry_run
+	)
+	return {"success": True, "moves": moves, "dry_run": bool(dry_run)}
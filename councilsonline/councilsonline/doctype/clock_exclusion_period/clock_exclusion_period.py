@@ -118,7 +118,7 @@ class ClockExclusionPeriod(Document):
 			if end_dt < start_dt:
 				frappe.throw("End date cannot be before start date")
 
-			# Calculate working days (excludes weekends and NZ holidays)
+			# Calculate working days (excludes weekends, holidays and council closures)
 			self.working_days_excluded = calculate_working_days_between(
 				start_dt, end_dt
 			)
@@ -9,12 +9,16 @@ from frappe.utils import now, nowdate
 class CommunicationLog(Document):
     def autoname(self):
         """Generate communication number"""
+        from councilsonline.utils.sequence import next_db_series_values, seed_db_series
+
         # Get request short name for better identification
         request = frappe.db.get_value("Request", self.request, "request_number")
         if request:
-            # Count existing communications for this request
-            count = frappe.db.count("Communication Log", {"request": self.request})
-            self.communication_number = f"COMM-{request}-{count + 1:04d}"
+            # One series per Request: kept in tabSeries, too many for Redis counters.
+            # Seeded from communications numbered before the series existed
+            prefix = f"COMM-{request}-"
+            seed_db_series(prefix, lambda: frappe.db.count("Communication Log", {"request": self.request}))
+            self.communication_number = f"{prefix}{next_db_series_values([prefix])[prefix]:04d}"
             self.name = self.communication_number
 
     def validate(self):
@@ -0,0 +1,286 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now
+
+
+# Project Task fields posted to the ledger, as {task field: ledger field}
+LEDGER_FIELDS = {"actual_hours": "hours", "total_cost": "cost"}
+LINK_FIELDS = ("request", "assessment_project")
+
+# Totals each ledger field is accumulated into, per linked doctype
+REQUEST_TOTALS = {"cost": ("total_task_cost", "total_amount_due")}
+PROJECT_TOTALS = {"hours": ("actual_hours",), "cost": ("actual_cost",)}
+
+
+class CostLedgerEntry(Document):
+	"""Append-only time and cost movement of a Project Task"""
+	pass
+
+
+def get_amounts(doc):
+	"""Ledger amounts of a Project Task's current values: {"hours", "cost"}"""
+	return {ledger_field: flt(doc.get(task_field)) for task_field, ledger_field in LEDGER_FIELDS.items()}
+
+
+def get_task_movements(before, doc):
+	"""
+	Ledger movements for a Project Task change
+
+	Args:
+		before: Task before the change (None on insert)
+		doc: Task after the change (None on delete)
+
+	Returns:
+		list: [(request, assessment_project, {"hours", "cost"})] with zero
+		movements left out; a re-linked task moves its amounts off the old
+		request/project and onto the new one
+	"""
+	old = get_amounts(before) if before else dict.fromkeys(LEDGER_FIELDS.values(), 0)
+	new = get_amounts(doc) if doc else dict.fromkeys(LEDGER_FIELDS.values(), 0)
+	old_keys = tuple(before.get(field) for field in LINK_FIELDS) if before else (None, None)
+	new_keys = tuple(doc.get(field) for field in LINK_FIELDS) if doc else old_keys
+
+	if old_keys == new_keys:
+		movements = [(*new_keys, {field: new[field] - old[field] for field in new})]
+	else:
+		movements = [
+			(*old_keys, {field: -amount for field, amount in old.items()}),
+			(*new_keys, new)
+		]
+
+	return [
+		(request, project, amounts)
+		for request, project, amounts in movements
+		if (request or project) and any(amounts.values())
+	]
+
+
+def on_task_update(doc, method=None):
+	"""doc_events hook (on_update) for Project Task: post the change in hours and cost"""
+	for request, project, amounts in get_task_movements(doc.get_doc_before_save(), doc):
+		post_cost_entry(request, project, amounts, project_task=doc.name)
+
+
+def on_task_delete(doc, method=None):
+	"""doc_events hook (after_delete) for Project Task: reverse the task's hours and cost"""
+	for request, project, amounts in get_task_movements(doc, None):
+		post_cost_entry(request, project, amounts, project_task=doc.name, entry_type="Task Deleted")
+
+
+def post_cost_entry(request, assessment_project, amounts, project_task=None, entry_type="Task Update"):
+	"""Append a ledger entry and apply it to the cached totals"""
+	frappe.get_doc({
+		"doctype": "Cost Ledger Entry",
+		"request": request,
+		"assessment_project": assessment_project,
+		"project_task": project_task,
+		"entry_type": entry_type,
+		"hours": amounts.get("hours", 0),
+		"cost": amounts.get("cost", 0),
+		"posting_time": now(),
+		"recorded_by": frappe.session.user
+	}).db_insert()
+
+	apply_cost_delta(request, assessment_project, amounts)
+
+
+def get_request_totals():
+	"""REQUEST_TOTALS limited to the costing fields installed on Request"""
+	meta = frappe.get_meta("Request")
+	return {
+		ledger_field: tuple(field for field in fields if meta.has_field(field))
+		for ledger_field, fields in REQUEST_TOTALS.items()
+	}
+
+
+def apply_delta_sql(doctype, name, totals, amounts):
+	"""Atomically add ledger amounts to a record's total fields without loading or saving it"""
+	assignments = [
+		f"`{field}` = IFNULL(`{field}`, 0) + %({ledger_field})s"
+		for ledger_field, fields in totals.items()
+		if amounts.get(ledger_field)
+		for field in fields
+	]
+	if not name or not assignments:
+		return
+
+	frappe.db.sql(f"""
+		UPDATE `tab{doctype}`
+		SET {", ".join(assignments)}
+		WHERE `name` = %(name)s
+	""", {**amounts, "name": name})
+
+
+def apply_cost_delta(request, assessment_project, amounts):
+	"""Add ledger amounts to the Request's and Assessment Project's cached totals"""
+	apply_delta_sql("Request", request, get_request_totals(), amounts)
+	apply_delta_sql("Assessment Project", assessment_project, PROJECT_TOTALS, amounts)
+
+
+def get_ledger_totals(group_by, name=None):
+	"""
+	Sum the ledger per Request or Assessment Project with one GROUP BY query
+
+	Args:
+		group_by: "request" or "assessment_project"
+		name: Limit to one record (optional)
+
+	Returns:
+		dict: {name: {"hours", "cost"}}
+	"""
+	if group_by not in LINK_FIELDS:
+		frappe.throw(f"Cannot group the cost ledger by {group_by}")
+
+	condition = f"AND `{group_by}` = %(name)s" if name else ""
+	rows = frappe.db.sql(f"""
+		SELECT `{group_by}` AS name, SUM(`hours`) AS hours, SUM(`cost`) AS cost
+		FROM `tabCost Ledger Entry`
+		WHERE `{group_by}` IS NOT NULL {condition}
+		GROUP BY `{group_by}`
+	""", {"name": name}, as_dict=True)
+
+	return {row.name: {"hours": flt(row.hours), "cost": flt(row.cost)} for row in rows}
+
+
+def get_task_totals(request=None):
+	"""
+	Ledger balance each task should have, from the Project Task table
+
+	Returns:
+		dict: {(task, request, assessment_project): {"hours", "cost"}}
+	"""
+	condition = "AND `request` = %(request)s" if request else ""
+	rows = frappe.db.sql(f"""
+		SELECT `name`, `request`, `assessment_project`, `actual_hours`, `total_cost`
+		FROM `tabProject Task`
+		WHERE (`request` IS NOT NULL OR `assessment_project` IS NOT NULL) {condition}
+	""", {"request": request}, as_dict=True)
+
+	return {(row.name, row.request, row.assessment_project): get_amounts(row) for row in rows}
+
+
+def get_posted_totals(request=None):
+	"""Ledger balance per task and link: {(task, request, assessment_project): {"hours", "cost"}}"""
+	condition = "WHERE `request` = %(request)s" if request else ""
+	rows = frappe.db.sql(f"""
+		SELECT `project_task`, `request`, `assessment_project`, SUM(`hours`) AS hours, SUM(`cost`) AS cost
+		FROM `tabCost Ledger Entry`
+		{condition}
+		GROUP BY `project_task`, `request`, `assessment_project`
+	""", {"request": request}, as_dict=True)
+
+	return {
+		(row.project_task, row.request, row.assessment_project): {"hours": flt(row.hours), "cost": flt(row.cost)}
+		for row in rows
+	}
+
+
+def reconcile_cost_ledger(request=None):
+	"""
+	Bring the ledger and cached totals back in line with the Project Task table
+
+	Every task/link whose ledger balance differs from the task's current hours
+	and cost gets a Reconciliation entry for the difference (this also seeds
+	the ledger for tasks logged before it existed). Request and Assessment
+	Project totals are then set from the ledger sums.
+
+	Args:
+		request: Limit to one Request (optional; everything when omitted)
+
+	Returns:
+		dict: {"entries": Reconciliation entries posted, "requests": Requests
+		updated, "projects": Assessment Projects updated}
+	"""
+	expected = get_task_totals(request)
+	posted = get_posted_totals(request)
+	timestamp = now()
+	user = frappe.session.user
+
+	rows = []
+	for key in expected.keys() | posted.keys():
+		task, task_request, project = key
+		target = expected.get(key) or dict.fromkeys(LEDGER_FIELDS.values(), 0)
+		balance = posted.get(key) or dict.fromkeys(LEDGER_FIELDS.values(), 0)
+		difference = {field: target[field] - balance[field] for field in target}
+		if any(abs(amount) > 1e-9 for amount in difference.values()):
+			rows.append((
+				frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+				task_request, project, task, "Reconciliation",
+				difference["hours"], difference["cost"], timestamp, user
+			))
+
+	if rows:
+		frappe.db.bulk_insert(
+			"Cost Ledger Entry",
+			fields=[
+				"name", "creation", "modified", "owner", "modified_by",
+				"request", "assessment_project", "project_task", "entry_type",
+				"hours", "cost", "posting_time", "recorded_by"
+			],
+			values=rows
+		)
+
+	request_totals = get_ledger_totals("request", request)
+	if request:
+		request_totals.setdefault(request, dict.fromkeys(LEDGER_FIELDS.values(), 0))
+	if get_request_totals()["cost"]:
+		for name, totals in request_totals.items():
+			set_request_totals(name, totals["cost"])
+
+	if request:
+		projects = frappe.get_all("Assessment Project", filters={"request": request}, pluck="name")
+		project_totals = {
+			name: get_ledger_totals("assessment_project", name).get(name) or dict.fromkeys(LEDGER_FIELDS.values(), 0)
+			for name in projects
+		}
+	else:
+		project_totals = get_ledger_totals("assessment_project")
+	if project_totals:
+		frappe.db.bulk_update(
+			"Assessment Project",
+			{
+				name: {"actual_hours": totals["hours"], "actual_cost": totals["cost"]}
+				for name, totals in project_totals.items()
+			},
+			update_modified=False
+		)
+
+	return {"entries": len(rows), "requests": len(request_totals), "projects": len(project_totals)}
+
+
+def set_request_totals(request, task_cost):
+	"""Set a Request's task cost and recompute its amount due from the other costing fields"""
+	fields = get_request_totals()["cost"]
+	values = {"task_cost": task_cost, "request": request}
+	assignments = ["`total_task_cost` = %(task_cost)s"] if "total_task_cost" in fields else []
+	if "total_amount_due" in fields:
+		meta = frappe.get_meta("Request")
+		parts = [
+			f"IFNULL(`{field}`, 0)"
+			for field in ("application_fee", "total_disbursements")
+			if meta.has_field(field)
+		]
+		assignments.append(f"`total_amount_due` = {' + '.join(parts + ['%(task_cost)s'])}")
+
+	frappe.db.sql(f"""
+		UPDATE `tabRequest`
+		SET {", ".join(assignments)}
+		WHERE `name` = %(request)s
+	""", values)
+
+
+@frappe.whitelist()
+def rebuild_cost_totals(request=None):
+	"""
+	Reconcile the cost ledger for one Request or all Requests (System Manager only)
+
+	Args:
+		request: Request name (optional; reconciles everything when omitted)
+	"""
+	if "System Manager" not in frappe.get_roles():
+		frappe.throw("Only System Managers can rebuild cost totals", frappe.PermissionError)
+
+	return {"success": True, **reconcile_cost_ledger(request)}
@@ -12,6 +12,7 @@ class Council(Document):
 		"""Validate council data"""
 		self.validate_council_code()
 		self.validate_license_dates()
+		self.validate_closure_periods()
 		self.set_defaults()
 
 	def validate_council_code(self):
@@ -29,6 +30,12 @@ class Council(Document):
 			if getdate(self.license_expiry_date) <= getdate(self.license_start_date):
 				frappe.throw("License Expiry Date must be after License Start Date")
 
+	def validate_closure_periods(self):
+		"""Validate that each closure period ends on or after its start"""
+		for period in self.get("closure_periods") or []:
+			if period.from_date and period.to_date and getdate(period.to_date) < getdate(period.from_date):
+				frappe.throw(f"Row {period.idx}: Closure end date cannot be before its start date")
+
 	def set_defaults(self):
 		"""Set default values"""
 		# Set default colors if not provided
@@ -0,0 +1,8 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class CouncilClosurePeriod(Document):
+	pass
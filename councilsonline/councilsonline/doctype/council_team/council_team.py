@@ -11,6 +11,12 @@ class CouncilTeam(Document):
 		self.validate_business_hours()
 		self.validate_durations()
 
+	def on_update(self):
+		# Business hours, durations and caps all shape the cached availability
+		from councilsonline.utils.availability import bump_team_version
+
+		bump_team_version(self.name)
+
 	def validate_business_hours(self):
 		"""Ensure no duplicate days in business hours"""
 		if self.business_hours:
@@ -28,30 +34,15 @@ class CouncilTeam(Document):
 
 	def get_business_hours_dict(self):
 		"""Return business hours as a dictionary keyed by day name"""
-		from datetime import timedelta, time as datetime_time
+		from councilsonline.utils.availability import to_time
 
 		hours = {}
 		if self.business_hours:
 			for bh in self.business_hours:
 				if bh.is_open:
-					start_time = bh.start_time
-					end_time = bh.end_time
-
-					if isinstance(start_time, timedelta):
-						total_seconds = int(start_time.total_seconds())
-						hours_val = total_seconds // 3600
-						minutes = (total_seconds % 3600) // 60
-						start_time = datetime_time(hours_val, minutes)
-
-					if isinstance(end_time, timedelta):
-						total_seconds = int(end_time.total_seconds())
-						hours_val = total_seconds // 3600
-						minutes = (total_seconds % 3600) // 60
-						end_time = datetime_time(hours_val, minutes)
-
 					hours[bh.day_of_week] = {
-						"start_time": start_time,
-						"end_time": end_time
+						"start_time": to_time(bh.start_time),
+						"end_time": to_time(bh.end_time)
 					}
 		return hours
 
@@ -18,34 +18,16 @@ class EligibilityCriteriaResult(Document):
 			self.auto_determine_eligibility()
 
 	def auto_determine_eligibility(self):
-		"""
-		Auto-determine eligibility status based on score percentage
-		Rules:
-		- >= 80%: Eligible
-		- 60-79%: Partially Eligible (Needs Review)
-		- < 60%: Not Eligible
-		"""
+		"""Auto-determine eligibility status based on score percentage"""
 		if not self.score_percentage:
 			self.eligibility_status = "Needs Review"
 			return
 
-		percentage = flt(self.score_percentage)
-
-		if percentage >= 80:
-			self.eligibility_status = "Eligible"
-			self.final_decision = "Approved"
-		elif percentage >= 60:
-			self.eligibility_status = "Partially Eligible"
-			self.final_decision = "Pending Review"
-		else:
-			self.eligibility_status = "Not Eligible"
-			self.final_decision = "Rejected"
-
-		# Override if critical criteria not met
-		if not self.kyc_verified:
-			self.eligibility_status = "Not Eligible"
-			self.final_decision = "Rejected"
-			self.eligibility_notes = (self.eligibility_notes or "") + "\n[System] KYC verification is required."
+		self.eligibility_status, self.final_decision, note = determine_eligibility(
+			self.score_percentage, self.kyc_verified
+		)
+		if note:
+			self.eligibility_notes = (self.eligibility_notes or "") + note
 
 	def on_update(self):
 		"""Update linked Request status"""
@@ -56,3 +38,33 @@ class EligibilityCriteriaResult(Document):
 				request.add_comment("Comment", f"Eligibility check passed with {self.score_percentage:.1f}% score")
 			except Exception as e:
 				frappe.log_error(f"Failed to update request: {str(e)}")
+
+
+def determine_eligibility(score_percentage, kyc_verified):
+	"""
+	Eligibility status and decision for a score percentage
+	Rules:
+	- >= 80%: Eligible
+	- 60-79%: Partially Eligible (Needs Review)
+	- < 60%: Not Eligible
+
+	Returns:
+		tuple: (eligibility_status, final_decision, note to append to the notes or "")
+	"""
+	if not score_percentage:
+		return "Needs Review", None, ""
+
+	percentage = flt(score_percentage)
+
+	if percentage >= 80:
+		status, decision = "Eligible", "Approved"
+	elif percentage >= 60:
+		status, decision = "Partially Eligible", "Pending Review"
+	else:
+		status, decision = "Not Eligible", "Rejected"
+
+	# Override if critical criteria not met
+	if not kyc_verified:
+		return "Not Eligible", "Rejected", "\n[System] KYC verification is required."
+
+	return status, decision, ""
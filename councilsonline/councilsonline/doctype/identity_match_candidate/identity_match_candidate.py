@@ -0,0 +1,10 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class IdentityMatchCandidate(Document):
+	"""Pair of person records suspected to be the same person"""
+	pass
@@ -1,12 +1,20 @@
 # Copyright (c) 2025, CouncilsOnline and contributors
 # For license information, please see license.txt
 
+from datetime import timedelta
+
 import frappe
 from frappe.model.document import Document
-from frappe.utils import getdate, now
+from frappe.utils import flt, getdate, now
 
 
 class ProjectTask(Document):
+	def autoname(self):
+		"""TASK-YYYY-#####, from the same sequence bulk-created task plans reserve from"""
+		from councilsonline.utils.sequence import get_year, next_series_name
+
+		self.name = next_series_name(f"TASK-{get_year()}-", digits=5)
+
 	def validate(self):
 		"""Validation before saving"""
 		# Calculate costing
@@ -15,6 +23,9 @@ class ProjectTask(Document):
 		# Update timeliness
 		self.update_timeliness()
 
+		# Working-hour schedule from predecessors or dates
+		self.update_schedule()
+
 		# Set completion date when status changes to Completed
 		if self.status == "Completed" and not self.date_of_completion:
 			self.date_of_completion = getdate()
@@ -42,16 +53,61 @@ class ProjectTask(Document):
 			else:
 				self.timeliness = "Late"
 
+	def update_schedule(self):
+		"""
+		Set the task's earliest start/finish (working hours from the project start)
+
+		A moved due date is a slip and sets the finish from the date; otherwise
+		tasks with predecessors start when the last of them finishes, and tasks
+		without predecessors keep the dates they were given.
+		"""
+		if not self.assessment_project:
+			return
+
+		from councilsonline.utils.task_schedule import get_downstream_tasks, get_project_timeline
+
+		before = self.get_doc_before_save()
+		predecessors = [row.predecessor for row in self.predecessors if row.predecessor]
+		predecessors_changed = not before or predecessors != [
+			row.predecessor for row in before.predecessors if row.predecessor
+		]
+
+		if predecessors and predecessors_changed:
+			if self.name in predecessors or (not self.is_new() and get_downstream_tasks(self.name) & set(predecessors)):
+				frappe.throw("A task cannot depend on itself or on a task that depends on it")
+
+		timeline = get_project_timeline(self.assessment_project)
+		due_date_changed = before and getdate(before.due_date) != getdate(self.due_date)
+		hours_changed = not before or flt(before.estimated_hours) != flt(self.estimated_hours)
+
+		if due_date_changed:
+			self.earliest_finish_hours = timeline.hours_through(self.due_date)
+		elif predecessors and (predecessors_changed or hours_changed):
+			finishes = frappe.get_all(
+				"Project Task",
+				filters={"name": ["in", predecessors]},
+				pluck="earliest_finish_hours"
+			)
+			self.earliest_start_hours = max([flt(finish) for finish in finishes] + [0])
+			self.earliest_finish_hours = self.earliest_start_hours + flt(self.estimated_hours)
+			self.start_date = timeline.start_date(self.earliest_start_hours)
+			self.due_date = timeline.finish_date(self.earliest_finish_hours)
+		elif not predecessors and (hours_changed or predecessors_changed or before.start_date != self.start_date):
+			if self.start_date:
+				self.earliest_start_hours = timeline.hours_through(getdate(self.start_date) - timedelta(days=1))
+			if self.due_date:
+				self.earliest_finish_hours = timeline.hours_through(self.due_date)
+
 	def on_update(self):
 		"""Actions after document is updated"""
-		# Rollup costing to Request when task is updated
-		if self.request:
-			try:
-				request_doc = frappe.get_doc("Request", self.request)
-				request_doc.calculate_costing()
-				request_doc.save(ignore_permissions=True)
-			except Exception as e:
-				frappe.log_error(f"Error updating Request costing: {str(e)}")
+		# Move downstream tasks when this task's finish moved
+		before = self.get_doc_before_save()
+		if before and flt(before.earliest_finish_hours) != flt(self.earliest_finish_hours):
+			from councilsonline.utils.task_schedule import reschedule_successors
+			reschedule_successors(self.name)
+
+		# Hours and cost reach the Request and Assessment Project through the
+		# Cost Ledger Entry doc_events hook, as deltas
 
 
 @frappe.whitelist()
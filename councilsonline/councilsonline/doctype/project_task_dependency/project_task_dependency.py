@@ -0,0 +1,9 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class ProjectTaskDependency(Document):
+	"""Finish-to-start link from a predecessor Project Task"""
+	pass
@@ -1,28 +1,36 @@
 # Copyright (c) 2025, CouncilsOnline and contributors
 # For license information, please see license.txt
 
+import base64
+import json
+
 import frappe
 from frappe.model.document import Document
-from frappe.utils import now, add_days, getdate
+from frappe.utils import now, getdate, get_datetime, cint
+
+from councilsonline.utils.holiday_calendar import get_holiday_calendar
+from councilsonline.utils.link_enrichment import enrich_links, get_linked_values
+
+
+LINKED_USER_FIELDS = ("full_name", "email")
 
 
 class Request(Document):
     def autoname(self):
         """Generate request number based on type and year"""
+        from councilsonline.utils.sequence import get_year, next_series_name
+
         # For draft requests without request_type, use generic DRAFT prefix
         if not self.request_type:
-            from frappe.model.naming import make_autoname
-            self.name = make_autoname("DRAFT-.YYYY.-.#####")
+            self.name = next_series_name(f"DRAFT-{get_year()}-", digits=5)
             self.request_number = self.name
             return
 
         # Get prefix from request type
-        request_type_doc = frappe.get_doc("Request Type", self.request_type)
-        prefix = request_type_doc.type_code or "REQ"
+        prefix = frappe.get_cached_value("Request Type", self.request_type, "type_code") or "REQ"
 
         # Format: RC-2025-001, BC-2025-001, REQ-2025-001, etc.
-        from frappe.model.naming import make_autoname
-        self.name = make_autoname(f"{prefix}-.YYYY.-.###")
+        self.name = next_series_name(f"{prefix}-{get_year()}-", digits=3)
         self.request_number = self.name
 
     def validate(self):
@@ -46,6 +54,9 @@ class Request(Document):
         # 6. Calculate total fees
         self.calculate_total_fees()
 
+        # 7. Keep task costing maintained by the cost ledger
+        self.load_ledger_totals()
+
     def before_submit(self):
         """Actions before document is submitted"""
         # Set submitted date
@@ -105,6 +116,17 @@ class Request(Document):
         start_date = getdate(self.acknowledged_date or self.submitted_date)
         self.target_completion_date = add_working_days(start_date, sla_days)
 
+    def load_ledger_totals(self):
+        """Take ledger-maintained costing totals from the database, not from a stale copy of the form"""
+        if self.is_new():
+            return
+
+        from councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry import get_request_totals
+
+        fields = get_request_totals()["cost"]
+        if fields:
+            self.update(frappe.db.get_value(self.doctype, self.name, fields, as_dict=True) or {})
+
     def calculate_total_fees(self):
         """Calculate total fees from fee line items and set computed fields"""
         # Calculate subtotal from fees
@@ -149,33 +171,49 @@ class Request(Document):
             return self._total_fees_incl_gst
         return self.computed_total_fees_excl_gst + self.computed_gst_amount
 
+    def get_linked_users(self):
+        """
+        Get full name and email of the requester and agent
+
+        Both Users are fetched with a single query and memoised on the document
+        (and in the request-scoped link memo), so repeated reads of the
+        requester/agent properties do not hit the database again.
+
+        Returns:
+            dict: {user: {"full_name", "email"}} for requester and agent
+        """
+        key = (self.requester, self.agent)
+        cached = self.__dict__.get("_linked_users")
+        if not cached or cached[0] != key:
+            cached = (key, get_linked_values("User", key, LINKED_USER_FIELDS))
+            self._linked_users = cached
+        return cached[1]
+
+    def get_linked_user_value(self, user, fieldname):
+        """Get a field of the requester or agent User from the memoised lookup"""
+        if not user:
+            return None
+        return (self.get_linked_users().get(user) or {}).get(fieldname)
+
     @property
     def requester_name(self):
         """Get requester name from User document"""
-        if self.requester:
-            return frappe.db.get_value("User", self.requester, "full_name")
-        return None
+        return self.get_linked_user_value(self.requester, "full_name")
 
     @property
     def requester_email(self):
         """Get requester email from User document"""
-        if self.requester:
-            return frappe.db.get_value("User", self.requester, "email")
-        return None
+        return self.get_linked_user_value(self.requester, "email")
 
     @property
     def agent_name(self):
         """Get agent name from User document"""
-        if self.agent:
-            return frappe.db.get_value("User", self.agent, "full_name")
-        return None
+        return self.get_linked_user_value(self.agent, "full_name")
 
     @property
     def agent_email(self):
         """Get agent email from User document"""
-        if self.agent:
-            return frappe.db.get_value("User", self.agent, "email")
-        return None
+        return self.get_linked_user_value(self.agent, "email")
 
     @property
     def is_overdue(self):
@@ -197,7 +235,7 @@ class Request(Document):
     def send_acknowledgment_email(self):
         """Queue acknowledgment email to be sent in background (non-blocking)"""
         # Get requester email from User document
-        requester_email = frappe.db.get_value("User", self.requester, "email") if self.requester else None
+        requester_email = self.requester_email
         if not requester_email:
             return
 
@@ -354,48 +392,50 @@ class Request(Document):
             frappe.msgprint(f"Failed to create assessment project: {str(e)}", alert=True, indicator="red")
 
 
-def add_working_days(start_date, days):
-    """Add working days to a date (excluding weekends and public holidays)"""
-    current_date = getdate(start_date)
-    working_days_added = 0
-
-    while working_days_added < days:
-        current_date = add_days(current_date, 1)
+def prime_linked_users(request_docs):
+    """
+    Prime the requester/agent User memo of many Request documents at once
 
-        # Skip weekends
-        if current_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-            continue
+    Resolves every requester and agent across the batch with a single User
+    query, for list endpoints and batch jobs that read the virtual properties.
 
-        # Skip public holidays
-        if is_public_holiday(current_date):
-            continue
+    Args:
+        request_docs: Iterable of Request documents
 
-        working_days_added += 1
+    Returns:
+        list: The same documents, primed in place
+    """
+    request_docs = list(request_docs)
+    users = get_linked_values(
+        "User",
+        [user for doc in request_docs for user in (doc.requester, doc.agent)],
+        LINKED_USER_FIELDS
+    )
 
-    return current_date
+    for doc in request_docs:
+        key = (doc.requester, doc.agent)
+        doc._linked_users = (key, {user: users[user] for user in key if user in users})
 
+    return request_docs
 
-def calculate_working_days_between(start_date, end_date):
-    """Calculate working days between two dates (excluding weekends and holidays)"""
-    start = getdate(start_date)
-    end = getdate(end_date)
 
-    if start > end:
-        return 0
+def on_doctype_update():
+    """Composite indexes backing the keyset-paginated request lists"""
+    # get_my_requests: WHERE requester [AND workflow_state] ORDER BY modified, name
+    frappe.db.add_index("Request", ["requester", "modified", "name"], "requester_modified_index")
+    # get_all_requests_for_staff: optional workflow_state filter ORDER BY creation, name
+    frappe.db.add_index("Request", ["creation", "name"], "creation_name_index")
+    frappe.db.add_index("Request", ["workflow_state", "creation", "name"], "workflow_state_creation_index")
 
-    working_days = 0
-    current_date = start
 
-    while current_date <= end:
-        # Skip weekends
-        if current_date.weekday() < 5:  # Monday = 0, Friday = 4
-            # Skip public holidays
-            if not is_public_holiday(current_date):
-                working_days += 1
+def add_working_days(start_date, days, holiday_list=None):
+    """Add working days to a date (excluding weekends and public holidays)"""
+    return get_holiday_calendar(holiday_list).add_working_days(start_date, days)
 
-        current_date = add_days(current_date, 1)
 
-    return working_days
+def calculate_working_days_between(start_date, end_date, holiday_list=None):
+    """Calculate working days between two dates (excluding weekends and holidays)"""
+    return get_holiday_calendar(holiday_list).working_days_between(start_date, end_date)
 
 
 def is_public_holiday(date, holiday_list=None):
@@ -404,48 +444,13 @@ def is_public_holiday(date, holiday_list=None):
 
     Args:
         date: Date to check (datetime.date or string)
-        holiday_list: Optional holiday list name. If not provided, uses default.
+        holiday_list: Optional holiday list name. If not provided, uses the council calendar.
 
     Returns:
         bool: True if date is a public holiday
     """
     try:
-        from frappe.utils import getdate
-
-        # Convert string to date if needed
-        check_date = getdate(date)
-
-        # Get holiday list name
-        if not holiday_list:
-            # First try to find Philippines holiday list (for Taytay council)
-            holiday_list = frappe.db.get_value(
-                "Holiday List",
-                {"country": "Philippines"},
-                "name"
-            )
-
-            if not holiday_list:
-                # Look for NZ public holidays list
-                holiday_list = frappe.db.get_value(
-                    "Holiday List",
-                    {"country": "New Zealand"},
-                    "name"
-                )
-
-        if not holiday_list:
-            # No holiday list configured, assume no holidays
-            return False
-
-        # Check if date exists in Holiday List
-        holiday = frappe.db.exists(
-            "Holiday",
-            {
-                "parent": holiday_list,
-                "holiday_date": check_date
-            }
-        )
-
-        return bool(holiday)
+        return get_holiday_calendar(holiday_list).is_holiday(date)
 
     except Exception as e:
         # Log error but don't fail - assume not a holiday
@@ -454,14 +459,21 @@ def is_public_holiday(date, holiday_list=None):
 
 
 @frappe.whitelist()
-def get_my_requests(workflow_state=None, page=1, page_size=20):
+def get_my_requests(workflow_state=None, page=1, page_size=20, cursor=None, with_total=None):
     """
     Get requests for current user with pagination support
 
+    Two paging modes are supported. Page mode (the default) uses LIMIT/OFFSET
+    and returns an exact total. Cursor mode is enabled by passing ``cursor``
+    (use an empty string for the first page) and seeks on ``(modified, name)``,
+    so every page costs the same regardless of depth.
+
     Args:
         workflow_state: Filter by workflow state (optional)
-        page: Page number (1-indexed, default: 1)
+        page: Page number (1-indexed, default: 1). Ignored in cursor mode.
         page_size: Items per page (default: 20, max: 100)
+        cursor: Opaque cursor from a previous response's ``next_cursor`` (optional)
+        with_total: In cursor mode, set to 1 to include an estimated total (optional)
 
     Returns:
         dict: {
@@ -471,6 +483,8 @@ def get_my_requests(workflow_state=None, page=1, page_size=20):
             "page_size": int,
             "total_pages": int
         }
+        In cursor mode: {"data", "page_size", "next_cursor", "has_more"}
+        plus "total_estimate" when requested.
     """
     user = frappe.session.user
 
@@ -485,6 +499,20 @@ def get_my_requests(workflow_state=None, page=1, page_size=20):
 
     conditions = get_filter_conditions(filters)
 
+    # Council is a Single and Requests no longer carry a council column;
+    # the key is kept as NULL for existing clients
+    select_clause = """
+        SELECT
+            r.name, r.request_number, r.workflow_state,
+            r.brief_description, r.submitted_date, r.target_completion_date,
+            r.is_overdue, r.request_type, r.request_category, NULL AS council, r.creation,
+            r.modified
+        FROM `tabRequest` r
+    """
+
+    if cursor is not None:
+        return get_keyset_page(select_clause, conditions, "modified", cursor, page_size, with_total)
+
     # Get total count
     total = frappe.db.sql("""
         SELECT COUNT(*)
@@ -492,19 +520,13 @@ def get_my_requests(workflow_state=None, page=1, page_size=20):
         WHERE {conditions}
     """.format(conditions=conditions))[0][0]
 
-    # Use SQL JOIN to avoid N+1 query - fetch council name in single query
     requests = frappe.db.sql("""
-        SELECT
-            r.name, r.request_number, r.workflow_state,
-            r.brief_description, r.submitted_date, r.target_completion_date,
-            r.is_overdue, r.request_type, r.request_category, r.council, r.creation,
-            c.council_name
-        FROM `tabRequest` r
-        LEFT JOIN `tabCouncil` c ON r.council = c.name
+        {select_clause}
         WHERE {conditions}
         ORDER BY r.modified DESC
         LIMIT {page_size} OFFSET {offset}
     """.format(
+        select_clause=select_clause,
         conditions=conditions,
         page_size=page_size,
         offset=offset
@@ -519,6 +541,113 @@ def get_my_requests(workflow_state=None, page=1, page_size=20):
     }
 
 
+KEYSET_SORT_FIELDS = ("modified", "creation")
+
+
+def encode_cursor(sort_value, name):
+    """Encode the last row's (sort value, name) as an opaque URL-safe cursor"""
+    payload = json.dumps([str(sort_value), name], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Returns (sort_value, name) or None"""
+    if not cursor:
+        return None
+
+    try:
+        sort_value, name = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, TypeError):
+        frappe.throw("Invalid pagination cursor")
+
+    return get_datetime(sort_value), name
+
+
+def get_keyset_page(select_clause, conditions, sort_field, cursor, page_size, with_total=None):
+    """
+    Fetch one page of Requests using keyset (seek) pagination
+
+    Rows are ordered by ``(sort_field DESC, name DESC)`` and the cursor holds the
+    last row of the previous page, so the query seeks straight into the
+    composite index instead of scanning and discarding OFFSET rows.
+
+    Args:
+        select_clause: SELECT ... FROM ... part of the query (Request aliased as ``r``)
+        conditions: SQL WHERE conditions built by get_filter_conditions
+        sort_field: "modified" or "creation"
+        cursor: Cursor from the previous page, or empty for the first page
+        page_size: Items per page
+        with_total: Include an estimated total when truthy
+
+    Returns:
+        dict: {"data", "page_size", "next_cursor", "has_more"[, "total_estimate"]}
+    """
+    if sort_field not in KEYSET_SORT_FIELDS:
+        frappe.throw(f"Unsupported sort field for cursor pagination: {sort_field}")
+
+    where_clause = conditions
+    position = decode_cursor(cursor)
+    if position:
+        sort_value, name = position
+        where_clause += """ AND (r.{field} < {value}
+            OR (r.{field} = {value} AND r.name < {name}))""".format(
+            field=sort_field,
+            value=frappe.db.escape(str(sort_value)),
+            name=frappe.db.escape(name)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = frappe.db.sql("""
+        {select_clause}
+        WHERE {where_clause}
+        ORDER BY r.{field} DESC, r.name DESC
+        LIMIT {limit}
+    """.format(
+        select_clause=select_clause,
+        where_clause=where_clause,
+        field=sort_field,
+        limit=page_size + 1
+    ), as_dict=True)
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    result = {
+        "data": rows,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(rows[-1][sort_field], rows[-1].name) if has_more else None,
+        "has_more": has_more
+    }
+
+    if cint(with_total):
+        result["total_estimate"] = estimate_request_count(conditions)
+
+    return result
+
+
+def estimate_request_count(conditions):
+    """
+    Estimate the number of Requests matching conditions from the optimizer
+
+    Uses the row estimate from EXPLAIN, which reads index statistics rather than
+    counting rows, so the cost does not grow with the size of the result set.
+    """
+    try:
+        plan = frappe.db.sql("""
+            EXPLAIN SELECT r.name
+            FROM `tabRequest` r
+            WHERE {conditions}
+        """.format(conditions=conditions), as_dict=True)
+        return cint(plan[0].get("rows")) if plan else 0
+    except Exception:
+        # Fall back to an exact count on databases without MySQL-style EXPLAIN
+        return frappe.db.sql("""
+            SELECT COUNT(*)
+            FROM `tabRequest` r
+            WHERE {conditions}
+        """.format(conditions=conditions))[0][0]
+
+
 def get_filter_conditions(filters):
     """Build WHERE conditions from filters dict"""
     if not filters:
@@ -561,11 +690,8 @@ def get_my_applications():
         order_by="modified desc"
     )
 
-    # Enrich with council name
-    for req in requests:
-        if req.get("council"):
-            council_name = frappe.db.get_value("Council", req["council"], "council_name")
-            req["council_name"] = council_name
+    # Enrich with council name (single query for all councils)
+    enrich_links(requests, "council", "Council", {"council_name": "council_name"})
 
     return requests
 
@@ -573,6 +699,11 @@ def get_my_applications():
 @frappe.whitelist()
 def submit_request(request_id):
     """Submit a request (move from Draft to Submitted)"""
+    from councilsonline.utils.draft_buffer import flush_draft_buffer
+
+    # Write pending autosave patches before submitting
+    flush_draft_buffer(request_id)
+
     doc = frappe.get_doc("Request", request_id)
 
     # Validate user has permission
@@ -651,15 +782,21 @@ def calculate_fees(request_type, building_value=None):
 
 
 @frappe.whitelist()
-def get_all_requests_for_staff(page=1, page_size=20, workflow_state=None, council=None):
+def get_all_requests_for_staff(page=1, page_size=20, workflow_state=None, council=None, cursor=None, with_total=None):
     """
     Get all requests for internal staff view with pagination
 
+    Pass ``cursor`` (empty string for the first page) to switch to keyset
+    pagination on ``(creation, name)``. Cursor mode skips the COUNT(*) unless
+    ``with_total`` is set, in which case an estimate is returned.
+
     Args:
-        page: Page number (1-indexed, default: 1)
+        page: Page number (1-indexed, default: 1). Ignored in cursor mode.
         page_size: Items per page (default: 20, max: 100)
         workflow_state: Filter by workflow state (optional)
-        council: Filter by council (optional)
+        council: Ignored; Requests no longer carry a council (kept for existing clients)
+        cursor: Opaque cursor from a previous response's ``next_cursor`` (optional)
+        with_total: In cursor mode, set to 1 to include an estimated total (optional)
 
     Returns:
         dict: Paginated results with metadata
@@ -673,28 +810,25 @@ def get_all_requests_for_staff(page=1, page_size=20, workflow_state=None, counci
     filters = {}
     if workflow_state:
         filters["workflow_state"] = workflow_state
-    if council:
-        filters["council"] = council
 
-    # Get total count
-    total = frappe.db.count("Request", filters=filters)
-
-    # Use SQL JOIN to avoid N+1 query
-    where_clause = "1=1"
-    if workflow_state:
-        where_clause += f" AND r.workflow_state = {frappe.db.escape(workflow_state)}"
-    if council:
-        where_clause += f" AND r.council = {frappe.db.escape(council)}"
-
-    requests = frappe.db.sql(f"""
+    where_clause = get_filter_conditions(filters)
+    select_clause = """
         SELECT
             r.name, r.request_number, r.request_type,
-            r.brief_description, r.council, r.workflow_state, r.submitted_date,
+            r.brief_description, NULL AS council, r.workflow_state, r.submitted_date,
             r.target_completion_date, r.assigned_to,
-            r.owner, r.creation, r.modified,
-            c.council_name
+            r.owner, r.creation, r.modified
         FROM `tabRequest` r
-        LEFT JOIN `tabCouncil` c ON r.council = c.name
+    """
+
+    if cursor is not None:
+        return get_keyset_page(select_clause, where_clause, "creation", cursor, page_size, with_total)
+
+    # Get total count
+    total = frappe.db.count("Request", filters=filters)
+
+    requests = frappe.db.sql(f"""
+        {select_clause}
         WHERE {where_clause}
         ORDER BY r.creation DESC
         LIMIT {page_size} OFFSET {offset}
@@ -775,7 +909,7 @@ def email_invoice(request_name, recipient_email=None):
 
         # Determine recipient
         if not recipient_email:
-            recipient_email = request.applicant_email or frappe.db.get_value("User", request.requester, "email")
+            recipient_email = request.applicant_email or request.requester_email
 
         if not recipient_email:
             return {
@@ -0,0 +1,221 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+
+OPEN_TASK_STATUSES = ("Open", "In Progress", "Working")
+COUNTER_FIELDS = ("tasks_count", "open_tasks_count", "meetings_count", "communications_count")
+
+
+class RequestActivityCounter(Document):
+	"""Per-Request activity counts read by the action bar summary"""
+	pass
+
+
+def get_contributions(doc):
+	"""
+	Counter contributions of a single Project Task, Council Meeting or Communication Log
+
+	Returns:
+		dict: {counter_field: amount} for the record's current values
+	"""
+	if doc.doctype == "Project Task":
+		return {
+			"tasks_count": 1,
+			"open_tasks_count": 1 if doc.status in OPEN_TASK_STATUSES else 0
+		}
+	if doc.doctype == "Council Meeting":
+		return {"meetings_count": 1}
+	if doc.doctype == "Communication Log":
+		return {"communications_count": 1}
+	return {}
+
+
+def on_activity_update(doc, method=None):
+	"""
+	doc_events hook (on_update) for counted doctypes
+
+	Also fires on insert, where there is no previous version. Moves the
+	record's contribution from its old Request to its new one, so status
+	changes and re-linking are both handled.
+	"""
+	before = doc.get_doc_before_save()
+
+	if before and before.request == doc.request:
+		old = get_contributions(before)
+		new = get_contributions(doc)
+		apply_delta(doc.request, {field: new.get(field, 0) - old.get(field, 0) for field in new})
+		return
+
+	if before and before.request:
+		apply_delta(before.request, {field: -amount for field, amount in get_contributions(before).items()})
+	if doc.request:
+		apply_delta(doc.request, get_contributions(doc))
+
+
+def on_activity_delete(doc, method=None):
+	"""doc_events hook (after_delete) for counted doctypes"""
+	if doc.request:
+		apply_delta(doc.request, {field: -amount for field, amount in get_contributions(doc).items()})
+
+
+def apply_delta(request, deltas):
+	"""
+	Atomically add deltas to a Request's counters
+
+	If the counters row does not exist yet it is rebuilt from the source tables,
+	which already reflect the change being applied. If a concurrent first write
+	inserts the row in the meantime, the delta is added to that row instead.
+	"""
+	deltas = {field: amount for field, amount in deltas.items() if amount and field in COUNTER_FIELDS}
+	if not request or not deltas:
+		return
+
+	if not frappe.db.exists("Request Activity Counter", request):
+		try:
+			rebuild_counters(request)
+			return
+		except frappe.DuplicateEntryError:
+			# The other writer's row does not include this change yet
+			pass
+
+	assignments = ", ".join(
+		f"`{field}` = GREATEST(`{field}` + %({field})s, 0)" for field in deltas
+	)
+	frappe.db.sql(f"""
+		UPDATE `tabRequest Activity Counter`
+		SET {assignments}, `modified` = %(modified)s
+		WHERE `name` = %(request)s
+	""", {**deltas, "modified": now(), "request": request})
+
+
+def count_activity(request=None):
+	"""
+	Count activity from the source tables with one GROUP BY query per doctype
+
+	Args:
+		request: Limit to one Request (optional; all Requests when omitted)
+
+	Returns:
+		dict: {request: {counter_field: count}}
+	"""
+	condition = "AND `request` = %(request)s" if request else ""
+	values = {"request": request, "open_statuses": OPEN_TASK_STATUSES}
+	counts = {}
+
+	def collect(rows):
+		for row in rows:
+			counts.setdefault(row.request, dict.fromkeys(COUNTER_FIELDS, 0)).update(
+				{field: row[field] for field in COUNTER_FIELDS if field in row}
+			)
+
+	collect(frappe.db.sql(f"""
+		SELECT `request`,
+			COUNT(*) AS tasks_count,
+			SUM(CASE WHEN `status` IN %(open_statuses)s THEN 1 ELSE 0 END) AS open_tasks_count
+		FROM `tabProject Task`
+		WHERE `request` IS NOT NULL {condition}
+		GROUP BY `request`
+	""", values, as_dict=True))
+
+	collect(frappe.db.sql(f"""
+		SELECT `request`, COUNT(*) AS meetings_count
+		FROM `tabCouncil Meeting`
+		WHERE `request` IS NOT NULL {condition}
+		GROUP BY `request`
+	""", values, as_dict=True))
+
+	collect(frappe.db.sql(f"""
+		SELECT `request`, COUNT(*) AS communications_count
+		FROM `tabCommunication Log`
+		WHERE `request` IS NOT NULL {condition}
+		GROUP BY `request`
+	""", values, as_dict=True))
+
+	return counts
+
+
+def rebuild_counters(request):
+	"""Recompute one Request's counters from the source tables and store them"""
+	counts = count_activity(request).get(request) or dict.fromkeys(COUNTER_FIELDS, 0)
+	counts = {field: int(counts.get(field) or 0) for field in COUNTER_FIELDS}
+
+	if frappe.db.exists("Request Activity Counter", request):
+		frappe.db.set_value(
+			"Request Activity Counter", request,
+			{**counts, "last_rebuilt": now()},
+			update_modified=True
+		)
+	else:
+		frappe.get_doc({
+			"doctype": "Request Activity Counter",
+			"request": request,
+			"last_rebuilt": now(),
+			**counts
+		}).db_insert()
+
+	return frappe._dict(request=request, **counts)
+
+
+def rebuild_all_counters():
+	"""
+	Rebuild the counters of every Request (repair after bulk imports or drift)
+
+	Returns:
+		int: Number of counter rows written
+	"""
+	counts = count_activity()
+	timestamp = now()
+
+	frappe.db.delete("Request Activity Counter")
+
+	rows = [
+		(
+			request, request, timestamp, timestamp, "Administrator", "Administrator", timestamp,
+			*(int(values.get(field) or 0) for field in COUNTER_FIELDS)
+		)
+		for request, values in counts.items()
+	]
+	if rows:
+		frappe.db.bulk_insert(
+			"Request Activity Counter",
+			fields=[
+				"name", "request", "creation", "modified", "owner", "modified_by", "last_rebuilt",
+				*COUNTER_FIELDS
+			],
+			values=rows
+		)
+
+	return len(rows)
+
+
+def get_request_counters(request):
+	"""
+	Get a Request's activity counters with a single primary-key read
+
+	Missing rows (Requests created before the counters existed) are rebuilt lazily.
+	"""
+	counters = frappe.db.get_value(
+		"Request Activity Counter", request, COUNTER_FIELDS, as_dict=True
+	)
+	return counters or rebuild_counters(request)
+
+
+@frappe.whitelist()
+def rebuild_request_counters(request=None):
+	"""
+	Rebuild activity counters for one Request or all Requests (System Manager only)
+
+	Args:
+		request: Request name (optional; rebuilds all when omitted)
+	"""
+	if "System Manager" not in frappe.get_roles():
+		frappe.throw("Only System Managers can rebuild request counters", frappe.PermissionError)
+
+	if request:
+		return {"success": True, "rebuilt": 1, "counters": rebuild_counters(request)}
+
+	return {"success": True, "rebuilt": rebuild_all_counters()}
@@ -4,6 +4,14 @@
 import frappe
 from frappe.model.document import Document
 from frappe.utils import nowdate, add_days, now
+from councilsonline.councilsonline.doctype.statutory_clock_event.statutory_clock_event import (
+    close_project_exclusions,
+    open_project_exclusion,
+    record_clock_event
+)
+
+
+RFI_EXCLUSION_TYPE = "RFI Issued"
 
 
 class RequestForInformation(Document):
@@ -69,13 +77,24 @@ class RequestForInformation(Document):
         """Stop the statutory clock on parent Request"""
         request = frappe.get_doc("Request", self.request)
         if request.workflow_state not in ["Closed", "Withdrawn", "Declined"]:
-            # Delegate to child DocType
-            request.stop_statutory_clock()
+            # Record the suspension (one insert; no application save); None when the
+            # Request's application has no running clock
+            state = record_clock_event(
+                self.request, "Suspend", reason=f"RFI {self.name} issued",
+                reference_doctype=self.doctype, reference_name=self.name
+            )
+            # Exclude the RFI period from the Assessment Project's clock
+            exclusion = open_project_exclusion(
+                self.request, RFI_EXCLUSION_TYPE, self.doctype, self.name, reason=f"RFI {self.name} issued"
+            )
 
             # Update parent status
             request.workflow_state = "RFI Issued"
             request.save(ignore_permissions=True)
 
+            if not state and not exclusion:
+                return
+
             self.clock_stopped_date = now()
             frappe.db.set_value(
                 "Request For Information",
@@ -107,13 +126,21 @@ class RequestForInformation(Document):
 
             # Only restart if no other outstanding RFIs
             if outstanding_rfis == 0:
-                # Delegate to child DocType
-                request.restart_statutory_clock()
+                # Record the resumption (one insert; no application save); None when the
+                # Request's application clock was not suspended
+                state = record_clock_event(
+                    self.request, "Resume", reason=f"RFI {self.name} response received",
+                    reference_doctype=self.doctype, reference_name=self.name
+                )
+                ended = close_project_exclusions(self.request, RFI_EXCLUSION_TYPE)
 
                 # Update parent status to Processing (not Under Review)
                 request.workflow_state = "Processing"
                 request.save(ignore_permissions=True)
 
+                if not state and not ended:
+                    return
+
                 self.clock_restarted_date = now()
                 frappe.db.set_value(
                     "Request For Information",
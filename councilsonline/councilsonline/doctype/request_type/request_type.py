@@ -6,7 +6,14 @@ from frappe.model.document import Document
 
 
 class RequestType(Document):
-    pass
+    def validate(self):
+        self.validate_eligibility_rules()
+
+    def validate_eligibility_rules(self):
+        """Compile the eligibility rules so a bad operator or value is reported on save"""
+        from councilsonline.eligibility_rules import compile_rules
+
+        compile_rules([row for row in self.eligibility_rules if row.is_active])
 
 
 @frappe.whitelist(allow_guest=True)
@@ -27,3 +34,24 @@ def get_active_request_types():
         ],
         order_by="type_name asc"
     )
+
+
+@frappe.whitelist()
+def load_default_eligibility_rules(request_type):
+    """
+    Copy the built-in eligibility rules for a Request Type's code into its rule table
+
+    Existing rows are replaced, so the built-in rules can be used as a
+    starting point for editing.
+    """
+    from councilsonline.eligibility_rules import DEFAULT_RULES
+
+    doc = frappe.get_doc("Request Type", request_type)
+    doc.check_permission("write")
+
+    doc.set("eligibility_rules", [])
+    for rule in DEFAULT_RULES.get(doc.type_code) or DEFAULT_RULES[None]:
+        doc.append("eligibility_rules", rule)
+    doc.save()
+
+    return {"success": True, "rules": len(doc.eligibility_rules)}
@@ -4,6 +4,7 @@
 import frappe
 from frappe.model.document import Document
 from councilsonline.utils.application_sync import sync_to_request
+from councilsonline.councilsonline.doctype.statutory_clock_event.statutory_clock_event import record_clock_event
 
 
 class ResourceConsentApplication(Document):
@@ -83,24 +84,15 @@ class ResourceConsentApplication(Document):
 
     def start_statutory_clock(self):
         """Start the RMA statutory clock"""
-        from frappe.utils import now_datetime
-        if not self.statutory_clock_started:
-            self.statutory_clock_started = now_datetime()
-            self.statutory_clock_stopped = None
-            self.save(ignore_permissions=True)
+        record_clock_event(self.request, "Start", application=self)
 
     def stop_statutory_clock(self):
         """Stop the RMA statutory clock"""
-        from frappe.utils import now_datetime
-        if self.statutory_clock_started and not self.statutory_clock_stopped:
-            self.statutory_clock_stopped = now_datetime()
-            self.save(ignore_permissions=True)
+        record_clock_event(self.request, "Suspend", application=self)
 
     def restart_statutory_clock(self):
         """Restart the RMA statutory clock after RFI"""
-        if self.statutory_clock_stopped:
-            self.statutory_clock_stopped = None
-            self.save(ignore_permissions=True)
+        record_clock_event(self.request, "Resume", application=self)
 
     def apply_condition_templates(self):
         """
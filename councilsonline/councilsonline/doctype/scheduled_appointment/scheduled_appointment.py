@@ -6,6 +6,8 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import now_datetime, getdate
 
+from councilsonline.utils.availability import invalidate_team_days
+
 
 class ScheduledAppointment(Document):
 	def validate(self):
@@ -19,6 +21,22 @@ class ScheduledAppointment(Document):
 		if not self.booked_at:
 			self.booked_at = now_datetime()
 
+	def on_update(self):
+		self.invalidate_availability()
+
+	def on_trash(self):
+		self.invalidate_availability()
+
+	def invalidate_availability(self):
+		"""Drop the team's cached availability for this booking's day (and its previous day if rescheduled)"""
+		previous = self.get_doc_before_save()
+		for team, scheduled_date in {
+			(self.team, self.scheduled_date),
+			(previous.team, previous.scheduled_date) if previous else (None, None)
+		}:
+			if team and scheduled_date:
+				invalidate_team_days(team, [scheduled_date])
+
 	def validate_times(self):
 		"""Ensure end time is after start time"""
 		if self.scheduled_start and self.scheduled_end:
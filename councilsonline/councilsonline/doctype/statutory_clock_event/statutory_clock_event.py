@@ -0,0 +1,263 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, now, now_datetime
+
+
+CLOCK_STATE_KEY_PREFIX = "councilsonline:clock_state:"
+CLOCK_STATE_TTL = 7 * 24 * 60 * 60  # Seconds; the projection is rebuilt from events on a miss
+
+# Clock states each event may be recorded from; anything else is a no-op
+ALLOWED_TRANSITIONS = {
+	"Start": ("Not Started",),
+	"Suspend": ("Running",),
+	"Resume": ("Suspended",),
+	"Stop": ("Running", "Suspended")
+}
+
+
+class StatutoryClockEvent(Document):
+	"""Append-only statutory clock transition (start/stop/suspend/resume)"""
+
+	def validate(self):
+		if not self.is_new():
+			frappe.throw("Statutory clock events cannot be modified")
+
+
+def new_clock_state():
+	"""Projection of a clock with no events"""
+	return {"status": "Not Started", "started": None, "stopped": None, "suspensions": []}
+
+
+def apply_clock_event(state, event_type, event_time):
+	"""
+	Fold one event into a clock state projection
+
+	Returns:
+		dict: {"status", "started", "stopped", "suspensions": [[start, end]]};
+		"stopped" mirrors statutory_clock_stopped (set while suspended or stopped)
+	"""
+	state = dict(state, suspensions=[list(period) for period in state["suspensions"]])
+	event_time = str(event_time)
+
+	if event_type == "Start":
+		state.update(status="Running", started=event_time, stopped=None, suspensions=[])
+	elif event_type == "Suspend":
+		state.update(status="Suspended", stopped=event_time)
+		state["suspensions"].append([event_time, None])
+	elif event_type == "Resume":
+		state.update(status="Running", stopped=None)
+	elif event_type == "Stop":
+		state.update(status="Stopped", stopped=event_time)
+
+	# Resume and Stop both close an open suspension
+	if event_type in ("Resume", "Stop") and state["suspensions"] and not state["suspensions"][-1][1]:
+		state["suspensions"][-1][1] = event_time
+
+	return state
+
+
+def get_clock_application(request):
+	"""
+	Get the application document that carries a Request's denormalised clock fields
+
+	Returns:
+		tuple: (doctype, name), or (None, None) if the application has no clock fields
+	"""
+	application = frappe.db.get_value(
+		"Request", request, ["application_doctype", "application_name"], as_dict=True
+	)
+	if not application or not application.application_name:
+		return None, None
+	if not frappe.get_meta(application.application_doctype).has_field("statutory_clock_started"):
+		return None, None
+	return application.application_doctype, application.application_name
+
+
+def derive_clock_state(request):
+	"""
+	Rebuild a Request's clock state by folding its events in order
+
+	Clocks started before events were recorded are seeded from the
+	application's statutory_clock_started/stopped fields.
+	"""
+	events = frappe.get_all(
+		"Statutory Clock Event",
+		filters={"request": request},
+		fields=["event_type", "event_time"],
+		order_by="event_time asc, creation asc"
+	)
+
+	state = new_clock_state()
+	if not events:
+		doctype, name = get_clock_application(request)
+		if doctype:
+			started, stopped = frappe.db.get_value(
+				doctype, name, ["statutory_clock_started", "statutory_clock_stopped"]
+			)
+			if started:
+				state = apply_clock_event(state, "Start", started)
+			if stopped:
+				state = apply_clock_event(state, "Suspend", stopped)
+
+	for event in events:
+		state = apply_clock_event(state, event.event_type, event.event_time)
+
+	return state
+
+
+def get_clock_state(request):
+	"""Get a Request's clock state from the cached projection, deriving it on a miss"""
+	cache = frappe.cache()
+	state = cache.get_value(CLOCK_STATE_KEY_PREFIX + request)
+	if state is None:
+		state = derive_clock_state(request)
+		cache.set_value(CLOCK_STATE_KEY_PREFIX + request, state, expires_in_sec=CLOCK_STATE_TTL)
+	return state
+
+
+def record_clock_event(request, event_type, reason=None, reference_doctype=None, reference_name=None, application=None):
+	"""
+	Record a clock transition with a single insert, then update the projection
+
+	No documents are saved: the application's statutory_clock_started/stopped
+	columns are updated directly and the cached projection is replaced once
+	the transaction commits.
+
+	Args:
+		request: Request name
+		event_type: Start, Stop, Suspend or Resume
+		reason: Optional reason
+		reference_doctype: Optional triggering document type (e.g. Request For Information)
+		reference_name: Optional triggering document name
+		application: Optional application document to update in memory as well
+
+	Returns:
+		dict: The new clock state, or None if the transition does not apply
+	"""
+	state = get_clock_state(request)
+	if state["status"] not in ALLOWED_TRANSITIONS[event_type]:
+		return None
+
+	event_time = now_datetime()
+	doctype, name = (application.doctype, application.name) if application else get_clock_application(request)
+	timestamp = now()
+
+	event = frappe.get_doc({
+		"doctype": "Statutory Clock Event",
+		"name": frappe.generate_hash(length=10),
+		"request": request,
+		"event_type": event_type,
+		"event_time": event_time,
+		"recorded_by": frappe.session.user,
+		"application_doctype": doctype,
+		"application_name": name,
+		"reference_doctype": reference_doctype,
+		"reference_name": reference_name,
+		"reason": reason,
+		"owner": frappe.session.user,
+		"modified_by": frappe.session.user,
+		"creation": timestamp,
+		"modified": timestamp
+	})
+	event.db_insert()
+
+	state = apply_clock_event(state, event_type, event_time)
+	clock_fields = {"statutory_clock_started": state["started"], "statutory_clock_stopped": state["stopped"]}
+
+	if doctype:
+		frappe.db.set_value(doctype, name, clock_fields, update_modified=False)
+	if application:
+		application.update(clock_fields)
+
+	# Drop the projection now and publish the new one only if the insert commits
+	cache = frappe.cache()
+	cache.delete_value(CLOCK_STATE_KEY_PREFIX + request)
+	frappe.db.after_commit.add(
+		lambda: cache.set_value(CLOCK_STATE_KEY_PREFIX + request, state, expires_in_sec=CLOCK_STATE_TTL)
+	)
+
+	return state
+
+
+def get_clock_project(request):
+	"""Get the Request's Assessment Project if its clock has started, else None"""
+	project = frappe.db.get_value("Assessment Project", {"request": request}, ["name", "started_date"], as_dict=True)
+	return project.name if project and project.started_date else None
+
+
+def open_project_exclusion(request, exclusion_type, reference_doctype=None, reference_name=None, reason=None):
+	"""
+	Start a clock exclusion on the Request's Assessment Project with one child-row insert
+
+	An exclusion of the same type that is still open is reused, so several
+	outstanding RFIs exclude their days once.
+
+	Returns:
+		str: Clock Exclusion Period name, or None if the Request has no project with a started clock
+	"""
+	project = get_clock_project(request)
+	if not project:
+		return None
+
+	filters = {
+		"parent": project, "parenttype": "Assessment Project",
+		"exclusion_type": exclusion_type, "auto_created": 1, "ended_date": ["is", "not set"]
+	}
+	existing = frappe.db.get_value("Clock Exclusion Period", filters, "name")
+	if existing:
+		return existing
+
+	idx = frappe.db.sql("""
+		SELECT IFNULL(MAX(idx), 0) FROM `tabClock Exclusion Period`
+		WHERE parent = %s AND parenttype = 'Assessment Project'
+	""", project)[0][0]
+
+	exclusion = frappe.get_doc({
+		"doctype": "Clock Exclusion Period",
+		"parent": project,
+		"parenttype": "Assessment Project",
+		"parentfield": "clock_exclusions",
+		"idx": cint(idx) + 1,
+		"exclusion_type": exclusion_type,
+		"reference_document_type": reference_doctype,
+		"reference_document": reference_name,
+		"reason": reason,
+		"started_date": now_datetime(),
+		"stopped_by": frappe.session.user,
+		"auto_created": 1
+	})
+	exclusion.db_insert()
+	return exclusion.name
+
+
+def close_project_exclusions(request, exclusion_type):
+	"""
+	End the open auto-created exclusions of a type on the Request's Assessment Project
+
+	Returns:
+		int: Number of exclusions ended
+	"""
+	project = get_clock_project(request)
+	if not project:
+		return 0
+
+	filters = {
+		"parent": project, "parenttype": "Assessment Project",
+		"exclusion_type": exclusion_type, "auto_created": 1, "ended_date": ["is", "not set"]
+	}
+	open_exclusions = frappe.get_all("Clock Exclusion Period", filters=filters, pluck="name")
+	for name in open_exclusions:
+		frappe.db.set_value(
+			"Clock Exclusion Period", name,
+			{"ended_date": now_datetime(), "restarted_by": frappe.session.user},
+			update_modified=False
+		)
+	return len(open_exclusions)
+
+
+def on_doctype_update():
+	"""Events are always read per Request in time order"""
+	frappe.db.add_index("Statutory Clock Event", ["request", "event_time"], "request_event_time_index")
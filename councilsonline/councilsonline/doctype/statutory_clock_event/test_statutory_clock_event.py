@@ -0,0 +1,53 @@
+# Copyright (c) 2026, CouncilsOnline and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.statutory_clock_event.statutory_clock_event import (
+	apply_clock_event,
+	new_clock_state
+)
+
+
+def fold(*events):
+	state = new_clock_state()
+	for event_type, event_time in events:
+		state = apply_clock_event(state, event_type, event_time)
+	return state
+
+
+class TestStatutoryClockEvent(FrappeTestCase):
+	def test_suspend_and_resume(self):
+		state = fold(
+			("Start", "2025-12-01 09:00:00"),
+			("Suspend", "2025-12-03 10:00:00"),
+			("Resume", "2025-12-08 11:00:00")
+		)
+
+		self.assertEqual(state["status"], "Running")
+		self.assertEqual(state["started"], "2025-12-01 09:00:00")
+		self.assertIsNone(state["stopped"])
+		self.assertEqual(state["suspensions"], [["2025-12-03 10:00:00", "2025-12-08 11:00:00"]])
+
+	def test_suspended_clock_mirrors_stopped_field(self):
+		state = fold(("Start", "2025-12-01 09:00:00"), ("Suspend", "2025-12-03 10:00:00"))
+
+		self.assertEqual(state["status"], "Suspended")
+		self.assertEqual(state["stopped"], "2025-12-03 10:00:00")
+		self.assertEqual(state["suspensions"], [["2025-12-03 10:00:00", None]])
+
+	def test_stop_closes_open_suspension(self):
+		state = fold(
+			("Start", "2025-12-01 09:00:00"),
+			("Suspend", "2025-12-03 10:00:00"),
+			("Stop", "2025-12-04 12:00:00")
+		)
+
+		self.assertEqual(state["status"], "Stopped")
+		self.assertEqual(state["suspensions"][-1][1], "2025-12-04 12:00:00")
+
+	def test_fold_does_not_mutate_input(self):
+		state = fold(("Start", "2025-12-01 09:00:00"))
+		apply_clock_event(state, "Suspend", "2025-12-02 09:00:00")
+
+		self.assertEqual(state["suspensions"], [])
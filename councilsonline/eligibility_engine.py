@@ -5,20 +5,60 @@
 Eligibility Scoring Engine for Social Assistance Programs
 
 This module contains the business logic for calculating eligibility
-for various social assistance programs in the Philippines.
+for various social assistance programs in the Philippines. The criteria
+themselves are declarative rules per Request Type, compiled and evaluated
+by councilsonline.eligibility_rules.
 """
 
 import frappe
-from frappe.utils import flt, getdate, nowdate
+from frappe.utils import flt, getdate, now, nowdate
+
+from councilsonline.councilsonline.doctype.eligibility_criteria_result.eligibility_criteria_result import (
+	determine_eligibility
+)
+from councilsonline.eligibility_rules import evaluate_rules, flush_rule_stats
+
+
+# Request states that count as already receiving a programme's benefit
+APPROVED_STATES = ("Approved", "Approved with Conditions")
+PENSION_TYPE_CODE = "SPISC"
+
+HOUSEHOLD_FIELDS = [
+	"name", "head_of_household", "poverty_threshold_status", "verified_by_barangay", "barangay_official",
+	"total_monthly_income", "fourps_beneficiary", "has_pwd_member", "has_senior_citizen", "has_solo_parent",
+	"disaster_affected", "health_crisis"
+]
+
+# Requests scored and committed per chunk by the batch job
+BATCH_SIZE = 500
+
+RESULT_FIELDS = [
+	"request", "request_type", "requester", "evaluation_date", "evaluated_by", "overall_score",
+	"max_possible_score", "score_percentage", "eligibility_status", "final_decision", "kyc_verified",
+	"household_verified", "has_senior_citizen", "below_poverty_threshold", "eligibility_notes"
+]
+CHECK_FIELDS = ["criterion_name", "criterion_type", "score_earned", "max_score", "status", "check_result", "weight"]
 
 
 class EligibilityEngine:
 	"""Main eligibility calculation engine"""
 
-	def __init__(self, request_id):
-		self.request = frappe.get_doc("Request", request_id)
-		self.request_type = frappe.get_doc("Request Type", self.request.request_type)
-		self.requester = self.request.requester_email
+	def __init__(self, request_id, facts=None):
+		"""
+		Args:
+			request_id: Request name
+			facts: Applicant facts preloaded by load_batch_facts (batch mode);
+				loaded for this request alone when omitted
+		"""
+		if facts:
+			self.request = facts.request
+			self.request_type = facts.request_type
+		else:
+			self.request = frappe.get_doc("Request", request_id)
+			self.request_type = frappe.get_cached_doc("Request Type", self.request.request_type)
+		self.requester = self.request.requester
+		self.facts = facts
+		self.decision = None
 		self.criteria_checks = []
 		self.total_score = 0
 		self.max_score = 0
@@ -28,22 +68,28 @@ class EligibilityEngine:
 		Main entry point for eligibility calculation
 		Returns eligibility result document
 		"""
-		# Load applicant data
-		self.load_applicant_data()
-
-		# Run program-specific criteria
-		if self.request_type.type_code == "SPISC":
-			self.check_spisc_eligibility()
-		elif self.request_type.type_code == "LSFA":
-			self.check_lsfa_eligibility()
-		elif self.request_type.type_code == "BMSS":
-			self.check_bmss_eligibility()
-		else:
-			self.check_generic_eligibility()
+		self.evaluate()
 
 		# Create eligibility result document
 		return self.create_eligibility_result()
 
+	def evaluate(self):
+		"""Load applicant data (unless preloaded) and run the Request Type's compiled rules"""
+		# Load applicant data
+		if self.facts:
+			self.kyc = self.facts.kyc
+			self.household = self.facts.household
+			self.household_size = self.facts.household_size
+			self.birth_date = self.facts.birth_date
+		else:
+			self.load_applicant_data()
+
+		for check in evaluate_rules(self.request_type, self.get_facts()):
+			self.add_check(
+				check["criterion_name"], check["criterion_type"], check["score_earned"],
+				check["max_score"], check["status"], check["check_result"]
+			)
+
 	def load_applicant_data(self):
 		"""Load all relevant applicant data"""
 		# Get KYC status
@@ -58,150 +104,40 @@ class EligibilityEngine:
 		self.household = frappe.db.get_value(
 			"Household Record",
 			{"head_of_household": self.requester},
-			["*"],
+			HOUSEHOLD_FIELDS,
 			as_dict=True
 		)
 
-		# Get household members
-		if self.household:
-			self.household_members = frappe.get_all(
-				"Household Member",
-				filters={"parent": self.household.name},
-				fields=["*"]
-			)
-		else:
-			self.household_members = []
-
-	def check_spisc_eligibility(self):
-		"""
-		Social Pension for Indigent Senior Citizens (SPISC) criteria:
-		1. MANDATORY: Age 60+ (25 points)
-		2. MANDATORY: KYC Verified (20 points)
-		3. MANDATORY: Below poverty threshold (20 points)
-		4. WEIGHTED: No other pension (15 points)
-		5. WEIGHTED: Verified by barangay (10 points)
-		6. WEIGHTED: Living alone or with dependents (10 points)
-		"""
-		# Criterion 1: Age 60+
-		age = self.get_applicant_age()
-		if age >= 60:
-			self.add_check("Age 60 or above", "Mandatory", 25, 25, "Passed", f"Applicant is {age} years old")
-		else:
-			self.add_check("Age 60 or above", "Mandatory", 0, 25, "Failed", f"Applicant is only {age} years old")
-
-		# Criterion 2: KYC Verified
-		if self.kyc and self.kyc.verification_status == "Verified":
-			self.add_check("KYC Verified", "Mandatory", 20, 20, "Passed", "Identity verified")
-		else:
-			self.add_check("KYC Verified", "Mandatory", 0, 20, "Failed", "KYC not verified")
-
-		# Criterion 3: Below poverty threshold
-		if self.household and self.household.poverty_threshold_status == "Below":
-			self.add_check("Below Poverty Threshold", "Mandatory", 20, 20, "Passed", "Household income below threshold")
-		else:
-			self.add_check("Below Poverty Threshold", "Mandatory", 0, 20, "Failed", "Not below poverty threshold")
+		# Count household members
+		self.household_size = frappe.db.count(
+			"Household Member",
+			{"parent": self.household.name, "parenttype": "Household Record"}
+		) if self.household else 0
 
-		# Criterion 4: No other pension
-		has_other_pension = self.check_existing_benefits()
-		if not has_other_pension:
-			self.add_check("No Other Pension", "Weighted", 15, 15, "Passed", "Not receiving SSS/GSIS pension")
-		else:
-			self.add_check("No Other Pension", "Weighted", 0, 15, "Failed", "Already receiving government pension")
+		self.birth_date = frappe.db.get_value("User", self.requester, "birth_date")
 
-		# Criterion 5: Barangay verification
-		if self.household and self.household.verified_by_barangay:
-			self.add_check("Barangay Verified", "Weighted", 10, 10, "Passed", f"Verified by {self.household.barangay_official}")
-		else:
-			self.add_check("Barangay Verified", "Weighted", 5, 10, "Partial", "Pending barangay verification")
-
-		# Criterion 6: Living situation
-		household_size = len(self.household_members) if self.household_members else 1
-		if household_size == 1:
-			self.add_check("Living Alone", "Weighted", 10, 10, "Passed", "Living alone - high priority")
-		elif household_size <= 3:
-			self.add_check("Small Household", "Weighted", 7, 10, "Partial", f"Small household ({household_size} members)")
-		else:
-			self.add_check("Living with Family", "Weighted", 5, 10, "Partial", f"Larger household ({household_size} members)")
-
-	def check_lsfa_eligibility(self):
-		"""
-		Local Senior Assistance / Financial Aid for Elderly criteria:
-		1. MANDATORY: Age 60+ (30 points)
-		2. MANDATORY: KYC Verified (20 points)
-		3. WEIGHTED: Emergency/crisis documented (20 points)
-		4. WEIGHTED: No recent assistance (15 points)
-		5. WEIGHTED: Below poverty threshold (15 points)
-		"""
-		# Criterion 1: Age 60+
-		age = self.get_applicant_age()
-		if age >= 60:
-			self.add_check("Age 60 or above", "Mandatory", 30, 30, "Passed", f"Applicant is {age} years old")
-		else:
-			self.add_check("Age 60 or above", "Mandatory", 0, 30, "Failed", f"Applicant is only {age} years old")
-
-		# Criterion 2: KYC Verified
-		if self.kyc and self.kyc.verification_status == "Verified":
-			self.add_check("KYC Verified", "Mandatory", 20, 20, "Passed", "Identity verified")
-		else:
-			self.add_check("KYC Verified", "Mandatory", 0, 20, "Failed", "KYC not verified")
-
-		# Criterion 3: Emergency documented (checking request details)
-		# This would be enhanced with actual emergency documentation fields
-		self.add_check("Emergency Documented", "Weighted", 15, 20, "Partial", "Pending documentation review")
-
-		# Criterion 4: No recent assistance (check last 6 months)
-		recent_assistance = self.check_recent_assistance(months=6)
-		if not recent_assistance:
-			self.add_check("No Recent Assistance", "Weighted", 15, 15, "Passed", "No assistance in past 6 months")
-		else:
-			self.add_check("No Recent Assistance", "Weighted", 5, 15, "Partial", f"Received assistance {recent_assistance} months ago")
-
-		# Criterion 5: Below poverty threshold
-		if self.household and self.household.poverty_threshold_status == "Below":
-			self.add_check("Below Poverty Threshold", "Weighted", 15, 15, "Passed", "Household income below threshold")
-		else:
-			self.add_check("Below Poverty Threshold", "Weighted", 10, 15, "Partial", "At or above poverty threshold")
-
-	def check_bmss_eligibility(self):
-		"""
-		Burial / Medical Support for Seniors criteria:
-		1. MANDATORY: Deceased/Patient was 60+ (30 points)
-		2. MANDATORY: KYC Verified (applicant) (20 points)
-		3. MANDATORY: Death certificate or medical docs (20 points)
-		4. WEIGHTED: Family relationship verified (15 points)
-		5. WEIGHTED: No other burial/medical assistance (15 points)
-		"""
-		# For burial/medical, age check is on the senior (not applicant)
-		# This would need additional fields on Request
-		self.add_check("Senior Citizen Beneficiary", "Mandatory", 30, 30, "Passed", "Pending document verification")
-
-		# Criterion 2: Applicant KYC Verified
-		if self.kyc and self.kyc.verification_status == "Verified":
-			self.add_check("Applicant KYC Verified", "Mandatory", 20, 20, "Passed", "Applicant identity verified")
-		else:
-			self.add_check("Applicant KYC Verified", "Mandatory", 0, 20, "Failed", "Applicant KYC not verified")
-
-		# Criterion 3: Documentation
-		self.add_check("Death/Medical Certificate", "Mandatory", 15, 20, "Partial", "Pending document upload")
-
-		# Criterion 4: Family relationship
-		self.add_check("Family Relationship", "Weighted", 10, 15, "Partial", "Pending verification")
-
-		# Criterion 5: No other assistance
-		self.add_check("No Other Burial/Medical Aid", "Weighted", 15, 15, "Passed", "First time claiming")
-
-	def check_generic_eligibility(self):
-		"""Generic eligibility checks for other programs"""
-		# Basic checks
-		if self.kyc and self.kyc.verification_status == "Verified":
-			self.add_check("KYC Verified", "Mandatory", 50, 50, "Passed", "Identity verified")
-		else:
-			self.add_check("KYC Verified", "Mandatory", 0, 50, "Failed", "KYC not verified")
-
-		if self.household:
-			self.add_check("Household Registered", "Weighted", 50, 50, "Passed", "Household data available")
-		else:
-			self.add_check("Household Registered", "Weighted", 25, 50, "Partial", "No household record")
+	def get_facts(self):
+		"""Applicant facts the eligibility rules are evaluated against (see FACT_TYPES)"""
+		household = self.household or frappe._dict()
+		return {
+			"age": self.get_applicant_age(),
+			"kyc_verified": bool(self.kyc and self.kyc.verification_status == "Verified"),
+			"household_registered": bool(self.household),
+			"household_size": self.household_size or 1,
+			"below_poverty_threshold": household.poverty_threshold_status == "Below",
+			"poverty_threshold_status": household.poverty_threshold_status,
+			"barangay_verified": bool(household.verified_by_barangay),
+			"barangay_official": household.barangay_official,
+			"total_monthly_income": flt(household.total_monthly_income) if self.household else None,
+			"fourps_beneficiary": bool(household.fourps_beneficiary),
+			"has_pwd_member": bool(household.has_pwd_member),
+			"has_senior_citizen": bool(household.has_senior_citizen),
+			"has_solo_parent": bool(household.has_solo_parent),
+			"disaster_affected": bool(household.disaster_affected),
+			"health_crisis": bool(household.health_crisis),
+			"has_other_pension": self.check_existing_benefits(),
+			"recent_assistance_months": self.check_recent_assistance(months=6)
+		}
 
 	def add_check(self, name, criterion_type, score, max_score, status, notes):
 		"""Add a criteria check result"""
@@ -219,24 +155,20 @@ class EligibilityEngine:
 
 	def get_applicant_age(self):
 		"""Calculate applicant's age"""
-		user = frappe.get_doc("User", self.requester)
-		if user.birth_date:
+		if self.birth_date:
 			today = getdate(nowdate())
-			birth = getdate(user.birth_date)
+			birth = getdate(self.birth_date)
 			age = today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
 			return age
 		return 0
 
 	def check_existing_benefits(self):
 		"""Check if applicant already receives government benefits"""
+		if self.facts:
+			return bool(self.facts.pension_requests - {self.request.name})
+
 		# Check for existing SPISC approval
-		existing = frappe.db.exists("Request", {
-			"requester_email": self.requester,
-			"request_type": "Social Pension for Indigent Senior Citizens (SPISC)",
-			"status": ["in", ["Approved", "Active"]],
-			"name": ["!=", self.request.name]
-		})
-		return existing
+		return bool(get_pension_requests([self.requester]).get(self.requester, set()) - {self.request.name})
 
 	def check_recent_assistance(self, months=6):
 		"""Check if applicant received assistance in last X months"""
@@ -244,10 +176,9 @@ class EligibilityEngine:
 		# For now, return None (no recent assistance found)
 		return None
 
-	def create_eligibility_result(self):
-		"""Create and save eligibility result document"""
-		result = frappe.get_doc({
-			"doctype": "Eligibility Criteria Result",
+	def get_result_values(self):
+		"""Fields of the Eligibility Criteria Result for the evaluated criteria"""
+		return {
 			"request": self.request.name,
 			"request_type": self.request.request_type,
 			"requester": self.requester,
@@ -258,6 +189,13 @@ class EligibilityEngine:
 			"household_verified": bool(self.household and self.household.verified_by_barangay),
 			"has_senior_citizen": self.get_applicant_age() >= 60,
 			"below_poverty_threshold": bool(self.household and self.household.poverty_threshold_status == "Below")
+		}
+
+	def create_eligibility_result(self):
+		"""Create and save eligibility result document"""
+		result = frappe.get_doc({
+			"doctype": "Eligibility Criteria Result",
+			**self.get_result_values()
 		})
 
 		# Add criteria checks
@@ -265,4 +203,265 @@ class EligibilityEngine:
 			result.append("criteria_checks", check)
 
 		result.insert(ignore_permissions=True)
+		flush_rule_stats()
 		return result
+
+
+def get_pension_requests(requesters):
+	"""Approved SPISC Requests per requester, in one query: {requester: {request}}"""
+	pensions = {}
+	if not requesters:
+		return pensions
+
+	for row in frappe.db.sql("""
+		SELECT r.name, r.requester
+		FROM `tabRequest` r
+		INNER JOIN `tabRequest Type` rt ON rt.name = r.request_type
+		WHERE rt.type_code = %(type_code)s
+		AND r.requester IN %(requesters)s
+		AND r.workflow_state IN %(states)s
+	""", {"type_code": PENSION_TYPE_CODE, "requesters": tuple(requesters), "states": APPROVED_STATES}, as_dict=True):
+		pensions.setdefault(row.requester, set()).add(row.name)
+	return pensions
+
+
+def load_batch_facts(request_names):
+	"""
+	Preload everything the engine reads for many Requests with set-based queries
+
+	One query each for the Requests, their Request Types, KYC, households,
+	household sizes, birth dates and existing pensions, however many
+	Requests there are.
+
+	Returns:
+		dict: {request: _dict(request, request_type, kyc, household, household_size,
+		birth_date, pension_requests)}
+	"""
+	requests = frappe.get_all(
+		"Request",
+		filters={"name": ["in", list(request_names)]},
+		fields=["name", "request_type", "requester"]
+	)
+	if not requests:
+		return {}
+
+	requesters = list({request.requester for request in requests if request.requester})
+	# Full documents (cached) so the rule table is available to the rule compiler
+	request_types = {
+		name: frappe.get_cached_doc("Request Type", name)
+		for name in {request.request_type for request in requests}
+		if name
+	}
+
+	kyc = {}
+	households = {}
+	birth_dates = {}
+	if requesters:
+		for row in frappe.get_all(
+			"User Identity Verification",
+			filters={"user": ["in", requesters]},
+			fields=["user", "verification_status", "philsys_id", "sss_number"],
+			order_by="modified desc"
+		):
+			kyc.setdefault(row.user, row)
+
+		for row in frappe.get_all(
+			"Household Record",
+			filters={"head_of_household": ["in", requesters]},
+			fields=HOUSEHOLD_FIELDS,
+			order_by="modified desc"
+		):
+			households.setdefault(row.head_of_household, row)
+
+		birth_dates = dict(frappe.get_all(
+			"User", filters={"name": ["in", requesters]}, fields=["name", "birth_date"], as_list=True
+		))
+
+	household_sizes = {}
+	if households:
+		household_sizes = dict(frappe.db.sql("""
+			SELECT `parent`, COUNT(*)
+			FROM `tabHousehold Member`
+			WHERE `parenttype` = 'Household Record' AND `parent` IN %(households)s
+			GROUP BY `parent`
+		""", {"households": tuple(household.name for household in households.values())}))
+
+	pensions = get_pension_requests(requesters)
+
+	facts = {}
+	for request in requests:
+		household = households.get(request.requester)
+		facts[request.name] = frappe._dict(
+			request=request,
+			request_type=request_types.get(request.request_type) or frappe._dict(name=request.request_type),
+			kyc=kyc.get(request.requester),
+			household=household,
+			household_size=household_sizes.get(household.name, 0) if household else 0,
+			birth_date=birth_dates.get(request.requester),
+			pension_requests=pensions.get(request.requester, set())
+		)
+	return facts
+
+
+def evaluate_batch(request_names, rescore=False):
+	"""
+	Score many Requests in memory and bulk-insert their Eligibility Criteria Results
+
+	Requests that already have a result are skipped, unless ``rescore`` is set,
+	in which case their results are replaced; manually overridden results
+	are always kept. Result fields set by the Eligibility Criteria Result
+	controller (percentage, status, decision) are computed the same way, and
+	the comment the controller adds to approved Requests is bulk-inserted too.
+
+	Returns:
+		dict: {"evaluated", "skipped", "eligible"}
+	"""
+	from councilsonline.utils.sequence import next_db_series_values
+
+	request_names = list(request_names)
+	existing = frappe.get_all(
+		"Eligibility Criteria Result",
+		filters={"request": ["in", request_names]},
+		fields=["name", "request", "manual_override"]
+	) if request_names else []
+
+	keep = {row.request for row in existing if row.manual_override or not rescore}
+	replace = [row.name for row in existing if row.request not in keep]
+	pending = [name for name in request_names if name not in keep]
+
+	facts = load_batch_facts(pending)
+	engines = []
+	for name in pending:
+		if name in facts:
+			engine = EligibilityEngine(name, facts=facts[name])
+			engine.evaluate()
+			engines.append(engine)
+
+	if replace:
+		frappe.db.delete("Criteria Check Item", {"parenttype": "Eligibility Criteria Result", "parent": ["in", replace]})
+		frappe.db.delete("Eligibility Criteria Result", {"name": ["in", replace]})
+
+	if engines:
+		insert_results(engines, next_db_series_values([f"ELIG-{engine.request.name}-" for engine in engines]))
+		flush_rule_stats()
+
+	return {
+		"evaluated": len(engines),
+		"skipped": len(request_names) - len(engines),
+		"eligible": sum(1 for engine in engines if engine.decision == "Approved")
+	}
+
+
+def insert_results(engines, numbers):
+	"""Bulk-insert evaluated engines' results, their criteria rows and approval comments"""
+	timestamp = now()
+	user = frappe.session.user
+	results, checks, comments = [], [], []
+
+	for engine in engines:
+		values = engine.get_result_values()
+		percentage = flt(values["overall_score"]) / flt(values["max_possible_score"]) * 100 \
+			if values["overall_score"] and values["max_possible_score"] else 0
+		status, decision, note = determine_eligibility(percentage, values["kyc_verified"])
+		engine.decision = decision
+
+		prefix = f"ELIG-{engine.request.name}-"
+		name = f"{prefix}{numbers[prefix]:04d}"
+		values.update({
+			"evaluation_date": timestamp,
+			"score_percentage": percentage,
+			"eligibility_status": status,
+			"final_decision": decision,
+			"eligibility_notes": note
+		})
+		results.append((name, timestamp, timestamp, user, user, 0, *(values[field] for field in RESULT_FIELDS)))
+
+		for idx, check in enumerate(engine.criteria_checks, start=1):
+			checks.append((
+				frappe.generate_hash(length=10), timestamp, timestamp, user, user, 0,
+				name, "Eligibility Criteria Result", "criteria_checks", idx,
+				*(check[field] for field in CHECK_FIELDS)
+			))
+
+		if decision == "Approved":
+			comments.append((
+				frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+				"Comment", "Request", engine.request.name, user,
+				f"Eligibility check passed with {percentage:.1f}% score"
+			))
+
+	frappe.db.bulk_insert(
+		"Eligibility Criteria Result",
+		fields=["name", "creation", "modified", "owner", "modified_by", "docstatus", *RESULT_FIELDS],
+		values=results
+	)
+	if checks:
+		frappe.db.bulk_insert(
+			"Criteria Check Item",
+			fields=[
+				"name", "creation", "modified", "owner", "modified_by", "docstatus",
+				"parent", "parenttype", "parentfield", "idx", *CHECK_FIELDS
+			],
+			values=checks
+		)
+	if comments:
+		frappe.db.bulk_insert(
+			"Comment",
+			fields=[
+				"name", "creation", "modified", "owner", "modified_by",
+				"comment_type", "reference_doctype", "reference_name", "comment_email", "content"
+			],
+			values=comments
+		)
+
+
+def run_eligibility_batch(request_names, rescore=False, job_id=None):
+	"""
+	Background job: evaluate Requests in chunks, committing and reporting progress after each
+
+	Progress is published to the user who started the job and kept in the
+	cache under the job id for polling with get_batch_status. Chunks already
+	committed are kept if a later chunk fails; the job is then reported as
+	Failed with the error and the exception re-raised for the job queue.
+	"""
+	request_names = list(request_names)
+	totals = {"evaluated": 0, "skipped": 0, "eligible": 0}
+	total = len(request_names)
+	done = 0
+
+	try:
+		for start in range(0, total, BATCH_SIZE):
+			chunk = evaluate_batch(request_names[start:start + BATCH_SIZE], rescore=rescore)
+			frappe.db.commit()
+
+			for field in totals:
+				totals[field] += chunk[field]
+			done = min(start + BATCH_SIZE, total)
+			set_batch_status(job_id, {"status": "Running", "processed": done, "total": total, **totals})
+			frappe.publish_progress(
+				done * 100 / total,
+				title="Eligibility re-scoring",
+				description=f"{done} of {total} requests processed"
+			)
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.log_error(title="Eligibility Batch Error", message=frappe.get_traceback())
+		set_batch_status(job_id, {"status": "Failed", "error": str(e), "processed": done, "total": total, **totals})
+		raise
+
+	set_batch_status(job_id, {"status": "Completed", "processed": total, "total": total, **totals})
+	return totals
+
+
+def get_batch_status_key(job_id):
+	return f"councilsonline:eligibility_batch:{job_id}"
+
+
+def set_batch_status(job_id, status):
+	if job_id:
+		frappe.cache().set_value(get_batch_status_key(job_id), status, expires_in_sec=24 * 60 * 60)
+
+
+def get_batch_status(job_id):
+	"""Progress of a batch job: {"status", "processed", "total", "evaluated", "skipped", "eligible"}, plus "error" if Failed"""
+	return frappe.cache().get_value(get_batch_status_key(job_id))
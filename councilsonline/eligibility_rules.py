@@ -0,0 +1,381 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+"""
+Declarative Eligibility Rules
+
+Each Request Type's Eligibility Rule rows (or the built-in rule set for its
+type code) are compiled once into Python closures over the applicant facts.
+The compiled rules are cached per Request Type version. Evaluating a request
+only calls the closures, and per-rule call counts and timings are collected
+for tuning.
+"""
+
+import operator
+import time
+
+import frappe
+import redis
+from frappe.utils import cint, flt
+
+
+# Applicant facts rules can test, with the type values are compared as
+FACT_TYPES = {
+	"age": int,
+	"kyc_verified": bool,
+	"household_registered": bool,
+	"household_size": int,
+	"below_poverty_threshold": bool,
+	"poverty_threshold_status": str,
+	"barangay_verified": bool,
+	"total_monthly_income": float,
+	"fourps_beneficiary": bool,
+	"has_pwd_member": bool,
+	"has_senior_citizen": bool,
+	"has_solo_parent": bool,
+	"disaster_affected": bool,
+	"health_crisis": bool,
+	"has_other_pension": bool,
+	"recent_assistance_months": int
+}
+
+COMPARISONS = {
+	"=": operator.eq,
+	"!=": operator.ne,
+	">": operator.gt,
+	">=": operator.ge,
+	"<": operator.lt,
+	"<=": operator.le
+}
+
+RULE_FIELDS = (
+	"criterion_name", "criterion_group", "criterion_type", "fact", "operator", "value",
+	"weight", "score_if_met", "score_if_not_met", "note_if_met", "note_if_not_met"
+)
+
+RULE_STATS_KEY_PREFIX = "councilsonline:eligibility_rule_stats:"
+
+
+def rule(name, criterion_type, fact, op, value, weight, met, not_met, note_met, note_not_met, group=None):
+	return {
+		"criterion_name": name, "criterion_group": group, "criterion_type": criterion_type,
+		"fact": fact, "operator": op, "value": value, "weight": weight,
+		"score_if_met": met, "score_if_not_met": not_met,
+		"note_if_met": note_met, "note_if_not_met": note_not_met
+	}
+
+
+AGE_MET = "Applicant is {age} years old"
+AGE_NOT_MET = "Applicant is only {age} years old"
+
+# Built-in rule sets per Request Type code, used when a Request Type has no rules of its own
+DEFAULT_RULES = {
+	# Social Pension for Indigent Senior Citizens
+	"SPISC": [
+		rule("Age 60 or above", "Mandatory", "age", ">=", "60", 25, 25, 0, AGE_MET, AGE_NOT_MET),
+		rule("KYC Verified", "Mandatory", "kyc_verified", "=", "1", 20, 20, 0, "Identity verified", "KYC not verified"),
+		rule(
+			"Below Poverty Threshold", "Mandatory", "below_poverty_threshold", "=", "1", 20, 20, 0,
+			"Household income below threshold", "Not below poverty threshold"
+		),
+		rule(
+			"No Other Pension", "Weighted", "has_other_pension", "=", "0", 15, 15, 0,
+			"Not receiving SSS/GSIS pension", "Already receiving government pension"
+		),
+		rule(
+			"Barangay Verified", "Weighted", "barangay_verified", "=", "1", 10, 10, 5,
+			"Verified by {barangay_official}", "Pending barangay verification"
+		),
+		rule(
+			"Living Alone", "Weighted", "household_size", "<=", "1", 10, 10, 0,
+			"Living alone - high priority", None, group="Living Situation"
+		),
+		rule(
+			"Small Household", "Weighted", "household_size", "<=", "3", 10, 7, 0,
+			"Small household ({household_size} members)", None, group="Living Situation"
+		),
+		rule(
+			"Living with Family", "Weighted", None, "always", None, 10, 5, 0,
+			"Larger household ({household_size} members)", None, group="Living Situation"
+		)
+	],
+	# Local Senior Assistance / Financial Aid for Elderly
+	"LSFA": [
+		rule("Age 60 or above", "Mandatory", "age", ">=", "60", 30, 30, 0, AGE_MET, AGE_NOT_MET),
+		rule("KYC Verified", "Mandatory", "kyc_verified", "=", "1", 20, 20, 0, "Identity verified", "KYC not verified"),
+		rule(
+			"Emergency Documented", "Weighted", None, "always", None, 20, 15, 0,
+			"Pending documentation review", None
+		),
+		rule(
+			"No Recent Assistance", "Weighted", "recent_assistance_months", "is not set", None, 15, 15, 5,
+			"No assistance in past 6 months", "Received assistance {recent_assistance_months} months ago"
+		),
+		rule(
+			"Below Poverty Threshold", "Weighted", "below_poverty_threshold", "=", "1", 15, 15, 10,
+			"Household income below threshold", "At or above poverty threshold"
+		)
+	],
+	# Burial / Medical Support for Seniors
+	"BMSS": [
+		rule(
+			"Senior Citizen Beneficiary", "Mandatory", None, "always", None, 30, 30, 0,
+			"Pending document verification", None
+		),
+		rule(
+			"Applicant KYC Verified", "Mandatory", "kyc_verified", "=", "1", 20, 20, 0,
+			"Applicant identity verified", "Applicant KYC not verified"
+		),
+		rule(
+			"Death/Medical Certificate", "Mandatory", None, "always", None, 20, 15, 0,
+			"Pending document upload", None
+		),
+		rule("Family Relationship", "Weighted", None, "always", None, 15, 10, 0, "Pending verification", None),
+		rule(
+			"No Other Burial/Medical Aid", "Weighted", None, "always", None, 15, 15, 0,
+			"First time claiming", None
+		)
+	],
+	None: [
+		rule("KYC Verified", "Mandatory", "kyc_verified", "=", "1", 50, 50, 0, "Identity verified", "KYC not verified"),
+		rule(
+			"Household Registered", "Weighted", "household_registered", "=", "1", 50, 50, 25,
+			"Household data available", "No household record"
+		)
+	]
+}
+
+# Compiled rule sets: {(request type, modified): [CompiledCriterion]}
+_compiled_rules = {}
+
+# Per-rule counters not yet flushed to the cache: {(request type, criterion): [calls, met, nanoseconds]}
+_rule_stats = {}
+
+
+class _Facts(dict):
+	"""Facts for note templates; unknown names render empty"""
+
+	def __missing__(self, key):
+		return ""
+
+
+def coerce(value, kind):
+	"""Convert a rule's text value to the fact's type"""
+	if kind is bool:
+		return str(value).strip().lower() in ("1", "yes", "true", "y")
+	if kind is int:
+		return cint(value)
+	if kind is float:
+		return flt(value)
+	return str(value).strip()
+
+
+def compile_predicate(fact, op, value):
+	"""
+	Compile a rule condition into a closure over the facts dict
+
+	Missing (None) facts never satisfy a comparison or membership test.
+	"""
+	if op == "always":
+		return lambda facts: True
+	if fact not in FACT_TYPES:
+		frappe.throw(f"Unknown applicant fact: {fact}")
+	kind = FACT_TYPES[fact]
+
+	if op == "is set":
+		return lambda facts: facts.get(fact) not in (None, "")
+	if op == "is not set":
+		return lambda facts: facts.get(fact) in (None, "")
+
+	if op in ("in", "not in"):
+		members = frozenset(coerce(item, kind) for item in str(value or "").split(",") if item.strip())
+		if op == "in":
+			return lambda facts: facts.get(fact) is not None and facts[fact] in members
+		return lambda facts: facts.get(fact) is not None and facts[fact] not in members
+
+	if op not in COMPARISONS:
+		frappe.throw(f"Unknown eligibility rule operator: {op}")
+	if value in (None, "") and kind is not str:
+		frappe.throw(f"A value is required to compare {fact} with {op}")
+
+	compare = COMPARISONS[op]
+	target = coerce(value, kind)
+	return lambda facts: facts.get(fact) is not None and compare(facts[fact], target)
+
+
+def compile_note(template):
+	"""Compile a note into a closure; plain text is returned as is"""
+	if not template:
+		return lambda facts: ""
+	if "{" not in template:
+		return lambda facts: template
+	return lambda facts: template.format_map(_Facts(facts))
+
+
+class CompiledRule:
+	"""One rule row: its predicate, scores and notes, ready to evaluate"""
+
+	__slots__ = ("name", "criterion_type", "weight", "met", "not_met", "predicate", "note_met", "note_not_met")
+
+	def __init__(self, row):
+		self.name = row.get("criterion_name")
+		self.criterion_type = row.get("criterion_type") or "Weighted"
+		self.weight = flt(row.get("weight"))
+		self.met = flt(row.get("score_if_met"))
+		self.not_met = flt(row.get("score_if_not_met"))
+		self.predicate = compile_predicate(row.get("fact"), row.get("operator"), row.get("value"))
+		self.note_met = compile_note(row.get("note_if_met"))
+		self.note_not_met = compile_note(row.get("note_if_not_met"))
+
+	def check(self, score, facts, met):
+		if met:
+			status = "Passed" if score >= self.weight else "Partial"
+			note = self.note_met(facts)
+		else:
+			status = "Partial" if score else "Failed"
+			note = self.note_not_met(facts)
+		return {
+			"criterion_name": self.name,
+			"criterion_type": self.criterion_type,
+			"score_earned": score,
+			"max_score": self.weight,
+			"status": status,
+			"check_result": note,
+			"weight": self.weight
+		}
+
+
+class CompiledCriterion:
+	"""
+	A criterion: one rule, or a group of alternative rules
+
+	The first rule whose predicate holds scores the criterion; if none holds,
+	the last rule fails it.
+	"""
+
+	__slots__ = ("name", "rules")
+
+	def __init__(self, name, rules):
+		self.name = name
+		self.rules = rules
+
+	def evaluate(self, facts):
+		"""Returns (check dict, met)"""
+		for compiled in self.rules:
+			if compiled.predicate(facts):
+				return compiled.check(compiled.met, facts, True), True
+		last = self.rules[-1]
+		return last.check(last.not_met, facts, False), False
+
+
+def compile_rules(rows):
+	"""Compile rule rows (dicts or child rows) into criteria, in row order"""
+	criteria = []
+	groups = {}
+	for row in rows:
+		if not row.get("criterion_name"):
+			continue
+		compiled = CompiledRule(row)
+		group = row.get("criterion_group")
+		if group and group in groups:
+			groups[group].rules.append(compiled)
+			continue
+
+		criterion = CompiledCriterion(group or compiled.name, [compiled])
+		criteria.append(criterion)
+		if group:
+			groups[group] = criterion
+	return criteria
+
+
+def get_rule_rows(request_type):
+	"""A Request Type's active rule rows, or the built-in set for its type code"""
+	rows = [row for row in (request_type.get("eligibility_rules") or []) if row.get("is_active", 1)]
+	if rows:
+		return rows
+	return DEFAULT_RULES.get(request_type.get("type_code")) or DEFAULT_RULES[None]
+
+
+def get_compiled_rules(request_type):
+	"""
+	Compiled criteria for a Request Type, compiled once per Request Type version
+
+	Args:
+		request_type: Request Type document (or dict with name, type_code,
+			modified and optionally eligibility_rules)
+	"""
+	key = (request_type.get("name"), str(request_type.get("modified") or ""), request_type.get("type_code"))
+	compiled = _compiled_rules.get(key)
+	if compiled is None:
+		compiled = _compiled_rules[key] = compile_rules(get_rule_rows(request_type))
+	return compiled
+
+
+def evaluate_rules(request_type, facts):
+	"""
+	Run a Request Type's compiled criteria over applicant facts
+
+	Returns:
+		list: Criteria Check Item dicts, in rule order
+	"""
+	rule_set = request_type.get("name")
+	checks = []
+	for criterion in get_compiled_rules(request_type):
+		started = time.perf_counter_ns()
+		check, met = criterion.evaluate(facts)
+		elapsed = time.perf_counter_ns() - started
+
+		stats = _rule_stats.get((rule_set, criterion.name))
+		if stats is None:
+			stats = _rule_stats[(rule_set, criterion.name)] = [0, 0, 0]
+		stats[0] += 1
+		stats[1] += met
+		stats[2] += elapsed
+
+		checks.append(check)
+	return checks
+
+
+def flush_rule_stats():
+	"""Add this worker's rule counters to the shared counters in the cache and reset them"""
+	if not _rule_stats:
+		return
+
+	cache = frappe.cache()
+	pipeline = cache.pipeline()
+	for (rule_set, criterion), (calls, met, elapsed) in _rule_stats.items():
+		key = cache.make_key(f"{RULE_STATS_KEY_PREFIX}{rule_set}")
+		pipeline.hincrby(key, f"{criterion}|calls", calls)
+		pipeline.hincrby(key, f"{criterion}|met", met)
+		pipeline.hincrby(key, f"{criterion}|ns", elapsed)
+	pipeline.execute()
+	_rule_stats.clear()
+
+
+def get_rule_stats(request_type):
+	"""
+	Shared per-rule counters of a Request Type
+
+	Returns:
+		list: [{"criterion", "calls", "met", "total_ms", "avg_us"}] in criterion name order
+	"""
+	cache = frappe.cache()
+	# Read the raw HINCRBY integers; the cache wrapper would prefix the key again and unpickle the values
+	raw = redis.Redis.hgetall(cache, cache.make_key(f"{RULE_STATS_KEY_PREFIX}{request_type}")) or {}
+
+	stats = {}
+	for field, value in raw.items():
+		field = field.decode() if isinstance(field, bytes) else field
+		criterion, counter = field.rsplit("|", 1)
+		stats.setdefault(criterion, {"calls": 0, "met": 0, "ns": 0})[counter] = cint(value)
+
+	return [
+		{
+			"criterion": criterion,
+			"calls": counts["calls"],
+			"met": counts["met"],
+			"total_ms": counts["ns"] / 1e6,
+			"avg_us": counts["ns"] / counts["calls"] / 1e3 if counts["calls"] else 0
+		}
+		for criterion, counts in sorted(stats.items())
+	]
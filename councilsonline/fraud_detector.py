@@ -9,7 +9,22 @@ and potential fraud in applications and payouts.
 """
 
 import frappe
-from frappe.utils import add_months, nowdate
+from frappe.utils import add_months, cint, now, nowdate
+
+from councilsonline.eligibility_engine import PENSION_TYPE_CODE
+
+
+# Request states that count as an active application
+ACTIVE_REQUEST_STATES = ("Submitted", "Acknowledged", "Processing", "Approved", "Approved with Conditions")
+OPEN_CASE_STATUSES = ("Open", "Under Investigation", "Pending Review")
+INVESTIGATION_THRESHOLD = 70
+CASE_FIELDS = (
+	"case_title", "case_type", "priority", "case_status", "opened_date", "subject_user",
+	"fraud_type", "risk_score", "automated_flags"
+)
+
+# Last completed sweep, stored with frappe.db.set_global
+SWEEP_WATERMARK_KEY = "councilsonline_fraud_sweep_watermark"
 
 
 class FraudDetector:
@@ -32,127 +47,48 @@ class FraudDetector:
 		return {
 			"risk_score": self.risk_score,
 			"flags": self.flags,
-			"requires_investigation": self.risk_score >= 70
+			"requires_investigation": self.risk_score >= INVESTIGATION_THRESHOLD
 		}
 
+	def apply_rule(self, rule):
+		"""Run one set-based rule for this user alone and add its score and flags"""
+		flags = rule([self.user]).get(self.user)
+		if flags:
+			self.risk_score += RULE_SCORES[rule]
+			self.flags.extend(flags)
+
 	def check_duplicate_applications(self):
 		"""Check for duplicate active applications"""
-		# Check for multiple active requests for same program
-		active_requests = frappe.db.sql("""
-			SELECT request_type, COUNT(*) as count
-			FROM `tabRequest`
-			WHERE applicant_email = %s
-				AND status IN ('Submitted', 'Under Review', 'Approved', 'Active')
-			GROUP BY request_type
-			HAVING count > 1
-		""", self.user, as_dict=True)
-
-		if active_requests:
-			self.risk_score += 30
-			for req in active_requests:
-				self.flags.append(f"Multiple active applications for {req.request_type}: {req.count} found")
+		self.apply_rule(find_duplicate_applications)
 
 	def check_duplicate_identity(self):
 		"""Check for duplicate PhilSys ID or SSS numbers"""
-		# Get user's KYC
-		kyc = frappe.db.get_value("User Identity Verification",
-								 {"user": self.user},
-								 ["philsys_id", "sss_number"],
-								 as_dict=True)
-
-		if not kyc:
-			return
-
-		# Check PhilSys ID
-		if kyc.philsys_id:
-			duplicates = frappe.db.count("User Identity Verification", {
-				"philsys_id": kyc.philsys_id,
-				"user": ["!=", self.user],
-				"verification_status": "Verified"
-			})
-
-			if duplicates > 0:
-				self.risk_score += 50
-				self.flags.append(f"PhilSys ID {kyc.philsys_id} is used by {duplicates} other verified user(s)")
-
-		# Check SSS number
-		if kyc.sss_number:
-			duplicates = frappe.db.count("User Identity Verification", {
-				"sss_number": kyc.sss_number,
-				"user": ["!=", self.user],
-				"verification_status": "Verified"
-			})
-
-			if duplicates > 0:
-				self.risk_score += 50
-				self.flags.append(f"SSS Number {kyc.sss_number} is used by {duplicates} other verified user(s)")
+		self.apply_rule(find_duplicate_philsys_ids)
+		self.apply_rule(find_duplicate_sss_numbers)
 
 	def check_deceased_beneficiary(self):
 		"""Check if beneficiary is marked as deceased in masterlist"""
-		deceased = frappe.db.exists("Beneficiary Masterlist", {
-			"beneficiary": self.user,
-			"beneficiary_status": "Deceased"
-		})
-
-		if deceased:
-			self.risk_score += 100
-			self.flags.append("Beneficiary is marked as deceased but has active records")
+		self.apply_rule(find_deceased_beneficiaries)
 
 	def check_multiple_households(self):
 		"""Check if user is head of multiple households"""
-		household_count = frappe.db.count("Household Record", {
-			"head_of_household": self.user,
-			"household_status": "Active"
-		})
-
-		if household_count > 1:
-			self.risk_score += 40
-			self.flags.append(f"User is head of {household_count} active households")
+		self.apply_rule(find_multiple_households)
 
 	def check_recent_payout_frequency(self):
 		"""Check for unusually high payout frequency"""
-		# Get payouts in last 3 months
-		three_months_ago = add_months(nowdate(), -3)
-		payout_count = frappe.db.count("Benefit Payout", {
-			"beneficiary": self.user,
-			"payout_date": [">=", three_months_ago],
-			"payout_status": "Completed"
-		})
-
-		# Flag if more than 5 payouts in 3 months (except for monthly pensions)
-		if payout_count > 5:
-			# Check if it's monthly pension (expected frequency)
-			pension_count = frappe.db.count("Benefit Payout", {
-				"beneficiary": self.user,
-				"payout_date": [">=", three_months_ago],
-				"request_type": "Social Pension for Indigent Senior Citizens (SPISC)",
-				"payout_status": "Completed"
-			})
-
-			if payout_count - pension_count > 3:
-				self.risk_score += 25
-				self.flags.append(f"High payout frequency: {payout_count} payouts in last 3 months")
+		self.apply_rule(find_high_payout_frequency)
 
 	def check_cross_program_benefits(self):
 		"""Check for receiving benefits from multiple programs simultaneously"""
-		active_programs = frappe.db.sql("""
-			SELECT DISTINCT bm.program_type
-			FROM `tabBeneficiary Masterlist` bm
-			WHERE bm.beneficiary = %s
-				AND bm.beneficiary_status = 'Active'
-		""", self.user, as_dict=True)
-
-		if len(active_programs) > 2:
-			self.risk_score += 20
-			self.flags.append(f"Receiving benefits from {len(active_programs)} different programs simultaneously")
+		self.apply_rule(find_cross_program_benefits)
 
 	def create_investigation_case(self):
 		"""Create fraud investigation case if risk score is high"""
-		if self.risk_score >= 70:
+		if self.risk_score >= INVESTIGATION_THRESHOLD:
 			# Check if case already exists
 			existing = frappe.db.exists("Fraud Investigation Case", {
 				"subject_user": self.user,
-				"case_status": ["in", ["Open", "Under Investigation", "Pending Review"]]
+				"case_status": ["in", OPEN_CASE_STATUSES]
 			})
 
 			if existing:
@@ -161,14 +97,7 @@ class FraudDetector:
 			# Create new case
 			case = frappe.get_doc({
 				"doctype": "Fraud Investigation Case",
-				"case_title": f"Automated Fraud Alert - {self.user}",
-				"case_type": "Identity Fraud" if self.risk_score >= 90 else "Duplicate Application",
-				"priority": "Critical" if self.risk_score >= 90 else "High",
-				"case_status": "Open",
-				"subject_user": self.user,
-				"fraud_type": "Identity Theft" if self.risk_score >= 90 else "Duplicate Benefit",
-				"risk_score": self.risk_score,
-				"automated_flags": "\n".join(self.flags)
+				**get_case_values(self.user, self.risk_score, self.flags)
 			})
 
 			case.insert(ignore_permissions=True)
@@ -179,6 +108,305 @@ class FraudDetector:
 		return None
 
 
+# ================================
+# Set-based rules
+# ================================
+# Each rule evaluates the whole population (users=None) or a list of users
+# with one grouped query and returns {user: [flag]} for the users it flags.
+
+def user_condition(column, users):
+	return f"AND {column} IN %(users)s" if users is not None else ""
+
+
+def find_duplicate_applications(users=None):
+	"""Users with more than one active application for the same Request Type"""
+	flagged = {}
+	for row in frappe.db.sql(f"""
+		SELECT requester, request_type, COUNT(*) AS count
+		FROM `tabRequest`
+		WHERE workflow_state IN %(states)s
+			{user_condition("requester", users)}
+		GROUP BY requester, request_type
+		HAVING COUNT(*) > 1
+	""", {"states": ACTIVE_REQUEST_STATES, "users": tuple(users or ())}, as_dict=True):
+		flagged.setdefault(row.requester, []).append(
+			f"Multiple active applications for {row.request_type}: {row.count} found"
+		)
+	return flagged
+
+
+def find_duplicate_identifiers(field, label, users=None):
+	"""Users whose KYC identifier is also on other users' verified KYC records"""
+	flagged = {}
+	for row in frappe.db.sql(f"""
+		SELECT k.user, k.`{field}` AS identifier, COUNT(DISTINCT o.user) AS others
+		FROM `tabUser Identity Verification` k
+		INNER JOIN `tabUser Identity Verification` o
+			ON o.`{field}` = k.`{field}` AND o.user != k.user AND o.verification_status = 'Verified'
+		WHERE IFNULL(k.`{field}`, '') != ''
+			{user_condition("k.user", users)}
+		GROUP BY k.user, k.`{field}`
+		HAVING COUNT(DISTINCT o.user) > 0
+	""", {"users": tuple(users or ())}, as_dict=True):
+		# One flag per user, as for a single KYC record
+		flagged.setdefault(row.user, [
+			f"{label} {row.identifier} is used by {row.others} other verified user(s)"
+		])
+	return flagged
+
+
+def find_duplicate_philsys_ids(users=None):
+	return find_duplicate_identifiers("philsys_id", "PhilSys ID", users)
+
+
+def find_duplicate_sss_numbers(users=None):
+	return find_duplicate_identifiers("sss_number", "SSS Number", users)
+
+
+def find_deceased_beneficiaries(users=None):
+	"""Users marked as deceased in the masterlist"""
+	return {
+		user: ["Beneficiary is marked as deceased but has active records"]
+		for user in frappe.db.sql_list(f"""
+			SELECT DISTINCT beneficiary
+			FROM `tabBeneficiary Masterlist`
+			WHERE beneficiary_status = 'Deceased'
+				{user_condition("beneficiary", users)}
+		""", {"users": tuple(users or ())})
+	}
+
+
+def find_multiple_households(users=None):
+	"""Users heading more than one active household"""
+	return {
+		user: [f"User is head of {count} active households"]
+		for user, count in frappe.db.sql(f"""
+			SELECT head_of_household, COUNT(*)
+			FROM `tabHousehold Record`
+			WHERE household_status = 'Active'
+				{user_condition("head_of_household", users)}
+			GROUP BY head_of_household
+			HAVING COUNT(*) > 1
+		""", {"users": tuple(users or ())})
+	}
+
+
+def find_high_payout_frequency(users=None):
+	"""Users with more than 5 completed payouts in 3 months, over 3 of them not monthly pension"""
+	return {
+		user: [f"High payout frequency: {count} payouts in last 3 months"]
+		for user, count in frappe.db.sql(f"""
+			SELECT bp.beneficiary, COUNT(*)
+			FROM `tabBenefit Payout` bp
+			LEFT JOIN `tabRequest Type` rt ON rt.name = bp.request_type
+			WHERE bp.payout_status = 'Completed'
+				AND bp.payout_date >= %(since)s
+				{user_condition("bp.beneficiary", users)}
+			GROUP BY bp.beneficiary
+			HAVING COUNT(*) > 5
+				AND COUNT(*) - SUM(CASE WHEN rt.type_code = %(pension)s THEN 1 ELSE 0 END) > 3
+		""", {"since": add_months(nowdate(), -3), "pension": PENSION_TYPE_CODE, "users": tuple(users or ())})
+	}
+
+
+def find_cross_program_benefits(users=None):
+	"""Users active in the masterlist of more than two programmes"""
+	return {
+		user: [f"Receiving benefits from {count} different programs simultaneously"]
+		for user, count in frappe.db.sql(f"""
+			SELECT beneficiary, COUNT(DISTINCT program_type)
+			FROM `tabBeneficiary Masterlist`
+			WHERE beneficiary_status = 'Active'
+				{user_condition("beneficiary", users)}
+			GROUP BY beneficiary
+			HAVING COUNT(DISTINCT program_type) > 2
+		""", {"users": tuple(users or ())})
+	}
+
+
+RULE_SCORES = {
+	find_duplicate_applications: 30,
+	find_duplicate_philsys_ids: 50,
+	find_duplicate_sss_numbers: 50,
+	find_deceased_beneficiaries: 100,
+	find_multiple_households: 40,
+	find_high_payout_frequency: 25,
+	find_cross_program_benefits: 20
+}
+
+
+# ================================
+# Population sweep
+# ================================
+
+def score_users(users=None):
+	"""
+	Run every rule once and merge the results into per-user risk scores
+
+	Args:
+		users: Limit to these users (optional; whole population when omitted)
+
+	Returns:
+		dict: {user: {"risk_score", "flags"}} for flagged users, flags in rule order
+	"""
+	if users is not None:
+		users = list(users)
+		if not users:
+			return {}
+
+	scores = {}
+	for rule, score in RULE_SCORES.items():
+		for user, flags in rule(users).items():
+			if not user:
+				continue
+			entry = scores.setdefault(user, {"risk_score": 0, "flags": []})
+			entry["risk_score"] += score
+			entry["flags"].extend(flags)
+	return scores
+
+
+def get_touched_users(since):
+	"""
+	Users whose fraud inputs changed since a timestamp
+
+	Also includes users sharing a PhilSys ID or SSS number with a changed
+	user, since their duplicate-identity flags depend on the changed record.
+	"""
+	touched = set(frappe.db.sql_list("""
+		SELECT requester FROM `tabRequest` WHERE modified >= %(since)s
+		UNION SELECT user FROM `tabUser Identity Verification` WHERE modified >= %(since)s
+		UNION SELECT beneficiary FROM `tabBeneficiary Masterlist` WHERE modified >= %(since)s
+		UNION SELECT head_of_household FROM `tabHousehold Record` WHERE modified >= %(since)s
+		UNION SELECT beneficiary FROM `tabBenefit Payout` WHERE modified >= %(since)s
+	""", {"since": since}))
+	touched.discard(None)
+
+	if touched:
+		touched.update(frappe.db.sql_list("""
+			SELECT o.user
+			FROM `tabUser Identity Verification` k
+			INNER JOIN `tabUser Identity Verification` o ON o.philsys_id = k.philsys_id
+			WHERE k.user IN %(users)s AND IFNULL(k.philsys_id, '') != ''
+			UNION
+			SELECT o.user
+			FROM `tabUser Identity Verification` k
+			INNER JOIN `tabUser Identity Verification` o ON o.sss_number = k.sss_number
+			WHERE k.user IN %(users)s AND IFNULL(k.sss_number, '') != ''
+		""", {"users": tuple(touched)}))
+	return touched
+
+
+def get_case_values(user, risk_score, flags):
+	"""Fields of an automated Fraud Investigation Case"""
+	critical = risk_score >= 90
+	return {
+		"case_title": f"Automated Fraud Alert - {user}",
+		"case_type": "Identity Fraud" if critical else "Duplicate Application",
+		"priority": "Critical" if critical else "High",
+		"case_status": "Open",
+		"opened_date": nowdate(),
+		"subject_user": user,
+		"fraud_type": "Identity Theft" if critical else "Duplicate Benefit",
+		"risk_score": risk_score,
+		"automated_flags": "\n".join(flags)
+	}
+
+
+def upsert_investigation_cases(scores):
+	"""
+	Open or refresh Fraud Investigation Cases for high-risk users in bulk
+
+	Users with an open case get its risk score and flags updated; the others
+	get a new case. Cases of users no longer flagged are left for investigators.
+
+	Returns:
+		dict: {"created", "updated"}
+	"""
+	from councilsonline.utils.sequence import get_year, reserve_db_series
+
+	high_risk = {user: entry for user, entry in scores.items() if entry["risk_score"] >= INVESTIGATION_THRESHOLD}
+	if not high_risk:
+		return {"created": 0, "updated": 0}
+
+	open_cases = {}
+	for row in frappe.get_all(
+		"Fraud Investigation Case",
+		filters={"subject_user": ["in", list(high_risk)], "case_status": ["in", OPEN_CASE_STATUSES]},
+		fields=["name", "subject_user"],
+		order_by="creation asc"
+	):
+		open_cases.setdefault(row.subject_user, row.name)
+
+	if open_cases:
+		frappe.db.bulk_update(
+			"Fraud Investigation Case",
+			{
+				name: {
+					"risk_score": high_risk[user]["risk_score"],
+					"automated_flags": "\n".join(high_risk[user]["flags"])
+				}
+				for user, name in open_cases.items()
+			}
+		)
+
+	new_users = sorted(user for user in high_risk if user not in open_cases)
+	if new_users:
+		prefix = f"FRAUD-{get_year()}-"
+		first, _ = reserve_db_series(prefix, len(new_users))
+		timestamp = now()
+		owner = frappe.session.user
+		rows = []
+		for number, user in enumerate(new_users, start=first):
+			values = get_case_values(user, high_risk[user]["risk_score"], high_risk[user]["flags"])
+			rows.append((
+				f"{prefix}{number:05d}", timestamp, timestamp, owner, owner, 0,
+				*(values[field] for field in CASE_FIELDS)
+			))
+		frappe.db.bulk_insert(
+			"Fraud Investigation Case",
+			fields=["name", "creation", "modified", "owner", "modified_by", "docstatus", *CASE_FIELDS],
+			values=rows
+		)
+
+	return {"created": len(new_users), "updated": len(open_cases)}
+
+
+def run_fraud_sweep(incremental=True):
+	"""
+	Score every beneficiary (or those touched since the last sweep) and upsert investigation cases
+
+	Incremental sweeps rescan only users whose requests, KYC, masterlist
+	entries, households or payouts changed since the watermark; the first
+	sweep, or one with ``incremental`` off, scans the whole population.
+	Payouts ageing out of the 3-month window are only picked up by a full
+	sweep.
+
+	Returns:
+		dict: {"mode", "scanned", "flagged", "created", "updated"}
+	"""
+	started = now()
+	watermark = frappe.db.get_global(SWEEP_WATERMARK_KEY) if cint(incremental) else None
+
+	users = get_touched_users(watermark) if watermark else None
+	scores = score_users(users)
+	result = upsert_investigation_cases(scores)
+
+	frappe.db.set_global(SWEEP_WATERMARK_KEY, started)
+	frappe.db.commit()
+
+	return {
+		"mode": "Incremental" if watermark else "Full",
+		"scanned": len(users) if users is not None else None,
+		"flagged": sum(1 for entry in scores.values() if entry["risk_score"] >= INVESTIGATION_THRESHOLD),
+		**result
+	}
+
+
+def run_nightly_fraud_sweep():
+	"""Scheduled job: incremental sweep since the previous night's run"""
+	run_fraud_sweep(incremental=True)
+
+
 def check_staff_beneficiary_relationship(staff_email, beneficiary_email):
 	"""
 	Check if staff member has disclosed relationship with beneficiary
@@ -189,16 +189,90 @@ fixtures = [
 
 doc_events = {
 	# Project Task handles all validation and costing in its own class methods
-	# No external hooks needed
+	# Compiled form schemas are invalidated whenever step configuration changes
+	"Request Type": {
+		"on_update": "councilsonline.utils.form_schema.bump_schema_version",
+		"on_trash": "councilsonline.utils.form_schema.bump_schema_version"
+	},
+	# Council Request Type and step/section overrides are child tables of Council,
+	# so they are covered by the Council save
+	"Council": {
+		"on_update": [
+			"councilsonline.utils.form_schema.bump_schema_version",
+			"councilsonline.utils.holiday_calendar.invalidate_holiday_calendar"
+		]
+	},
+	# Cached holiday calendars used for working-day arithmetic
+	"Holiday List": {
+		"on_update": "councilsonline.utils.holiday_calendar.invalidate_holiday_calendar",
+		"on_trash": "councilsonline.utils.holiday_calendar.invalidate_holiday_calendar"
+	},
+	# Per-Request activity counters read by get_request_summary_data
+	"Project Task": {
+		"on_update": [
+			"councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter.on_activity_update",
+			"councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry.on_task_update",
+			"councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity.on_task_update"
+		],
+		"after_delete": [
+			"councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter.on_activity_delete",
+			"councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry.on_task_delete",
+			"councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity.on_task_delete"
+		]
+	},
+	# Duplicate-identity index (blocking keys and match candidates)
+	"User Identity Verification": {
+		"on_update": "councilsonline.utils.identity_match.on_kyc_update"
+	},
+	"Household Record": {
+		"on_update": [
+			"councilsonline.utils.identity_match.on_household_update",
+			"councilsonline.utils.household_graph.on_household_update"
+		],
+		"on_trash": [
+			"councilsonline.utils.identity_match.on_household_delete",
+			"councilsonline.utils.household_graph.on_household_delete"
+		]
+	},
+	# Household graph links through bank accounts (User child table) and payout accounts
+	"User": {
+		"on_update": "councilsonline.utils.household_graph.on_user_update"
+	},
+	"Benefit Payout": {
+		"on_update": "councilsonline.utils.household_graph.on_payout_update",
+		"after_delete": "councilsonline.utils.household_graph.on_payout_update"
+	},
+	"Council Meeting": {
+		"on_update": "councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter.on_activity_update",
+		"after_delete": "councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter.on_activity_delete"
+	},
+	"Communication Log": {
+		"on_update": "councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter.on_activity_update",
+		"after_delete": "councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter.on_activity_delete"
+	}
 }
 
 # Scheduled Tasks
 # ---------------
 
 scheduler_events = {
+	"cron": {
+		# Write-behind flush of buffered draft autosave patches
+		"* * * * *": [
+			"councilsonline.utils.draft_buffer.flush_stale_draft_buffers"
+		]
+	},
 	"daily": [
 		"councilsonline.tasks.rfi_reminders.send_rfi_due_date_reminders",
-		"councilsonline.tasks.rfi_reminders.escalate_overdue_rfis"
+		"councilsonline.tasks.rfi_reminders.escalate_overdue_rfis",
+		"councilsonline.utils.statutory_clock.recompute_open_clocks",
+		"councilsonline.fraud_detector.run_nightly_fraud_sweep"
+	],
+	"weekly": [
+		# Full duplicate-identity rescan; changes in between are indexed as they happen
+		"councilsonline.utils.identity_match.rebuild_identity_index",
+		# Full household graph rebuild, catching links changed outside document saves
+		"councilsonline.utils.household_graph.rebuild_household_graph"
 	]
 }
 
@@ -0,0 +1,41 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+"""
+Patch to set Estimated Hours on existing Project Tasks and reschedule their projects
+"""
+
+import frappe
+
+
+def execute():
+	"""
+	Copy estimated hours from Task Template to generated tasks, then recompute
+	each Assessment Project's schedule from the new durations
+	"""
+	from councilsonline.utils.task_schedule import reschedule_project
+
+	frappe.reload_doc("councilsonline", "doctype", "project_task")
+
+	# Generated tasks carry their template's title within the stage's type
+	frappe.db.sql("""
+		UPDATE `tabProject Task` task
+		JOIN `tabAssessment Stage Instance` stage
+			ON stage.parent = task.assessment_project
+			AND stage.parenttype = 'Assessment Project'
+			AND stage.stage_name = task.assessment_stage
+		JOIN `tabTask Template` template
+			ON template.stage_type = stage.stage_type
+			AND template.task_title = task.title
+		SET task.estimated_hours = template.estimated_hours
+		WHERE task.task_type = 'Auto' AND IFNULL(task.estimated_hours, 0) = 0
+	""")
+
+	projects = frappe.get_all(
+		"Project Task",
+		filters={"assessment_project": ["is", "set"], "status": ["!=", "Completed"]},
+		pluck="assessment_project",
+		distinct=True
+	)
+	rescheduled = sum(reschedule_project(project) for project in projects)
+	frappe.log(f"v1.5: Rescheduled {rescheduled} Project Tasks across {len(projects)} projects")
@@ -0,0 +1,24 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+"""
+Patch to build the Household Graph from existing households, bank accounts and payouts
+"""
+
+import frappe
+
+
+def execute():
+	"""
+	Index records saved before the graph existed; later saves keep it current
+	"""
+	from councilsonline.utils.household_graph import rebuild_household_graph
+
+	frappe.reload_doc("councilsonline", "doctype", "household_graph_node")
+	frappe.reload_doc("councilsonline", "doctype", "household_graph_edge")
+
+	result = rebuild_household_graph()
+	frappe.log(
+		f"v1.5: Built household graph with {result['nodes']} nodes, "
+		f"{result['edges']} edges and {result['components']} components"
+	)
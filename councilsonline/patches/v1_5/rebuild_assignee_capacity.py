@@ -0,0 +1,22 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+"""
+Patch to build Assignee Capacity rows from open Project Tasks
+"""
+
+import frappe
+
+
+def execute():
+	"""
+	Rebuild every assignee's open hours and tasks, after Project Task
+	estimated hours are backfilled
+	"""
+	from councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity import rebuild_all_capacity
+
+	frappe.reload_doc("councilsonline", "doctype", "assignee_capacity")
+	frappe.reload_doc("councilsonline", "doctype", "project_task")
+
+	rebuilt = rebuild_all_capacity()
+	frappe.log(f"v1.5: Rebuilt assignee capacity for {rebuilt} users")
@@ -0,0 +1,22 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+"""
+Patch to populate Request Activity Counter rows for existing Requests
+"""
+
+import frappe
+
+
+def execute():
+	"""
+	Build materialised activity counters from Project Task, Council Meeting and Communication Log
+	"""
+	from councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter import (
+		rebuild_all_counters
+	)
+
+	frappe.reload_doc("councilsonline", "doctype", "request_activity_counter")
+
+	rebuilt = rebuild_all_counters()
+	frappe.log(f"v1.5: Rebuilt activity counters for {rebuilt} requests")
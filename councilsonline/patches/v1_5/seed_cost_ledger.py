@@ -0,0 +1,25 @@
+# Copyright (c) 2026, CouncilsOnline and contributors
+# For license information, please see license.txt
+
+"""
+Patch to seed the Cost Ledger from existing Project Tasks
+"""
+
+import frappe
+
+
+def execute():
+	"""
+	Post opening Reconciliation entries for tasks logged before the ledger
+	existed and set Request and Assessment Project totals from it
+	"""
+	from councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry import reconcile_cost_ledger
+
+	frappe.reload_doc("councilsonline", "doctype", "cost_ledger_entry")
+	frappe.reload_doc("councilsonline", "doctype", "project_task")
+
+	result = reconcile_cost_ledger()
+	frappe.log(
+		f"v1.5: Seeded cost ledger with {result['entries']} entries for "
+		f"{result['requests']} requests and {result['projects']} projects"
+	)
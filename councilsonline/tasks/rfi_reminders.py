@@ -3,6 +3,7 @@
 
 import frappe
 from frappe.utils import getdate, add_days, date_diff
+from councilsonline.councilsonline.doctype.request.request import prime_linked_users
 from councilsonline.emails import send_email
 
 
@@ -27,20 +28,31 @@ def send_rfi_due_date_reminders():
 		fields=["name", "request", "due_date", "issued_date", "information_required"]
 	)
 
+	due = []
 	for rfi in pending_rfis:
 		days_until_due = date_diff(rfi.due_date, today)
 
 		# Send reminder based on days remaining
 		if days_until_due == 3:
-			send_rfi_reminder(rfi, reminder_type="3_day_reminder")
+			due.append((rfi, "3_day_reminder", 0))
 		elif days_until_due == 1:
-			send_rfi_reminder(rfi, reminder_type="final_reminder")
+			due.append((rfi, "final_reminder", 0))
 		elif days_until_due < 0:
 			# Overdue
-			send_rfi_reminder(rfi, reminder_type="overdue", days_overdue=abs(days_until_due))
+			due.append((rfi, "overdue", abs(days_until_due)))
 
+	# Resolve every applicant's name and email with one User query
+	requests = {}
+	for name in {rfi.request for rfi, _, _ in due if rfi.request}:
+		if frappe.db.exists("Request", name):
+			requests[name] = frappe.get_doc("Request", name)
+	prime_linked_users(requests.values())
 
-def send_rfi_reminder(rfi_data, reminder_type="reminder", days_overdue=0):
+	for rfi, reminder_type, days_overdue in due:
+		send_rfi_reminder(rfi, reminder_type=reminder_type, days_overdue=days_overdue, request=requests.get(rfi.request))
+
+
+def send_rfi_reminder(rfi_data, reminder_type="reminder", days_overdue=0, request=None):
 	"""
 	Send RFI reminder email to applicant
 
@@ -48,13 +60,15 @@ def send_rfi_reminder(rfi_data, reminder_type="reminder", days_overdue=0):
 		rfi_data: Dict containing RFI details
 		reminder_type: Type of reminder (3_day_reminder, final_reminder, overdue)
 		days_overdue: Number of days overdue (for overdue reminders)
+		request: Parent Request document, already primed with prime_linked_users (optional)
 	"""
 	try:
 		# Get full RFI document
 		rfi = frappe.get_doc("Request for Information", rfi_data.name)
 
 		# Get parent request
-		request = frappe.get_doc("Request", rfi.request)
+		if not request:
+			request = frappe.get_doc("Request", rfi.request)
 
 		# Determine email subject and urgency
 		if reminder_type == "overdue":
@@ -81,7 +95,7 @@ def send_rfi_reminder(rfi_data, reminder_type="reminder", days_overdue=0):
 			</div>
 
 			<div style="padding: 20px; border: 1px solid #ddd; border-top: none; border-radius: 0 0 5px 5px;">
-				<p>Dear {request.applicant_name or 'Applicant'},</p>
+				<p>Dear {request.requester_name or 'Applicant'},</p>
 
 				<p style="font-weight: bold; color: {'#dc3545' if reminder_type == 'overdue' else '#856404'};">
 					{urgency_message}
@@ -129,7 +143,7 @@ def send_rfi_reminder(rfi_data, reminder_type="reminder", days_overdue=0):
 		"""
 
 		# Get recipient email
-		recipient_email = request.applicant_email or request.requester
+		recipient_email = request.requester_email or request.requester
 
 		if not recipient_email:
 			frappe.log_error(
@@ -0,0 +1,35 @@
+"""
+Tests for the materialised Request activity counters.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_activity_counter
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter import apply_delta
+
+
+REQUEST = "REQ-TEST-COUNTER"
+
+
+class TestApplyDelta(FrappeTestCase):
+    def setUp(self):
+        frappe.db.delete("Request Activity Counter", {"request": REQUEST})
+
+    def test_concurrent_first_write_adds_delta(self):
+        # Another writer inserted the row after this one found it missing
+        frappe.get_doc({
+            "doctype": "Request Activity Counter", "request": REQUEST, "tasks_count": 3, "open_tasks_count": 2
+        }).db_insert()
+
+        with patch.object(frappe.db, "exists", return_value=False):
+            apply_delta(REQUEST, {"tasks_count": 1, "open_tasks_count": 1})
+
+        self.assertEqual(
+            frappe.db.get_value("Request Activity Counter", REQUEST, ["tasks_count", "open_tasks_count"]),
+            (4, 3)
+        )
@@ -0,0 +1,92 @@
+"""
+Tests for the capacity-index assignment engine.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_assignment
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity import apply_capacity_delta
+from councilsonline.tests.test_helpers import get_test_user_email
+from councilsonline.utils.assignment import AssignmentEngine, rebalance_open_tasks
+
+
+def capacity(open_hours=0, max_open_hours=0, leave=None, available=1):
+    return frappe._dict(
+        open_hours=open_hours, open_tasks=0, max_open_hours=max_open_hours,
+        available_for_assignment=available, last_assigned=None,
+        unavailable_from=leave[0] if leave else None, unavailable_until=leave[1] if leave else None
+    )
+
+
+class TestAssignmentEngine(FrappeTestCase):
+    """Picks come from the in-memory index and update it"""
+
+    def engine(self, capacities, strategy="Least Loaded"):
+        return AssignmentEngine({"Planner": sorted(capacities)}, strategy, capacities=capacities)
+
+    def test_least_loaded_spreads_work(self):
+        engine = self.engine({"a": capacity(10), "b": capacity(0), "c": capacity(4)})
+
+        picks = [engine.pick("Planner", hours=4) for _ in range(4)]
+
+        # b: 0 -> 4 -> 8, c: 4 -> 8, then ties go to the least recently assigned
+        self.assertEqual(picks[:3], ["b", "c", "b"])
+        self.assertEqual(engine.load("a"), 10)
+        self.assertEqual(sum(engine.load(user) for user in "abc"), 30)
+
+    def test_leave_and_limits_are_skipped(self):
+        engine = self.engine({
+            "a": capacity(0, leave=(date(2030, 3, 1), date(2030, 3, 10))),
+            "b": capacity(6, max_open_hours=8),
+            "c": capacity(20),
+            "d": capacity(0, available=0)
+        })
+
+        self.assertEqual(engine.pick("Planner", on_date=date(2030, 3, 5), hours=4), "c")
+        self.assertEqual(engine.pick("Planner", on_date=date(2030, 3, 11), hours=4), "a")
+        self.assertEqual(engine.pick("Planner", on_date=date(2030, 3, 5), hours=2), "b")
+
+    def test_team_pool(self):
+        engine = self.engine({"a": capacity(0), "b": capacity(5)})
+
+        self.assertEqual(engine.pick("Planner", members={"b"}, hours=1), "b")
+        self.assertIsNone(engine.pick("Planner", members={"z"}, hours=1))
+        self.assertEqual(engine.pick("Planner", hours=1), "a")
+
+    def test_round_robin(self):
+        engine = self.engine({"a": capacity(50), "b": capacity(0), "c": capacity(0)}, "Round Robin")
+
+        self.assertEqual([engine.pick("Planner", hours=1) for _ in range(4)], ["a", "b", "c", "a"])
+
+    def test_rebalance_moves_hours(self):
+        tasks = [
+            frappe._dict(name="T1", assigned_to="a", assigned_role="Planner", estimated_hours=8, start_date=None),
+            frappe._dict(name="T2", assigned_to="a", assigned_role="Planner", estimated_hours=6, start_date=None),
+            frappe._dict(name="T3", assigned_to="a", assigned_role="Planner", estimated_hours=2, start_date=None)
+        ]
+        with patch("frappe.get_all", return_value=tasks), \
+                patch("councilsonline.utils.assignment.get_role_users", return_value={"Planner": ["a", "b"]}), \
+                patch("councilsonline.utils.assignment.get_capacities", return_value={"a": capacity(16), "b": capacity(0)}):
+            moves = rebalance_open_tasks(dry_run=True)
+
+        # a keeps the 8-hour task, b takes 6 + 2
+        self.assertEqual([(move["task"], move["to"], move["hours"]) for move in moves], [("T2", "b", 6), ("T3", "b", 2)])
+
+
+class TestCapacityDelta(FrappeTestCase):
+    def test_concurrent_first_write_adds_delta(self):
+        user = get_test_user_email()
+        frappe.db.delete("Assignee Capacity", {"user": user})
+        # Another writer inserted the row after this one found it missing
+        frappe.get_doc({"doctype": "Assignee Capacity", "user": user, "open_hours": 5, "open_tasks": 1}).db_insert()
+
+        with patch.object(frappe.db, "exists", return_value=False):
+            apply_capacity_delta(user, {"open_hours": 2, "open_tasks": 1})
+
+        self.assertEqual(frappe.db.get_value("Assignee Capacity", user, ["open_hours", "open_tasks"]), (7, 2))
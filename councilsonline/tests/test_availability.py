@@ -0,0 +1,89 @@
+"""
+Tests for the shared availability engine.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_availability
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.availability import (
+    DEFAULT_BUSINESS_HOURS,
+    ceil_to_minutes,
+    decode_slots,
+    encode_slots,
+    find_available_slots,
+    merge_busy_intervals,
+    to_time
+)
+
+
+MONDAY = date(2026, 3, 2)
+
+
+def at(hour, minute=0, day=MONDAY):
+    return datetime.combine(day, time(hour, minute))
+
+
+class TestAvailabilityEngine(FrappeTestCase):
+    """Sweep-based slot generation"""
+
+    def test_merge_busy_intervals_pads_and_merges(self):
+        busy = merge_busy_intervals(
+            [(at(11), at(12)), (at(9), at(10)), (at(10, 20), at(10, 40))],
+            buffer_minutes=15
+        )
+
+        # 8:45-10:15, 10:05-10:55 and 10:45-12:15 overlap once padded
+        self.assertEqual(busy, [(at(8, 45), at(12, 15))])
+
+    def test_merge_busy_intervals_keeps_gaps(self):
+        busy = merge_busy_intervals([(at(9), at(10)), (at(13), at(14))])
+
+        self.assertEqual(busy, [(at(9), at(10)), (at(13), at(14))])
+
+    def test_slots_skip_buffered_bookings(self):
+        busy = merge_busy_intervals([(at(10), at(11))], buffer_minutes=15)
+        slots = find_available_slots(MONDAY, MONDAY, DEFAULT_BUSINESS_HOURS, busy, 30, 45)
+
+        starts = [start.time() for start, _ in slots[MONDAY]]
+        # 9:00 ends at 9:30, clear of the 9:45 buffer; 9:45 and 10:30 collide; 11:15 is clear
+        self.assertEqual(starts[:2], [time(9, 0), time(11, 15)])
+
+    def test_weekends_and_max_daily(self):
+        saturday = MONDAY + timedelta(days=5)
+        slots = find_available_slots(
+            MONDAY, saturday, DEFAULT_BUSINESS_HOURS, [], 60, 60,
+            max_daily=2, daily_counts={MONDAY: 2}
+        )
+
+        self.assertNotIn(MONDAY, slots)
+        self.assertNotIn(saturday, slots)
+        self.assertEqual(len(slots), 4)
+
+    def test_min_notice_is_aligned(self):
+        slots = find_available_slots(
+            MONDAY, MONDAY, DEFAULT_BUSINESS_HOURS, [], 30, 30, earliest=at(13, 7)
+        )
+
+        self.assertEqual(slots[MONDAY][0][0], at(13, 15))
+
+    def test_ceil_to_minutes(self):
+        self.assertEqual(ceil_to_minutes(at(9, 45), 15), at(9, 45))
+        self.assertEqual(ceil_to_minutes(at(9, 59), 15), at(10, 0))
+        self.assertEqual(ceil_to_minutes(at(9, 45) + timedelta(seconds=1), 15), at(10, 0))
+
+    def test_to_time(self):
+        self.assertEqual(to_time(timedelta(hours=8, minutes=30)), time(8, 30))
+        self.assertEqual(to_time(time(17, 0)), time(17, 0))
+
+    def test_snapshot_bitmap_round_trip(self):
+        busy = merge_busy_intervals([(at(10), at(11)), (at(14), at(15))], buffer_minutes=15)
+        slots = find_available_slots(MONDAY, MONDAY, DEFAULT_BUSINESS_HOURS, busy, 30, 45)[MONDAY]
+
+        bitmap = encode_slots(slots, at(9), 45)
+
+        self.assertEqual(decode_slots(bitmap, at(9), 30, 45), slots)
+        self.assertEqual(decode_slots(0, at(9), 30, 45), [])
@@ -0,0 +1,52 @@
+"""
+Tests for Project Task movements posted to the cost ledger.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_cost_ledger
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.cost_ledger_entry.cost_ledger_entry import get_task_movements
+
+
+def task(request="REQ-1", project="AP-1", hours=0, cost=0):
+    return frappe._dict(request=request, assessment_project=project, actual_hours=hours, total_cost=cost)
+
+
+class TestCostLedgerMovements(FrappeTestCase):
+    """Task edits post deltas, never full totals"""
+
+    def test_insert_posts_full_amounts(self):
+        self.assertEqual(
+            get_task_movements(None, task(hours=2, cost=300)),
+            [("REQ-1", "AP-1", {"hours": 2, "cost": 300})]
+        )
+
+    def test_logged_time_posts_difference(self):
+        self.assertEqual(
+            get_task_movements(task(hours=2, cost=300), task(hours=3.5, cost=525)),
+            [("REQ-1", "AP-1", {"hours": 1.5, "cost": 225})]
+        )
+
+    def test_unchanged_amounts_post_nothing(self):
+        self.assertEqual(get_task_movements(task(hours=2, cost=300), task(hours=2, cost=300)), [])
+
+    def test_relinked_task_moves_amounts(self):
+        self.assertEqual(
+            get_task_movements(task(hours=2, cost=300), task(request="REQ-2", project="AP-2", hours=2, cost=300)),
+            [
+                ("REQ-1", "AP-1", {"hours": -2, "cost": -300}),
+                ("REQ-2", "AP-2", {"hours": 2, "cost": 300})
+            ]
+        )
+
+    def test_delete_reverses_amounts(self):
+        self.assertEqual(
+            get_task_movements(task(hours=2, cost=300), None),
+            [("REQ-1", "AP-1", {"hours": -2, "cost": -300})]
+        )
+
+    def test_unlinked_task_posts_nothing(self):
+        self.assertEqual(get_task_movements(None, task(request=None, project=None, hours=1, cost=10)), [])
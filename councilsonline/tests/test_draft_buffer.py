@@ -0,0 +1,122 @@
+"""
+Tests for the draft autosave merge-patch buffer.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_draft_buffer
+"""
+
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.draft_buffer import (
+    apply_merge_patch,
+    apply_merge_patches,
+    buffer_patch,
+    claim_buffer,
+    coalesce_patches,
+    discard_buffer,
+    flush_draft_buffer,
+    get_buffer,
+    requeue_entries
+)
+
+
+TEST_DRAFT = "TEST-DRAFT-BUFFER"
+
+
+class TestMergePatch(FrappeTestCase):
+    """RFC 7386 merge-patch application"""
+
+    def test_sets_and_removes_keys(self):
+        target = {"full_name": "Juan", "sex": "Male", "barangay": "San Juan"}
+        result = apply_merge_patch(target, {"sex": None, "civil_status": "Widowed"})
+
+        self.assertEqual(result, {"full_name": "Juan", "barangay": "San Juan", "civil_status": "Widowed"})
+        # Target is not mutated
+        self.assertIn("sex", target)
+
+    def test_merges_nested_objects(self):
+        target = {"address_line": {"barangay": "San Juan", "province": "Rizal"}}
+        result = apply_merge_patch(target, {"address_line": {"barangay": "Dolores"}})
+
+        self.assertEqual(result["address_line"], {"barangay": "Dolores", "province": "Rizal"})
+
+    def test_lists_are_replaced(self):
+        result = apply_merge_patch({"hail_activities": [1, 2]}, {"hail_activities": [3]})
+        self.assertEqual(result["hail_activities"], [3])
+
+
+class TestComposeMergePatches(FrappeTestCase):
+    """Coalesced patches must have the same effect as applying each in order"""
+
+    def assertComposes(self, target, *patches):
+        """Coalesce like buffer_patch and compare with applying each patch in order"""
+        sequential = apply_merge_patches(target, patches)
+
+        buffered = coalesce_patches(patches)
+
+        self.assertEqual(apply_merge_patches(target, buffered), sequential)
+        return buffered
+
+    def test_later_values_win(self):
+        self.assertComposes({"a": 1}, {"a": 2}, {"a": 3, "b": 1})
+
+    def test_deletion_survives_coalescing(self):
+        self.assertComposes({"a": 1, "b": 2}, {"a": None}, {"c": 3})
+
+    def test_recreate_after_delete_is_not_merged(self):
+        buffered = self.assertComposes(
+            {"address": {"city": "Taytay", "zip": "1920"}},
+            {"address": None},
+            {"address": {"city": "Cainta"}}
+        )
+        # A single merge-patch would keep the old zip, so both patches are retained
+        self.assertEqual(len(buffered), 2)
+
+    def test_nested_merge(self):
+        self.assertComposes(
+            {"address": {"city": "Taytay", "zip": "1920"}},
+            {"address": {"city": "Cainta"}},
+            {"address": {"zip": None, "street": "Rizal Ave"}}
+        )
+
+
+class TestDraftBuffer(FrappeTestCase):
+    """Patches are appended atomically and never lost or reordered by a flush"""
+
+    def setUp(self):
+        discard_buffer(TEST_DRAFT)
+
+    def tearDown(self):
+        discard_buffer(TEST_DRAFT)
+
+    def test_patches_coalesce_in_order(self):
+        buffer_patch(TEST_DRAFT, {"full_name": "Juan"}, step=1)
+        buffer_patch(TEST_DRAFT, {"full_name": "Juan dela Cruz", "sex": "Male"}, step=2)
+
+        buffered = get_buffer(TEST_DRAFT)
+        self.assertEqual(buffered["patches"], [{"full_name": "Juan dela Cruz", "sex": "Male"}])
+        self.assertEqual(buffered["step"], 2)
+
+    def test_requeued_patches_stay_ahead_of_newer_ones(self):
+        buffer_patch(TEST_DRAFT, {"barangay": "San Juan", "sex": "Male"})
+        claimed = claim_buffer(TEST_DRAFT)
+        self.assertIsNone(get_buffer(TEST_DRAFT))
+
+        # A newer autosave arrives while the claimed patch is being written, then the write fails
+        buffer_patch(TEST_DRAFT, {"barangay": "Dolores"})
+        requeue_entries(TEST_DRAFT, claimed)
+
+        self.assertEqual(
+            apply_merge_patches({}, get_buffer(TEST_DRAFT)["patches"]),
+            {"barangay": "Dolores", "sex": "Male"}
+        )
+
+    def test_failed_flush_keeps_patches(self):
+        buffer_patch(TEST_DRAFT, {"full_name": "Juan"})
+
+        with patch("councilsonline.utils.draft_buffer.write_buffered_patch", side_effect=Exception("down")):
+            self.assertRaises(Exception, flush_draft_buffer, TEST_DRAFT)
+
+        self.assertEqual(get_buffer(TEST_DRAFT)["patches"], [{"full_name": "Juan"}])
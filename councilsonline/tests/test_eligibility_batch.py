@@ -0,0 +1,89 @@
+"""
+Tests for eligibility scoring from preloaded facts (batch mode).
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_eligibility_batch
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.eligibility_criteria_result.eligibility_criteria_result import (
+    determine_eligibility
+)
+from councilsonline.eligibility_engine import (
+    BATCH_SIZE,
+    EligibilityEngine,
+    get_batch_status,
+    run_eligibility_batch
+)
+
+
+def facts(type_code="SPISC", verified=True, birth_date="1950-01-01", household_size=1, pensions=()):
+    return frappe._dict(
+        request=frappe._dict(name="REQ-1", request_type="SPISC", requester="senior@example.com"),
+        request_type=frappe._dict(name="SPISC", type_code=type_code),
+        kyc=frappe._dict(verification_status="Verified" if verified else "Pending"),
+        household=frappe._dict(
+            name="HOUSEHOLD-0001", poverty_threshold_status="Below",
+            verified_by_barangay=1, barangay_official="Kapitan"
+        ),
+        household_size=household_size,
+        birth_date=birth_date,
+        pension_requests=set(pensions)
+    )
+
+
+class TestEligibilityBatch(FrappeTestCase):
+    """Preloaded facts score without queries"""
+
+    def test_spisc_full_score(self):
+        engine = EligibilityEngine("REQ-1", facts=facts())
+        engine.evaluate()
+
+        self.assertEqual((engine.total_score, engine.max_score), (100, 100))
+        self.assertTrue(engine.get_result_values()["has_senior_citizen"])
+
+    def test_other_pension_ignores_own_request(self):
+        own = EligibilityEngine("REQ-1", facts=facts(pensions=["REQ-1"]))
+        own.evaluate()
+        other = EligibilityEngine("REQ-1", facts=facts(pensions=["REQ-1", "REQ-0"]))
+        other.evaluate()
+
+        self.assertEqual(own.total_score - other.total_score, 15)
+
+    def test_household_size_scoring(self):
+        engine = EligibilityEngine("REQ-1", facts=facts(household_size=5))
+        engine.evaluate()
+
+        self.assertIn("Living with Family", [check["criterion_name"] for check in engine.criteria_checks])
+
+    def test_determine_eligibility(self):
+        self.assertEqual(determine_eligibility(85, True), ("Eligible", "Approved", ""))
+        self.assertEqual(determine_eligibility(70, True)[:2], ("Partially Eligible", "Pending Review"))
+        self.assertEqual(determine_eligibility(95, False)[:2], ("Not Eligible", "Rejected"))
+        self.assertEqual(determine_eligibility(0, True)[0], "Needs Review")
+
+
+class TestEligibilityBatchJob(FrappeTestCase):
+    """A failing chunk marks the job Failed and keeps the committed progress"""
+
+    def test_failed_chunk_reports_failed(self):
+        first_chunk = {"evaluated": BATCH_SIZE, "skipped": 0, "eligible": 3}
+        requests = [f"REQ-{index}" for index in range(BATCH_SIZE + 1)]
+
+        with patch(
+            "councilsonline.eligibility_engine.evaluate_batch",
+            side_effect=[first_chunk, frappe.ValidationError("Lost connection")]
+        ), patch("councilsonline.eligibility_engine.frappe.publish_progress"), \
+                patch("councilsonline.eligibility_engine.frappe.log_error") as log_error:
+            with self.assertRaises(frappe.ValidationError):
+                run_eligibility_batch(requests, job_id="test-failed-batch")
+
+        status = get_batch_status("test-failed-batch")
+        self.assertEqual(status["status"], "Failed")
+        self.assertEqual(status["error"], "Lost connection")
+        self.assertEqual((status["processed"], status["evaluated"]), (BATCH_SIZE, BATCH_SIZE))
+        log_error.assert_called_once()
@@ -0,0 +1,99 @@
+"""
+Tests for compiled, declarative eligibility rules.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_eligibility_rules
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.eligibility_engine import EligibilityEngine
+from councilsonline.eligibility_rules import (
+    RULE_STATS_KEY_PREFIX,
+    compile_predicate,
+    compile_rules,
+    evaluate_rules,
+    flush_rule_stats,
+    get_rule_stats,
+    rule
+)
+
+
+def engine_for(type_code, verified=True, household=True, household_size=1, eligibility_rules=None):
+    facts = frappe._dict(
+        request=frappe._dict(name="REQ-1", request_type=type_code, requester="senior@example.com"),
+        request_type=frappe._dict(
+            name=f"Test {type_code}", type_code=type_code, modified="custom" if eligibility_rules else None,
+            eligibility_rules=eligibility_rules or []
+        ),
+        kyc=frappe._dict(verification_status="Verified" if verified else "Pending"),
+        household=frappe._dict(
+            name="HOUSEHOLD-0001", poverty_threshold_status="Below",
+            verified_by_barangay=1, barangay_official="Kapitan"
+        ) if household else None,
+        household_size=household_size,
+        birth_date="1950-01-01",
+        pension_requests=set()
+    )
+    engine = EligibilityEngine("REQ-1", facts=facts)
+    engine.evaluate()
+    return engine
+
+
+class TestEligibilityRules(FrappeTestCase):
+    """Built-in rule sets score as the hard-coded programme checks did"""
+
+    def test_default_rule_totals(self):
+        self.assertEqual((engine_for("LSFA").total_score, engine_for("LSFA").max_score), (95, 100))
+        self.assertEqual(engine_for("BMSS").total_score, 90)
+        self.assertEqual(engine_for("BMSS", verified=False).total_score, 70)
+        self.assertEqual(engine_for("OTHER").total_score, 100)
+        self.assertEqual(engine_for("OTHER", household=False).total_score, 75)
+
+    def test_living_situation_group(self):
+        checks = {size: engine_for("SPISC", household_size=size).criteria_checks[-1] for size in (0, 3, 5)}
+
+        self.assertEqual((checks[0]["criterion_name"], checks[0]["status"]), ("Living Alone", "Passed"))
+        self.assertEqual(
+            (checks[3]["score_earned"], checks[3]["status"], checks[3]["check_result"]),
+            (7, "Partial", "Small household (3 members)")
+        )
+        self.assertEqual(checks[5]["criterion_name"], "Living with Family")
+
+    def test_notes_render_facts(self):
+        check = engine_for("SPISC").criteria_checks[4]
+        self.assertEqual(check["check_result"], "Verified by Kapitan")
+
+    def test_request_type_rules_replace_defaults(self):
+        rules = [rule("Has 4Ps", "Bonus", "fourps_beneficiary", "=", "1", 10, 10, 0, "4Ps household", "Not 4Ps")]
+        engine = engine_for("SPISC", eligibility_rules=rules)
+
+        self.assertEqual([check["criterion_name"] for check in engine.criteria_checks], ["Has 4Ps"])
+        self.assertEqual((engine.total_score, engine.criteria_checks[0]["status"]), (0, "Failed"))
+
+    def test_predicates(self):
+        self.assertTrue(compile_predicate("poverty_threshold_status", "in", "Below, At")({"poverty_threshold_status": "At"}))
+        self.assertFalse(compile_predicate("age", ">=", "60")({"age": None}))
+        self.assertTrue(compile_predicate("recent_assistance_months", "is not set", None)({}))
+        self.assertTrue(compile_predicate("kyc_verified", "!=", "0")({"kyc_verified": True}))
+
+    def test_invalid_rules_rejected(self):
+        with self.assertRaises(frappe.ValidationError):
+            compile_rules([rule("Bad", "Weighted", "age", "between", "60", 10, 10, 0, None, None)])
+        with self.assertRaises(frappe.ValidationError):
+            compile_rules([rule("Bad", "Weighted", "age", ">=", None, 10, 10, 0, None, None)])
+
+    def test_rule_stats(self):
+        frappe.cache().delete_value(f"{RULE_STATS_KEY_PREFIX}Stats Test")
+        request_type = frappe._dict(name="Stats Test", type_code=None)
+
+        # Counters from separate flushes add up in the shared hash
+        for _ in range(2):
+            for _ in range(3):
+                evaluate_rules(request_type, {"kyc_verified": True, "household_registered": False})
+            flush_rule_stats()
+
+        stats = {row["criterion"]: row for row in get_rule_stats("Stats Test")}
+        self.assertEqual((stats["KYC Verified"]["calls"], stats["KYC Verified"]["met"]), (6, 6))
+        self.assertEqual((stats["Household Registered"]["calls"], stats["Household Registered"]["met"]), (6, 0))
@@ -0,0 +1,61 @@
+"""
+Tests for the cached holiday calendar and working-day arithmetic.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_holiday_calendar
+"""
+
+from datetime import date, timedelta
+
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.holiday_calendar import HolidayCalendar
+
+
+def count_by_stepping(calendar, start, end):
+    """Reference implementation: walk the range one day at a time"""
+    days = 0
+    current = start
+    while current <= end:
+        if calendar.is_working_day(current):
+            days += 1
+        current += timedelta(days=1)
+    return days
+
+
+class TestHolidayCalendar(FrappeTestCase):
+    """Closed-form working-day arithmetic"""
+
+    def setUp(self):
+        # Christmas, Boxing Day (Fri) and New Year's Day 2026 (Thu); 27 Dec is a Saturday
+        self.holidays = [date(2025, 12, 25), date(2025, 12, 26), date(2025, 12, 27), date(2026, 1, 1)]
+        self.calendar = HolidayCalendar(d.toordinal() for d in self.holidays)
+
+    def test_weekend_holidays_are_ignored(self):
+        self.assertEqual(len(self.calendar.holidays), 3)
+        self.assertTrue(self.calendar.is_holiday(date(2025, 12, 25)))
+        self.assertFalse(self.calendar.is_working_day(date(2025, 12, 27)))
+
+    def test_working_days_between_matches_stepping(self):
+        start = date(2025, 11, 3)
+        for offset in range(0, 120, 7):
+            end = start + timedelta(days=offset)
+            self.assertEqual(
+                self.calendar.working_days_between(start, end),
+                count_by_stepping(self.calendar, start, end)
+            )
+
+    def test_working_days_between_reversed_range(self):
+        self.assertEqual(self.calendar.working_days_between("2025-12-10", "2025-12-01"), 0)
+
+    def test_add_working_days_skips_holidays(self):
+        # Wed 24 Dec + 1 skips Christmas, Boxing Day and the weekend
+        self.assertEqual(self.calendar.add_working_days("2025-12-24", 1), date(2025, 12, 29))
+        # Mon 29 Dec + 3 skips New Year's Day
+        self.assertEqual(self.calendar.add_working_days("2025-12-29", 3), date(2026, 1, 2))
+
+    def test_add_working_days_from_weekend(self):
+        self.assertEqual(HolidayCalendar().add_working_days("2025-11-08", 1), date(2025, 11, 10))
+
+    def test_add_zero_days(self):
+        self.assertEqual(self.calendar.add_working_days("2025-12-25", 0), date(2025, 12, 25))
@@ -0,0 +1,141 @@
+"""
+Tests for the household graph nodes and union-find components.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_household_graph
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.household_graph import (
+    UnionFind,
+    account_node,
+    add_edge,
+    gcash_node,
+    get_linked_households,
+    household_node,
+    person_node,
+    sync_edges
+)
+
+
+class TestUnionFind(FrappeTestCase):
+    def test_groups_follow_unions(self):
+        sets = UnionFind(["H1", "H2", "H3", "A1", "U1"])
+        sets.union("H1", "U1")
+        sets.union("U1", "A1")
+        sets.union("H2", "A1")
+
+        groups = sorted(sorted(members) for members in sets.groups().values())
+        self.assertEqual(groups, [["A1", "H1", "H2", "U1"], ["H3"]])
+        self.assertEqual(sets.find("H1"), sets.find("H2"))
+
+    def test_union_keeps_larger_root(self):
+        sets = UnionFind()
+        sets.union("A", "B")
+        sets.union("A", "C")
+        root = sets.find("A")
+
+        self.assertEqual(sets.union("D", "A"), root)
+        self.assertEqual(sets.size[root], 4)
+
+
+class TestGraphNodes(FrappeTestCase):
+    """Equivalent numbers and people map to the same node"""
+
+    def test_gcash_numbers_normalise(self):
+        self.assertEqual(gcash_node("0917 123 4567"), gcash_node("+63 917-123-4567"))
+        self.assertIsNone(gcash_node("12345"))
+
+    def test_account_numbers_normalise(self):
+        self.assertEqual(account_node("1234-5678-90")[0], "Bank Account::1234567890")
+        self.assertIsNone(account_node("12-34"))
+
+    def test_person_nodes(self):
+        self.assertEqual(person_node("juan@example.com")[0], "User::juan@example.com")
+        self.assertEqual(
+            person_node(None, "Juan dela Cruz", "1955-03-14"),
+            person_node(None, "JUAN DELA CRUZ", "1955-03-14")
+        )
+        self.assertIsNone(person_node(None, "Juan dela Cruz", None))
+
+    def test_edges_are_undirected(self):
+        edges = {}
+        add_edge(edges, "Household Record::HH-1", household_node("HH-1"), person_node("juan@example.com"))
+        add_edge(edges, "Household Record::HH-1", person_node("juan@example.com"), household_node("HH-1"))
+        add_edge(edges, "Household Record::HH-1", household_node("HH-1"), None)
+
+        self.assertEqual(list(edges["Household Record::HH-1"]), [("Household::HH-1", "User::juan@example.com")])
+
+
+HOUSEHOLD_1 = household_node("TEST-GRAPH-HH-1")
+HOUSEHOLD_2 = household_node("TEST-GRAPH-HH-2")
+PERSON_1 = person_node("graph-one@example.com")
+PERSON_2 = person_node("graph-two@example.com")
+ACCOUNT = account_node("9900-1122-33")
+TEST_NODES = [node[0] for node in (HOUSEHOLD_1, HOUSEHOLD_2, PERSON_1, PERSON_2, ACCOUNT)]
+
+
+def edges(source, *pairs):
+    current = {}
+    for a, b in pairs:
+        add_edge(current, source, a, b)
+    return current or {source: {}}
+
+
+def component(node):
+    return frappe.db.get_value("Household Graph Node", node[0], "component")
+
+
+class TestComponentMaintenance(FrappeTestCase):
+    """sync_edges merges components on new links and re-splits them when links go"""
+
+    def setUp(self):
+        frappe.db.delete("Household Graph Edge", {"source": ["like", "Test Graph::%"]})
+        frappe.db.delete("Household Graph Node", {"name": ["in", TEST_NODES]})
+
+        # Two households, each with one person: two components
+        sync_edges({
+            **edges("Test Graph::HH-1", (HOUSEHOLD_1, PERSON_1)),
+            **edges("Test Graph::HH-2", (HOUSEHOLD_2, PERSON_2))
+        })
+
+    def test_separate_households_are_not_linked(self):
+        self.assertNotEqual(component(HOUSEHOLD_1), component(HOUSEHOLD_2))
+        self.assertEqual(component(HOUSEHOLD_1), component(PERSON_1))
+        self.assertEqual(get_linked_households(HOUSEHOLD_1[0]), [])
+
+    def test_shared_account_merges_components(self):
+        sync_edges({
+            **edges("Test Graph::U-1", (PERSON_1, ACCOUNT)),
+            **edges("Test Graph::U-2", (PERSON_2, ACCOUNT))
+        })
+
+        self.assertEqual(len({component(node) for node in (HOUSEHOLD_1, HOUSEHOLD_2, PERSON_1, PERSON_2, ACCOUNT)}), 1)
+        self.assertEqual(get_linked_households(HOUSEHOLD_1[0]), ["TEST-GRAPH-HH-2"])
+
+    def test_removed_link_resplits_and_relabels_detached_part(self):
+        sync_edges({
+            **edges("Test Graph::U-1", (PERSON_1, ACCOUNT)),
+            **edges("Test Graph::U-2", (PERSON_2, ACCOUNT))
+        })
+        merged = component(HOUSEHOLD_1)
+
+        sync_edges(edges("Test Graph::U-2"))
+
+        # The part still holding the old label keeps it; the detached part
+        # is relabelled to its own smallest node
+        kept = {component(node) for node in (HOUSEHOLD_1, PERSON_1, ACCOUNT)}
+        detached = {component(node) for node in (HOUSEHOLD_2, PERSON_2)}
+        self.assertEqual(kept, {merged})
+        self.assertEqual(detached, {min(HOUSEHOLD_2[0], PERSON_2[0])})
+        self.assertEqual(get_linked_households(HOUSEHOLD_1[0]), [])
+        self.assertEqual(get_linked_households(HOUSEHOLD_2[0]), [])
+
+    def test_removed_source_drops_isolated_nodes(self):
+        sync_edges(edges("Test Graph::HH-2"))
+
+        self.assertFalse(frappe.db.exists("Household Graph Node", HOUSEHOLD_2[0]))
+        self.assertFalse(frappe.db.exists("Household Graph Node", PERSON_2[0]))
+        self.assertTrue(frappe.db.exists("Household Graph Node", HOUSEHOLD_1[0]))
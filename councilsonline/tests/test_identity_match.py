@@ -0,0 +1,98 @@
+"""
+Tests for duplicate-identity blocking and similarity scoring.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_identity_match
+"""
+
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.identity_match import (
+    MATCH_THRESHOLD,
+    MAX_BLOCK_SIZE,
+    get_blocking_keys,
+    get_pair_name,
+    is_candidate_pair,
+    make_identity,
+    similarity,
+    soundex,
+    split_full_name,
+    split_oversized_blocks
+)
+
+
+def member(record, full_name, birth_date="1955-03-14", barangay="Poblacion", person=None, **kwargs):
+    first_name, surname = split_full_name(full_name)
+    return make_identity(
+        "Household Member", record, person, first_name, surname, full_name, birth_date, barangay, **kwargs
+    )
+
+
+class TestNameNormalisation(FrappeTestCase):
+    def test_soundex(self):
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Rupert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex(""), "")
+
+    def test_split_full_name(self):
+        self.assertEqual(split_full_name("Juan Ma. dela Cruz Jr."), ("JUAN", "DELACRUZ"))
+        self.assertEqual(split_full_name("José Peña"), ("JOSE", "PENA"))
+        self.assertEqual(split_full_name("Santos"), ("", "SANTOS"))
+
+
+class TestIdentityMatching(FrappeTestCase):
+    """Typos and re-registrations share a block and score above the threshold"""
+
+    def test_typo_shares_block_and_matches(self):
+        a = member("M1", "Juan dela Cruz")
+        b = member("M2", "Jaun Dela Cruz")
+
+        self.assertTrue(get_blocking_keys(a) & get_blocking_keys(b))
+        self.assertGreaterEqual(similarity(a, b)[0], MATCH_THRESHOLD)
+
+    def test_re_registration_in_other_barangay(self):
+        a = member("M1", "Maria Santos", barangay="Poblacion")
+        b = member("M2", "Maria Santoz", barangay="San Isidro")
+
+        self.assertTrue(get_blocking_keys(a) & get_blocking_keys(b))
+        self.assertGreaterEqual(similarity(a, b)[0], MATCH_THRESHOLD)
+
+    def test_different_people_do_not_match(self):
+        a = member("M1", "Maria Santos", birth_date="1955-03-14")
+        b = member("M2", "Jose Santos", birth_date="1955-11-02")
+
+        self.assertLess(similarity(a, b)[0], MATCH_THRESHOLD)
+
+    def test_shared_id_matches_regardless_of_name(self):
+        a = member("M1", "Maria Santos", philsys_id="1234-5678-9012")
+        b = member("M2", "Pedro Reyes", birth_date="1970-01-01", philsys_id="123456789012")
+
+        self.assertIn("PSN:123456789012", get_blocking_keys(a) & get_blocking_keys(b))
+        self.assertEqual(similarity(a, b)[0], 1.0)
+
+    def test_records_of_the_same_user_are_not_paired(self):
+        a = member("M1", "Juan dela Cruz", person="juan@example.com")
+        b = make_identity(
+            "User", "juan@example.com", "juan@example.com", "Juan", "dela Cruz", "Juan dela Cruz",
+            "1955-03-14", "Poblacion"
+        )
+
+        self.assertFalse(is_candidate_pair(a, b))
+        self.assertTrue(is_candidate_pair(a, member("M2", "Juan dela Cruz")))
+
+    def test_pair_name_is_symmetric(self):
+        self.assertEqual(get_pair_name("User::a", "Household Member::b"), get_pair_name("Household Member::b", "User::a"))
+
+
+class TestBlockSizeCap(FrappeTestCase):
+    def test_oversized_blocks_are_dropped(self):
+        blocks = {
+            "SMALL": {"a", "b"},
+            "EDGE": set(range(MAX_BLOCK_SIZE)),
+            "LARGE": set(range(MAX_BLOCK_SIZE + 1))
+        }
+
+        kept, skipped = split_oversized_blocks(blocks)
+        self.assertEqual(sorted(kept), ["EDGE", "SMALL"])
+        self.assertEqual(skipped, 1)
@@ -0,0 +1,68 @@
+"""
+Tests for the single-query meeting list of the current user.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_meetings
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.api.meetings import get_meeting_permission_condition, get_user_meetings
+from councilsonline.tests.test_helpers import create_test_request, get_test_user_email
+
+
+class TestUserMeetings(FrappeTestCase):
+    """The meeting list runs as one query, pages by cursor and applies the permission condition"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.planner = get_test_user_email()
+        cls.request = create_test_request("TESTMEET")
+        cls.meetings = []
+        for day, planner in ((1, None), (2, cls.planner), (3, None)):
+            meeting = frappe.get_doc({
+                "doctype": "Council Meeting",
+                "request": cls.request.name,
+                "meeting_type": "Pre-Application Meeting",
+                "status": "Scheduled",
+                "scheduled_start": f"2031-03-0{day} 10:00:00",
+                "scheduled_end": f"2031-03-0{day} 11:00:00",
+                "council_planner": planner
+            }).insert(ignore_permissions=True)
+            cls.meetings.append(meeting.name)
+
+    def tearDown(self):
+        frappe.set_user("Administrator")
+
+    def test_query_returns_request_fields(self):
+        meetings = {row.name: row for row in get_user_meetings(from_date="2031-03-01", to_date="2031-03-04")}
+
+        self.assertTrue(set(self.meetings) <= set(meetings))
+        row = meetings[self.meetings[0]]
+        self.assertEqual(row.request_number, self.request.request_number)
+        self.assertIsNone(row.council)
+        self.assertNotIn("sort_key", row)
+
+    def test_cursor_pages_latest_first(self):
+        names, cursor = [], ""
+        while cursor is not None:
+            page = get_user_meetings(from_date="2031-03-01", to_date="2031-03-04", cursor=cursor, page_size=2)
+            self.assertLessEqual(len(page["data"]), 2)
+            names.extend(row.name for row in page["data"])
+            cursor = page["next_cursor"]
+
+        self.assertEqual(len(names), len(set(names)))
+        ours = [name for name in names if name in self.meetings]
+        self.assertEqual(ours, list(reversed(self.meetings)))
+
+    def test_permission_condition_limits_rows(self):
+        self.assertIsNone(get_meeting_permission_condition("Administrator"))
+
+        frappe.set_user(self.planner)
+        names = {row.name for row in get_user_meetings(from_date="2031-03-01", to_date="2031-03-04")}
+
+        self.assertIn(self.meetings[1], names)
+        self.assertNotIn(self.meetings[0], names)
+        self.assertNotIn(self.meetings[2], names)
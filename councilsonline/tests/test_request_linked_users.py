@@ -0,0 +1,51 @@
+"""
+Tests for the memoised requester/agent User lookups of Request.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_request_linked_users
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.request import request as request_module
+from councilsonline.councilsonline.doctype.request.request import prime_linked_users
+from councilsonline.tests.test_helpers import get_test_user_email
+
+
+def new_request(requester, agent=None):
+    return frappe.get_doc({"doctype": "Request", "requester": requester, "agent": agent})
+
+
+class TestPrimeLinkedUsers(FrappeTestCase):
+    """A batch of Requests resolves its requesters and agents with one User query"""
+
+    def setUp(self):
+        self.user = get_test_user_email()
+        frappe.local.link_enrichment_memo = {}
+
+    def test_batch_resolves_with_one_query(self):
+        docs = [new_request("Administrator", self.user), new_request(self.user), new_request("Administrator")]
+
+        with patch.object(frappe, "get_all", wraps=frappe.get_all) as get_all:
+            prime_linked_users(docs)
+            names = [(doc.requester_name, doc.agent_email) for doc in docs]
+
+        self.assertEqual(get_all.call_count, 1)
+        full_name = frappe.db.get_value("User", self.user, "full_name")
+        self.assertEqual(names[0], (frappe.db.get_value("User", "Administrator", "full_name"), self.user))
+        self.assertEqual(names[1], (full_name, None))
+
+    def test_primed_documents_skip_lookup(self):
+        doc = prime_linked_users([new_request(self.user)])[0]
+
+        with patch.object(request_module, "get_linked_values", side_effect=AssertionError("queried again")):
+            self.assertEqual(doc.requester_email, self.user)
+
+    def test_reassignment_invalidates_primed_values(self):
+        doc = prime_linked_users([new_request(self.user)])[0]
+        doc.requester = "Administrator"
+
+        self.assertEqual(doc.requester_email, frappe.db.get_value("User", "Administrator", "email"))
@@ -0,0 +1,64 @@
+"""
+Tests for keyset (cursor) pagination of the request list endpoints.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_request_pagination
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.councilsonline.doctype.request.request import (
+    decode_cursor,
+    encode_cursor,
+    get_all_requests_for_staff,
+    get_my_requests
+)
+from councilsonline.tests.test_helpers import create_test_request
+
+
+def walk_pages(endpoint, **kwargs):
+    """Follow next_cursor to the last page and return every row"""
+    rows, cursor = [], ""
+    while cursor is not None:
+        page = endpoint(cursor=cursor, page_size=2, **kwargs)
+        rows.extend(page["data"])
+        cursor = page["next_cursor"]
+    return rows
+
+
+class TestCursorEncoding(FrappeTestCase):
+    def test_round_trip(self):
+        cursor = encode_cursor("2026-01-02 03:04:05.123456", "REQ-0001")
+        sort_value, name = decode_cursor(cursor)
+        self.assertEqual((str(sort_value), name), ("2026-01-02 03:04:05.123456", "REQ-0001"))
+
+    def test_invalid_cursor_throws(self):
+        self.assertRaises(frappe.ValidationError, decode_cursor, "not-a-cursor")
+
+
+class TestRequestPagination(FrappeTestCase):
+    """Cursor pages run against the real table and cover every row exactly once"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.requests = [create_test_request("TESTPAGE").name for _ in range(3)]
+
+    def test_my_requests_pages_cover_rows_once(self):
+        names = [row.name for row in walk_pages(get_my_requests)]
+
+        self.assertEqual(len(names), len(set(names)))
+        self.assertTrue(set(self.requests) <= set(names))
+
+    def test_staff_pages_cover_rows_once(self):
+        rows = walk_pages(get_all_requests_for_staff, workflow_state="Draft")
+        names = [row.name for row in rows]
+
+        self.assertEqual(len(names), len(set(names)))
+        self.assertTrue(set(self.requests) <= set(names))
+        self.assertTrue(all(row.council is None for row in rows))
+
+    def test_total_estimate(self):
+        page = get_all_requests_for_staff(cursor="", page_size=2, with_total=1)
+        self.assertIn("total_estimate", page)
@@ -0,0 +1,208 @@
+"""
+Tests for appointment slot holds, including concurrent contention.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_slot_holds
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.api.scheduling import book_appointment
+from councilsonline.utils.slot_holds import (
+    acquire_slot_hold,
+    get_cells,
+    get_slot_hold,
+    release_slot_hold
+)
+
+
+TEAM = "_Test Slot Hold Team"
+NINE = datetime(2030, 3, 4, 9, 0)
+
+
+def slot(start_minutes, duration_minutes):
+    start = NINE + timedelta(minutes=start_minutes)
+    return start, start + timedelta(minutes=duration_minutes)
+
+
+class TestSlotHolds(FrappeTestCase):
+    """Slot holds contend per overlapping slot, never per team"""
+
+    def setUp(self):
+        self.tokens = []
+
+    def tearDown(self):
+        for token in self.tokens:
+            if token:
+                release_slot_hold(token)
+
+    def contend(self, slots):
+        """Acquire holds for all slots at once from separate threads, each with its own site context"""
+        site, sites_path = frappe.local.site, frappe.local.sites_path
+        barrier = threading.Barrier(len(slots))
+        results = [None] * len(slots)
+
+        def worker(index, start, end):
+            frappe.init(site=site, sites_path=sites_path)
+            try:
+                barrier.wait()
+                results[index] = acquire_slot_hold(TEAM, start, end, user="Guest")
+            finally:
+                frappe.destroy()
+
+        threads = [threading.Thread(target=worker, args=(i, *s)) for i, s in enumerate(slots)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.tokens.extend(results)
+        return results
+
+    def test_overlapping_slots_are_held_once(self):
+        # Twenty clients race for 9:00 with different durations and offsets
+        slots = [slot(offset, duration) for offset in (0, 10, 20, 25) for duration in (30, 45, 60, 15, 40)]
+        results = self.contend(slots)
+
+        self.assertEqual(len([token for token in results if token]), 1)
+
+    def test_disjoint_slots_do_not_contend(self):
+        slots = [slot(30 * i, 30) for i in range(12)]
+        results = self.contend(slots)
+
+        self.assertTrue(all(results))
+
+    def test_release_frees_slot(self):
+        token = acquire_slot_hold(TEAM, *slot(0, 30), user="Guest")
+        self.tokens.append(token)
+
+        self.assertIsNone(acquire_slot_hold(TEAM, *slot(15, 30), user="Guest"))
+        self.assertEqual(get_slot_hold(token)["start"], NINE.isoformat())
+
+        release_slot_hold(token)
+        self.assertIsNone(get_slot_hold(token))
+
+        retry = acquire_slot_hold(TEAM, *slot(15, 30), user="Guest")
+        self.tokens.append(retry)
+        self.assertTrue(retry)
+
+    def test_cells_cover_unaligned_slot(self):
+        cells = get_cells(NINE + timedelta(minutes=7), NINE + timedelta(minutes=21))
+
+        self.assertEqual(cells[0], NINE + timedelta(minutes=5))
+        self.assertEqual(cells[-1], NINE + timedelta(minutes=20))
+        self.assertEqual(len(cells), 4)
+
+
+class TestConcurrentBooking(FrappeTestCase):
+    """Concurrent bookings of the same slot create exactly one appointment"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if not frappe.db.exists("Council Team", TEAM):
+            frappe.get_doc({
+                "doctype": "Council Team",
+                "team_name": TEAM,
+                "team_code": TEAM,
+                "is_active": 1,
+                "enable_scheduling": 1,
+                "min_notice_hours": 1
+            }).insert(ignore_permissions=True)
+        # Worker threads use their own connections, so the team must be committed
+        frappe.db.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        frappe.db.delete("Scheduled Appointment", {"team": TEAM})
+        frappe.delete_doc("Council Team", TEAM, ignore_permissions=True, force=True)
+        frappe.db.commit()
+        super().tearDownClass()
+
+    def book(self, slots):
+        """Book all slots at once from separate threads, each with its own site connection"""
+        site, sites_path = frappe.local.site, frappe.local.sites_path
+        barrier = threading.Barrier(len(slots))
+        results = [None] * len(slots)
+
+        def worker(index, start, end):
+            frappe.init(site=site, sites_path=sites_path)
+            frappe.connect()
+            frappe.set_user("Administrator")
+            try:
+                barrier.wait()
+                results[index] = book_appointment(TEAM, start.isoformat(), end.isoformat(), "Pickup")
+            except frappe.ValidationError:
+                results[index] = None
+            finally:
+                frappe.destroy()
+
+        threads = [threading.Thread(target=worker, args=(i, *s)) for i, s in enumerate(slots)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_same_slot_is_booked_once(self):
+        results = self.book([slot(0, 30)] * 10 + [slot(15, 30)] * 5)
+
+        self.assertEqual(len([result for result in results if result]), 1)
+        self.assertEqual(
+            frappe.db.count("Scheduled Appointment", {
+                "team": TEAM,
+                "status": ["in", ["Scheduled", "Confirmed"]],
+                "scheduled_start": ["<", slot(45, 0)[0]]
+            }),
+            1
+        )
+
+    def test_booking_committed_after_snapshot_is_seen(self):
+        """A transaction whose snapshot predates another booking still sees it when booking"""
+        site, sites_path = frappe.local.site, frappe.local.sites_path
+        start, end = (t.isoformat() for t in slot(240, 30))
+        snapshot_taken, first_committed = threading.Event(), threading.Event()
+        result = {}
+
+        def late_booker():
+            frappe.init(site=site, sites_path=sites_path)
+            frappe.connect()
+            frappe.set_user("Administrator")
+            try:
+                # Opens the REPEATABLE READ snapshot before the other booking commits
+                frappe.db.sql("SELECT COUNT(*) FROM `tabScheduled Appointment`")
+                snapshot_taken.set()
+                first_committed.wait(timeout=30)
+                result["late"] = book_appointment(TEAM, start, end, "Pickup")
+            except frappe.ValidationError:
+                result["late"] = None
+            finally:
+                frappe.destroy()
+
+        thread = threading.Thread(target=late_booker)
+        thread.start()
+        self.assertTrue(snapshot_taken.wait(timeout=30))
+        try:
+            first = book_appointment(TEAM, start, end, "Pickup")
+        finally:
+            first_committed.set()
+            thread.join()
+
+        self.assertTrue(first["success"])
+        self.assertIsNone(result["late"])
+        self.assertEqual(
+            frappe.db.count("Scheduled Appointment", {"team": TEAM, "scheduled_start": slot(240, 0)[0]}),
+            1
+        )
+
+    def test_expired_hold_books_free_slot(self):
+        token = acquire_slot_hold(TEAM, *slot(120, 30), user="Administrator")
+        release_slot_hold(token)
+
+        result = book_appointment(TEAM, *(t.isoformat() for t in slot(120, 30)), "Pickup", hold_token=token)
+
+        self.assertTrue(result["success"])
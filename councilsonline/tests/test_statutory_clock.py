@@ -0,0 +1,65 @@
+"""
+Tests for statutory clock metrics and the nightly recompute helpers.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_statutory_clock
+"""
+
+from datetime import date
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.holiday_calendar import HolidayCalendar
+from councilsonline.utils.statutory_clock import get_clock_metrics, has_changed, merge_exclusion_periods
+
+
+class TestClockMetrics(FrappeTestCase):
+    """Clock metrics computed against an explicit calendar"""
+
+    def setUp(self):
+        self.calendar = HolidayCalendar([date(2025, 12, 25).toordinal()])
+
+    def test_elapsed_and_remaining(self):
+        # Mon 1 Dec to Wed 31 Dec: 23 weekdays less Christmas Day
+        metrics = get_clock_metrics("2025-12-01", 20, as_of="2025-12-31", calendar=self.calendar)
+
+        self.assertEqual(metrics["working_days_elapsed"], 22)
+        self.assertEqual(metrics["working_days_remaining"], 0)
+
+    def test_overlapping_exclusions_counted_once(self):
+        # RFI Mon 1 - Fri 5 Dec overlapping a s92 hold Wed 3 - Tue 9 Dec: 7 working days
+        exclusions = [("2025-12-01", "2025-12-05"), ("2025-12-03", "2025-12-09")]
+        metrics = get_clock_metrics("2025-12-01", 20, exclusions, as_of="2025-12-12", calendar=self.calendar)
+
+        self.assertEqual(metrics["total_days_excluded"], 7)
+        self.assertEqual(metrics["working_days_elapsed"], 3)
+        self.assertEqual(metrics["working_days_remaining"], 17)
+
+    def test_open_exclusion_runs_to_as_of(self):
+        metrics = get_clock_metrics("2025-12-01", 20, [("2025-12-08", None)], as_of="2025-12-12", calendar=self.calendar)
+
+        self.assertEqual(metrics["total_days_excluded"], 5)
+        self.assertEqual(metrics["working_days_elapsed"], 5)
+
+    def test_deadline_in_working_days(self):
+        # 20 working days from Mon 1 Dec skip Christmas Day and a one-week hold
+        metrics = get_clock_metrics(
+            "2025-12-01", 20, [("2025-12-08", "2025-12-12")], as_of="2025-12-15", calendar=self.calendar
+        )
+
+        self.assertEqual(metrics["statutory_deadline"], date(2026, 1, 5))
+
+    def test_merge_exclusion_periods(self):
+        merged = merge_exclusion_periods(
+            [("2025-12-10", "2025-12-12"), ("2025-11-20", "2025-12-02"), ("2025-12-03", "2025-12-04")],
+            started_date="2025-12-01", as_of="2025-12-11"
+        )
+
+        self.assertEqual(merged, [(date(2025, 12, 1), date(2025, 12, 4)), (date(2025, 12, 10), date(2025, 12, 11))])
+
+    def test_has_changed(self):
+        row = frappe._dict(working_days_elapsed=5, statutory_deadline="2025-12-29")
+
+        self.assertFalse(has_changed(row, {"working_days_elapsed": 5, "statutory_deadline": date(2025, 12, 29)}))
+        self.assertTrue(has_changed(row, {"working_days_elapsed": 6}))
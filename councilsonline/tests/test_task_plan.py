@@ -0,0 +1,105 @@
+"""
+Tests for in-memory task plan computation.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_task_plan
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.assignment import AssignmentEngine
+from councilsonline.utils.task_plan import get_plan_predecessors, materialise_task_plan, pick_assignee
+
+
+TEST_STAGE_TYPE = "Test Plan Stage"
+
+
+def template(name, task_type="Sequential", depends_on_task=None):
+    return frappe._dict(name=name, task_type=task_type, depends_on_task=depends_on_task)
+
+
+class TestTaskPlan(FrappeTestCase):
+    """Dependencies and assignees computed from preloaded data"""
+
+    def test_sequential_chain_with_parallel_branches(self):
+        stage = [
+            (0, template("Intake")),
+            (1, template("Site Visit", "Parallel")),
+            (2, template("Report")),
+            (3, template("Peer Review", "Parallel"))
+        ]
+
+        self.assertEqual(get_plan_predecessors([stage]), {1: [0], 2: [0], 3: [2]})
+
+    def test_explicit_dependency_across_stages(self):
+        first = [(0, template("Intake")), (1, template("Notify"))]
+        second = [(2, template("Decision", depends_on_task="Intake")), (3, template("Issue"))]
+
+        predecessors = get_plan_predecessors([first, second])
+
+        self.assertEqual(predecessors[2], [0])
+        self.assertEqual(predecessors[3], [2])
+        self.assertNotIn(0, predecessors)
+
+    def test_pick_assignee_priority(self):
+        role_users = {"Planner": ["a@example.com", "b@example.com"]}
+        capacities = {
+            user: frappe._dict(open_hours=0, open_tasks=0, available_for_assignment=1)
+            for user in role_users["Planner"]
+        }
+        engine = AssignmentEngine(role_users, capacities=capacities)
+
+        self.assertEqual(pick_assignee(engine, "Planner", ["b@example.com"], None, 2, "owner"), "b@example.com")
+        self.assertEqual(pick_assignee(engine, "Planner", [], None, 1, "owner"), "a@example.com")
+        self.assertEqual(pick_assignee(engine, "Engineer", [], None, 1, "owner"), "owner")
+
+
+class TestMaterialiseTaskPlan(FrappeTestCase):
+    """The plan is written to Project Task with one bulk insert"""
+
+    def setUp(self):
+        if not frappe.db.exists("Assessment Stage Type", TEST_STAGE_TYPE):
+            frappe.get_doc({"doctype": "Assessment Stage Type", "stage_type_name": TEST_STAGE_TYPE}).insert(
+                ignore_permissions=True
+            )
+        for sequence, title, hours in ((1, "Test Plan Intake", 4), (2, "Test Plan Report", 6)):
+            if not frappe.db.exists("Task Template", title):
+                frappe.get_doc({
+                    "doctype": "Task Template",
+                    "task_template_name": title,
+                    "stage_type": TEST_STAGE_TYPE,
+                    "task_sequence": sequence,
+                    "task_title": title,
+                    "task_type": "Sequential",
+                    "priority": "Medium",
+                    "required_role": "System Manager",
+                    "estimated_hours": hours,
+                    "is_active": 1
+                }).insert(ignore_permissions=True)
+
+    def test_materialise_task_plan(self):
+        project = frappe.get_doc({
+            "doctype": "Assessment Project",
+            "name": "ASSESS-TEST-PLAN",
+            "project_owner": "Administrator",
+            "stages": [{"stage_number": 1, "stage_name": "Intake", "stage_type": TEST_STAGE_TYPE}]
+        })
+
+        self.assertEqual(materialise_task_plan(project), 2)
+
+        tasks = frappe.get_all(
+            "Project Task",
+            filters={"assessment_project": "ASSESS-TEST-PLAN"},
+            fields=["name", "title", "estimated_hours", "earliest_start_hours", "earliest_finish_hours", "assigned_to"],
+            order_by="earliest_start_hours asc"
+        )
+        self.assertEqual(
+            [(task.title, task.estimated_hours, task.earliest_start_hours, task.earliest_finish_hours) for task in tasks],
+            [("Test Plan Intake", 4, 0, 4), ("Test Plan Report", 6, 4, 10)]
+        )
+        self.assertEqual(
+            frappe.get_all("Project Task Dependency", filters={"parent": tasks[1].name}, pluck="predecessor"),
+            [tasks[0].name]
+        )
+        self.assertEqual((project.stages[0].primary_task, project.stages[0].estimated_hours), (tasks[0].name, 10))
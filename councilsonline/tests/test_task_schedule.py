@@ -0,0 +1,77 @@
+"""
+Tests for the task dependency scheduler.
+
+Run with:
+    bench --site councilsonline.localhost run-tests --module councilsonline.tests.test_task_schedule
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from councilsonline.utils.holiday_calendar import HolidayCalendar
+from councilsonline.utils.task_schedule import (
+    WorkingHoursTimeline,
+    get_critical_path,
+    reschedule_project,
+    schedule_tasks,
+    topological_order
+)
+
+
+EIGHT_HOUR_WEEKDAYS = {weekday: 8 for weekday in range(5)}
+
+
+class TestTaskSchedule(FrappeTestCase):
+    """Critical-path scheduling in working hours"""
+
+    def setUp(self):
+        self.timeline = WorkingHoursTimeline(
+            date(2025, 12, 22), HolidayCalendar([date(2025, 12, 25).toordinal()]), EIGHT_HOUR_WEEKDAYS
+        )
+
+    def test_forward_and_backward_pass(self):
+        # A -> B -> D and A -> C -> D, with C shorter than B
+        durations = {"A": 8, "B": 16, "C": 4, "D": 8}
+        predecessors = {"B": ["A"], "C": ["A"], "D": ["B", "C"]}
+
+        schedule = schedule_tasks(durations, predecessors)
+
+        self.assertEqual(schedule["D"]["earliest_start"], 24)
+        self.assertEqual(schedule["D"]["earliest_finish"], 32)
+        self.assertEqual(schedule["C"]["slack"], 12)
+        self.assertFalse(schedule["C"]["critical"])
+        self.assertEqual(get_critical_path(schedule, predecessors), ["A", "B", "D"])
+
+    def test_cycle_is_rejected(self):
+        self.assertRaises(frappe.ValidationError, topological_order, ["A", "B"], {"A": ["B"], "B": ["A"]})
+
+    def test_timeline_skips_weekends_and_holidays(self):
+        # Mon 22 Dec start: 24 hours run Mon, Tue, Wed; Christmas Day is skipped
+        self.assertEqual(self.timeline.finish_date(24), date(2025, 12, 24))
+        self.assertEqual(self.timeline.start_date(24), date(2025, 12, 26))
+        self.assertEqual(self.timeline.finish_date(40), date(2025, 12, 29))
+        self.assertEqual(self.timeline.finish_date(0), date(2025, 12, 22))
+
+    def test_hours_through_date(self):
+        self.assertEqual(self.timeline.hours_through(date(2025, 12, 26)), 32)
+        self.assertEqual(self.timeline.hours_through(date(2025, 12, 21)), 0)
+
+    def test_reschedule_project_uses_estimated_hours(self):
+        tasks = [
+            frappe._dict(name="T1", status="Open", estimated_hours=8, earliest_start_hours=0, earliest_finish_hours=0),
+            frappe._dict(name="T2", status="Open", estimated_hours=4, earliest_start_hours=0, earliest_finish_hours=0),
+            frappe._dict(name="T3", status="Completed", estimated_hours=2, earliest_start_hours=0, earliest_finish_hours=0)
+        ]
+        with patch("frappe.get_all", return_value=tasks), \
+                patch("councilsonline.utils.task_schedule.get_predecessors", return_value={"T2": ["T1"], "T3": ["T2"]}), \
+                patch("councilsonline.utils.task_schedule.get_project_timeline", return_value=self.timeline), \
+                patch("frappe.db.bulk_update") as bulk_update:
+            self.assertEqual(reschedule_project("AP-1"), 2)
+
+        updates = bulk_update.call_args[0][1]
+        self.assertEqual(sorted(updates), ["T1", "T2"])
+        self.assertEqual((updates["T2"]["earliest_start_hours"], updates["T2"]["earliest_finish_hours"]), (8, 12))
+        self.assertEqual(updates["T2"]["due_date"], date(2025, 12, 23))
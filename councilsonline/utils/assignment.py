@@ -0,0 +1,293 @@
+"""
+Assignment Engine
+Picks Project Task assignees from a capacity index of role holders: each
+user's open estimated hours, leave and hour limit come from Assignee Capacity
+(maintained incrementally from Project Task), are loaded once per run, and
+are kept in a heap per role (and team) so each least-loaded pick costs
+O(log n). Round-robin rotates through the same pools
+"""
+
+import heapq
+
+import frappe
+from frappe.utils import flt, getdate, now
+
+
+STRATEGIES = ("Least Loaded", "Round Robin")
+
+
+def get_role_users(roles, users=None):
+	"""
+	Enabled users holding each role, in one query
+
+	Args:
+		roles: Role names
+		users: Limit to these users (optional)
+
+	Returns:
+		dict: {role: [user]}, users in name order
+	"""
+	if not roles or users is not None and not users:
+		return {}
+
+	user_condition = "AND hr.parent IN %(users)s" if users else ""
+	rows = frappe.db.sql(f"""
+		SELECT hr.role, hr.parent
+		FROM `tabHas Role` hr
+		INNER JOIN `tabUser` u ON u.name = hr.parent
+		WHERE hr.parenttype = 'User'
+		AND hr.role IN %(roles)s
+		AND u.enabled = 1
+		{user_condition}
+		ORDER BY hr.parent
+	""", {"roles": tuple(roles), "users": tuple(users or ())}, as_dict=True)
+
+	role_users = {}
+	for row in rows:
+		role_users.setdefault(row.role, []).append(row.parent)
+	return role_users
+
+
+def get_capacities(users):
+	"""
+	Capacity rows of several users in one query
+
+	Users without a row have no open work and no leave.
+
+	Returns:
+		dict: {user: _dict(open_hours, open_tasks, max_open_hours, available_for_assignment,
+		unavailable_from, unavailable_until, last_assigned)}
+	"""
+	capacities = {
+		user: frappe._dict(
+			open_hours=0, open_tasks=0, max_open_hours=0, available_for_assignment=1,
+			unavailable_from=None, unavailable_until=None, last_assigned=None
+		)
+		for user in users
+	}
+	if not capacities:
+		return capacities
+
+	for row in frappe.get_all(
+		"Assignee Capacity",
+		filters={"name": ["in", list(capacities)]},
+		fields=[
+			"name", "open_hours", "open_tasks", "max_open_hours", "available_for_assignment",
+			"unavailable_from", "unavailable_until", "last_assigned"
+		]
+	):
+		capacities[row.pop("name")].update(row)
+	return capacities
+
+
+class AssignmentEngine:
+	"""
+	In-memory capacity index for one assignment run
+
+	Loads are tracked per user and shared by every pool; a pool's heap may
+	hold outdated entries for a user, which are refreshed when they reach the
+	top (lazy deletion), so a pick and its load update are O(log n).
+
+	Args:
+		role_users: {role: [user]}, e.g. from get_role_users
+		strategy: "Least Loaded" or "Round Robin"
+		capacities: {user: capacity} (loaded with get_capacities when omitted)
+	"""
+
+	def __init__(self, role_users, strategy="Least Loaded", capacities=None):
+		if strategy not in STRATEGIES:
+			frappe.throw(f"Unknown assignment strategy: {strategy}")
+
+		self.role_users = role_users
+		self.strategy = strategy
+		users = {user for holders in role_users.values() for user in holders}
+		self.capacity = capacities if capacities is not None else get_capacities(users)
+		self.pools = {}
+		self.heaps = {}
+		self.cursors = {}
+
+	def load(self, user):
+		return flt(self.capacity[user].open_hours)
+
+	def is_available(self, user, on_date=None, hours=0):
+		"""Whether a user can take ``hours`` more work starting on ``on_date``"""
+		capacity = self.capacity[user]
+		if not capacity.available_for_assignment:
+			return False
+		if capacity.max_open_hours and self.load(user) + flt(hours) > flt(capacity.max_open_hours):
+			return False
+		if on_date and capacity.unavailable_from:
+			on_date = getdate(on_date)
+			if getdate(capacity.unavailable_from) <= on_date and (
+				not capacity.unavailable_until or on_date <= getdate(capacity.unavailable_until)
+			):
+				return False
+		return True
+
+	def get_pool(self, role, members=None):
+		"""Pool key for role holders, limited to ``members`` when given; None when empty"""
+		holders = self.role_users.get(role) or ()
+		key = (role, frozenset(members) if members is not None else None)
+		if key not in self.pools:
+			pool = sorted(user for user in holders if members is None or user in members)
+			if not pool:
+				return None
+			self.pools[key] = pool
+		return key
+
+	def entry(self, user):
+		# Ties go to whoever was assigned least recently, then by name
+		return (self.load(user), str(self.capacity[user].last_assigned or ""), user)
+
+	def pick(self, role, members=None, on_date=None, hours=0):
+		"""
+		Pick and book the assignee for a task
+
+		Args:
+			role: Required role
+			members: Only consider these users (e.g. the required team) (optional)
+			on_date: Task start date, to skip users on leave (optional)
+			hours: Task estimated hours, added to the chosen user's load
+
+		Returns:
+			str: User, or None if no role holder is available
+		"""
+		key = self.get_pool(role, members)
+		if not key:
+			return None
+
+		if self.strategy == "Round Robin":
+			user = self.pick_round_robin(key, on_date, hours)
+		else:
+			user = self.pick_least_loaded(key, on_date, hours)
+
+		if user:
+			self.book(user, hours)
+		return user
+
+	def pick_least_loaded(self, key, on_date, hours):
+		heap = self.heaps.get(key)
+		if heap is None:
+			heap = self.heaps[key] = [self.entry(user) for user in self.pools[key]]
+			heapq.heapify(heap)
+
+		skipped = []
+		chosen = None
+		while heap:
+			entry = heapq.heappop(heap)
+			user = entry[2]
+			if entry != self.entry(user):
+				heapq.heappush(heap, self.entry(user))
+				continue
+			if self.is_available(user, on_date, hours):
+				chosen = user
+				break
+			skipped.append(entry)
+
+		for entry in skipped:
+			heapq.heappush(heap, entry)
+		return chosen
+
+	def pick_round_robin(self, key, on_date, hours):
+		pool = self.pools[key]
+		start = self.cursors.get(key, 0)
+		for offset in range(len(pool)):
+			index = (start + offset) % len(pool)
+			if self.is_available(pool[index], on_date, hours):
+				self.cursors[key] = index + 1
+				return pool[index]
+		return None
+
+	def book(self, user, hours):
+		"""Add a task's hours to a user's load (negative hours release work)"""
+		capacity = self.capacity[user]
+		capacity.open_hours = max(self.load(user) + flt(hours), 0)
+		capacity.open_tasks = max((capacity.open_tasks or 0) + (1 if flt(hours) >= 0 else -1), 0)
+		if flt(hours) >= 0:
+			capacity.last_assigned = now()
+
+		# Pools whose heap holds this user get a fresh entry; the old one is skipped when popped
+		for key, heap in self.heaps.items():
+			if user in self.pools[key]:
+				heapq.heappush(heap, self.entry(user))
+
+
+def get_plan_workload(tasks):
+	"""Capacity deltas of new tasks per assignee: {user: {"open_hours", "open_tasks"}}"""
+	from councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity import get_workload
+
+	workload = {}
+	for task in tasks:
+		contribution = get_workload(frappe._dict(task))
+		if contribution:
+			totals = workload.setdefault(task["assigned_to"], {"open_hours": 0, "open_tasks": 0})
+			for field, amount in contribution.items():
+				totals[field] += amount
+	return workload
+
+
+def rebalance_open_tasks(assessment_project=None, role=None, strategy="Least Loaded", dry_run=False):
+	"""
+	Spread open, not yet started tasks across the holders of their role
+
+	The tasks' current hours are released from their assignees, then tasks
+	are placed largest first on the least-loaded available holder (or in
+	rotation), so heavy tasks are spread before light ones fill the gaps.
+	Only moved tasks are written, with one bulk update, and the capacity
+	index is adjusted with the net change per user.
+
+	Returns:
+		list: [{"task", "from", "to", "hours"}] for tasks that change assignee
+	"""
+	from councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity import apply_capacity_delta
+
+	filters = {"status": "Open", "assigned_role": ["is", "set"]}
+	if assessment_project:
+		filters["assessment_project"] = assessment_project
+	if role:
+		filters["assigned_role"] = role
+
+	tasks = frappe.get_all(
+		"Project Task",
+		filters=filters,
+		fields=["name", "assigned_to", "assigned_role", "estimated_hours", "start_date"],
+		order_by="estimated_hours desc, name asc"
+	)
+	if not tasks:
+		return []
+
+	role_users = get_role_users({task.assigned_role for task in tasks})
+	users = {user for holders in role_users.values() for user in holders}
+	users |= {task.assigned_to for task in tasks if task.assigned_to}
+	engine = AssignmentEngine(role_users, strategy, capacities=get_capacities(users))
+
+	for task in tasks:
+		if task.assigned_to:
+			engine.book(task.assigned_to, -flt(task.estimated_hours))
+
+	moves = []
+	deltas = {}
+	for task in tasks:
+		assignee = engine.pick(task.assigned_role, on_date=task.start_date, hours=task.estimated_hours)
+		if not assignee:
+			# Nobody available: the task stays where it is
+			if task.assigned_to:
+				engine.book(task.assigned_to, task.estimated_hours)
+			continue
+		if assignee == task.assigned_to:
+			continue
+
+		hours = flt(task.estimated_hours)
+		moves.append({"task": task.name, "from": task.assigned_to, "to": assignee, "hours": hours})
+		for user, sign in ((task.assigned_to, -1), (assignee, 1)):
+			if user:
+				delta = deltas.setdefault(user, {"open_hours": 0, "open_tasks": 0})
+				delta["open_hours"] += sign * hours
+				delta["open_tasks"] += sign
+
+	if moves and not dry_run:
+		frappe.db.bulk_update("Project Task", {move["task"]: {"assigned_to": move["to"]} for move in moves})
+		for user, delta in deltas.items():
+			apply_capacity_delta(user, delta, assigned=delta["open_tasks"] > 0)
+
+	return moves
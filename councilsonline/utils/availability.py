@@ -0,0 +1,300 @@
+"""
+Availability Engine
+Shared slot generation for Council Team appointments and Council meetings:
+bookings are padded by the buffer, sorted and merged once, then each day's
+slot grid is swept against the busy intervals in a single pass. Council Team
+availability is cached per day as a compact slot bitmap.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, time as datetime_time
+import hashlib
+import json
+
+import frappe
+from frappe.utils import get_datetime, get_time, getdate
+
+
+WORKING_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+
+SNAPSHOT_KEY_PREFIX = "councilsonline:availability:"
+SNAPSHOT_TTL = 6 * 60 * 60  # Seconds; snapshots are also invalidated by bookings and team edits
+NOTICE_ALIGN_MINUTES = 15
+
+# Monday-Friday, 9 AM - 5 PM when no business hours are configured
+DEFAULT_BUSINESS_HOURS = {
+	day: {"start_time": datetime_time(9, 0), "end_time": datetime_time(17, 0)}
+	for day in WORKING_DAYS
+}
+
+
+def to_time(value):
+	"""Convert a Time field value (timedelta from the database, str or time) to a time"""
+	if isinstance(value, timedelta):
+		total_seconds = int(value.total_seconds())
+		return datetime_time(total_seconds // 3600, (total_seconds % 3600) // 60)
+	if isinstance(value, datetime_time):
+		return value
+	return get_time(value)
+
+
+def get_business_hours(rows):
+	"""
+	Build business hours from Business Hours child rows
+
+	Args:
+		rows: Rows with day_of_week, is_open, start_time, end_time
+
+	Returns:
+		dict: {day_name: {"start_time": time, "end_time": time}} for open days,
+		or DEFAULT_BUSINESS_HOURS when no day is open
+	"""
+	hours = {
+		row.day_of_week: {"start_time": to_time(row.start_time), "end_time": to_time(row.end_time)}
+		for row in rows or []
+		if row.is_open and row.start_time and row.end_time
+	}
+	return hours or dict(DEFAULT_BUSINESS_HOURS)
+
+
+def merge_busy_intervals(bookings, buffer_minutes=0):
+	"""
+	Pad bookings by the buffer on both sides and merge them into sorted, disjoint intervals
+
+	Args:
+		bookings: Iterable of (start, end) datetimes or datetime strings
+		buffer_minutes: Gap required before and after each booking
+
+	Returns:
+		list: [(start, end)] in order; touching intervals are merged
+	"""
+	pad = timedelta(minutes=buffer_minutes or 0)
+	intervals = sorted(
+		(get_datetime(start) - pad, get_datetime(end) + pad)
+		for start, end in bookings
+		if start and end
+	)
+
+	merged = []
+	for start, end in intervals:
+		if merged and start <= merged[-1][1]:
+			if end > merged[-1][1]:
+				merged[-1] = (merged[-1][0], end)
+		else:
+			merged.append((start, end))
+	return merged
+
+
+def ceil_to_minutes(value, minutes):
+	"""Round a datetime up to the next multiple of ``minutes`` past the hour"""
+	value = value.replace(second=0, microsecond=0) + (
+		timedelta(minutes=1) if value.second or value.microsecond else timedelta()
+	)
+	remainder = value.minute % minutes
+	return value + timedelta(minutes=minutes - remainder) if remainder else value
+
+
+def find_available_slots(start_date, end_date, business_hours, busy, duration_minutes, step_minutes,
+		earliest=None, align_minutes=15, max_daily=None, daily_counts=None):
+	"""
+	Sweep each day's slot grid against merged busy intervals
+
+	Slots start at opening time (or the first aligned time after ``earliest``)
+	and advance by ``step_minutes``. Busy intervals are visited with a single
+	forward pointer, so the cost is linear in slots plus bookings.
+
+	Args:
+		start_date, end_date: Inclusive date range
+		business_hours: {day_name: {"start_time", "end_time"}}
+		busy: Output of merge_busy_intervals
+		duration_minutes: Slot length
+		step_minutes: Distance between slot starts (duration plus buffer)
+		earliest: Minimum slot start, e.g. now plus the minimum notice (optional)
+		align_minutes: Boundary to round ``earliest`` up to
+		max_daily: Skip days that already have this many bookings (optional)
+		daily_counts: {date: booking count}, required with max_daily
+
+	Returns:
+		dict: {date: [(slot_start, slot_end)]} for days with at least one free slot, in date order
+	"""
+	duration = timedelta(minutes=duration_minutes)
+	step = timedelta(minutes=max(step_minutes, 1))
+	busy_ends = [end for _, end in busy]
+	if earliest:
+		earliest = ceil_to_minutes(earliest, align_minutes)
+
+	slots = {}
+	current_date = start_date
+	while current_date <= end_date:
+		day_hours = business_hours.get(current_date.strftime("%A"))
+		if not day_hours or (max_daily and (daily_counts or {}).get(current_date, 0) >= max_daily):
+			current_date += timedelta(days=1)
+			continue
+
+		slot_start = datetime.combine(current_date, day_hours["start_time"])
+		day_end = datetime.combine(current_date, day_hours["end_time"])
+		if earliest and slot_start < earliest:
+			slot_start = earliest
+
+		# First busy interval that ends after the first slot starts
+		index = bisect_right(busy_ends, slot_start)
+		day_slots = []
+
+		while slot_start + duration <= day_end:
+			slot_end = slot_start + duration
+			while index < len(busy) and busy[index][1] <= slot_start:
+				index += 1
+			if index == len(busy) or busy[index][0] >= slot_end:
+				day_slots.append((slot_start, slot_end))
+			slot_start += step
+
+		if day_slots:
+			slots[current_date] = day_slots
+		current_date += timedelta(days=1)
+
+	return slots
+
+
+def count_bookings_per_day(booking_dates):
+	"""Count bookings per date: {date: count}"""
+	counts = {}
+	for booking_date in booking_dates:
+		counts[booking_date] = counts.get(booking_date, 0) + 1
+	return counts
+
+
+def get_team_version(team):
+	"""Get a Council Team's availability version stamp (changes when its configuration is saved)"""
+	cache = frappe.cache()
+	version = cache.get_value(f"{SNAPSHOT_KEY_PREFIX}{team}:version")
+	if not version:
+		version = bump_team_version(team)
+	return version
+
+
+def bump_team_version(team):
+	"""Invalidate all of a team's snapshots (business hours, duration, buffer or cap changed)"""
+	version = frappe.generate_hash(length=10)
+	frappe.cache().set_value(f"{SNAPSHOT_KEY_PREFIX}{team}:version", version)
+	return version
+
+
+def get_snapshot_key(team, version, day):
+	"""Redis hash holding one day's slot bitmaps, one field per slot duration"""
+	return f"{SNAPSHOT_KEY_PREFIX}{team}:{version}:{day.isoformat()}"
+
+
+def invalidate_team_days(team, days):
+	"""
+	Drop a team's snapshots for specific days
+
+	Runs now and again after commit, so a snapshot computed from the
+	pre-commit state by a concurrent request does not survive.
+	"""
+	cache = frappe.cache()
+	keys = [get_snapshot_key(team, get_team_version(team), getdate(day)) for day in set(days)]
+
+	cache.delete_value(keys)
+	frappe.db.after_commit.add(lambda: cache.delete_value(keys))
+
+
+def encode_slots(day_slots, opening, step_minutes):
+	"""Encode a day's free slots as a bitmap over the slot grid (bit i = i-th slot from opening)"""
+	step = timedelta(minutes=step_minutes)
+	bitmap = 0
+	for slot_start, _ in day_slots:
+		bitmap |= 1 << ((slot_start - opening) // step)
+	return bitmap
+
+
+def decode_slots(bitmap, opening, duration_minutes, step_minutes):
+	"""Expand a slot bitmap back to [(slot_start, slot_end)]"""
+	duration = timedelta(minutes=duration_minutes)
+	slots = []
+	index = 0
+	while bitmap:
+		if bitmap & 1:
+			slot_start = opening + timedelta(minutes=step_minutes * index)
+			slots.append((slot_start, slot_start + duration))
+		bitmap >>= 1
+		index += 1
+	return slots
+
+
+def get_team_available_slots(team, start_date, end_date, business_hours, duration_minutes, buffer_minutes,
+		earliest=None, max_daily=None):
+	"""
+	Get a Council Team's free slots, serving each day from its cached snapshot
+
+	Days missing from the cache are computed together from one bookings query
+	and stored. Days whose grid is shifted by the minimum notice (opening time
+	before ``earliest``) are always computed live and never cached.
+
+	Returns:
+		dict: {date: [(slot_start, slot_end)]}, as find_available_slots
+	"""
+	cache = frappe.cache()
+	version = get_team_version(team)
+	step_minutes = duration_minutes + buffer_minutes
+	field = str(duration_minutes)
+	if earliest:
+		earliest = ceil_to_minutes(earliest, NOTICE_ALIGN_MINUTES)
+
+	slots = {}
+	cacheable, live = [], []
+	current_date = start_date
+	while current_date <= end_date:
+		day_hours = business_hours.get(current_date.strftime("%A"))
+		if day_hours:
+			opening = datetime.combine(current_date, day_hours["start_time"])
+			if earliest and opening < earliest:
+				live.append(current_date)
+			else:
+				bitmap = cache.hget(get_snapshot_key(team, version, current_date), field)
+				if bitmap is None:
+					cacheable.append(current_date)
+				elif bitmap:
+					slots[current_date] = decode_slots(bitmap, opening, duration_minutes, step_minutes)
+		current_date += timedelta(days=1)
+
+	missing = cacheable + live
+	if not missing:
+		return slots
+
+	bookings = frappe.get_all(
+		"Scheduled Appointment",
+		filters={
+			"team": team,
+			"scheduled_date": ["between", [min(missing), max(missing)]],
+			"status": ["in", ["Scheduled", "Confirmed"]]
+		},
+		fields=["scheduled_start", "scheduled_end", "scheduled_date"]
+	)
+	busy = merge_busy_intervals(
+		[(booking.scheduled_start, booking.scheduled_end) for booking in bookings], buffer_minutes
+	)
+	daily_counts = count_bookings_per_day(getdate(booking.scheduled_date) for booking in bookings)
+
+	for day in missing:
+		day_slots = find_available_slots(
+			day, day, business_hours, busy, duration_minutes, step_minutes,
+			earliest=earliest if day in live else None,
+			align_minutes=NOTICE_ALIGN_MINUTES, max_daily=max_daily, daily_counts=daily_counts
+		).get(day, [])
+
+		if day_slots:
+			slots[day] = day_slots
+		if day not in live:
+			opening = datetime.combine(day, business_hours[day.strftime("%A")]["start_time"])
+			key = get_snapshot_key(team, version, day)
+			cache.hset(key, field, encode_slots(day_slots, opening, step_minutes))
+			cache.expire(cache.make_key(key), SNAPSHOT_TTL)
+
+	return dict(sorted(slots.items()))
+
+
+def make_etag(payload):
+	"""Weak ETag for a JSON-serialisable payload"""
+	return 'W/"{}"'.format(
+		hashlib.md5(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+	)
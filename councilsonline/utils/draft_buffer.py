@@ -0,0 +1,326 @@
+"""
+Draft Autosave Write-Behind Buffer
+Buffers per-step JSON merge-patches (RFC 7386) for draft Requests in a Redis
+list and flushes them, coalesced, to the database on step change, submit or a
+timer
+"""
+
+import json
+
+import frappe
+import redis
+from frappe.model import default_fields
+from frappe.utils import now_datetime, get_datetime
+
+
+BUFFER_KEY_PREFIX = "councilsonline:draft_patch:"
+PENDING_SET_KEY = "councilsonline:draft_patch_pending"
+BUFFER_TTL = 24 * 60 * 60  # Seconds; the timer flushes long before this
+FLUSH_AFTER_SECONDS = 60  # Timer flush threshold, measured from the first buffered patch
+
+# Request attributes that are computed or managed elsewhere and must not be patched
+NON_PATCHABLE_FIELDS = {
+	"requester", "requester_name", "requester_email", "requester_phone",
+	"computed_total_fees_excl_gst", "computed_gst_amount", "total_fees_incl_gst",
+	"workflow_state", "draft_full_data", "draft_current_step", "draft_total_steps",
+	"application_doctype", "application_name",
+}
+
+
+def apply_merge_patch(target, patch):
+	"""
+	Apply a JSON merge-patch to a document (RFC 7386)
+
+	Keys set to None are removed; nested objects are merged recursively.
+	"""
+	if not isinstance(patch, dict):
+		return patch
+
+	result = dict(target) if isinstance(target, dict) else {}
+	for key, value in patch.items():
+		if value is None:
+			result.pop(key, None)
+		else:
+			result[key] = apply_merge_patch(result.get(key), value)
+	return result
+
+
+def compose_merge_patches(first, second):
+	"""
+	Combine two merge-patches into one with the same effect as applying both in order
+
+	Deletions (None) are kept so they still apply when the combined patch is flushed.
+
+	Returns:
+		dict: The combined patch, or None when the pair cannot be expressed as a
+		single merge-patch (an object written over a value the first patch
+		replaced or removed would be merged into the target instead of replacing it)
+	"""
+	result = dict(first)
+	for key, value in second.items():
+		if isinstance(value, dict) and key in result:
+			if not isinstance(result[key], dict):
+				return None
+			combined = compose_merge_patches(result[key], value)
+			if combined is None:
+				return None
+			result[key] = combined
+		else:
+			result[key] = value
+	return result
+
+
+def apply_merge_patches(target, patches):
+	"""Apply a sequence of merge-patches in order"""
+	for patch in patches:
+		target = apply_merge_patch(target, patch)
+	return target
+
+
+def coalesce_patches(patches):
+	"""Combine consecutive patches; keep a separate patch only where two cannot combine"""
+	coalesced = []
+	for patch in patches:
+		combined = compose_merge_patches(coalesced[-1], patch) if coalesced else None
+		if combined is None:
+			coalesced.append(patch)
+		else:
+			coalesced[-1] = combined
+	return coalesced
+
+
+def get_buffer_key(request_id):
+	"""Redis key of a draft's buffer, as stored (list operations go through the raw client)"""
+	return frappe.cache().make_key(BUFFER_KEY_PREFIX + request_id)
+
+
+def load_entries(raw_entries):
+	return [json.loads(frappe.safe_decode(entry)) for entry in raw_entries or []]
+
+
+def merge_entries(entries):
+	"""Buffer view of list entries: {"patches", "step", "total_steps", "buffered_at"} or None"""
+	if not entries:
+		return None
+
+	buffered = {
+		"patches": coalesce_patches([entry["patch"] for entry in entries]),
+		"buffered_at": entries[0]["buffered_at"]
+	}
+	for entry in entries:
+		for field in ("step", "total_steps"):
+			if entry.get(field) is not None:
+				buffered[field] = entry[field]
+	return buffered
+
+
+def get_buffer(request_id):
+	"""Get the pending buffer for a draft: {"patches", "step", "total_steps", "buffered_at"} or None"""
+	return merge_entries(load_entries(redis.Redis.lrange(frappe.cache(), get_buffer_key(request_id), 0, -1)))
+
+
+def buffer_patch(request_id, patch, step=None, total_steps=None):
+	"""
+	Append a patch to the draft's Redis buffer
+
+	Each patch is one RPUSH onto the draft's list, so concurrent autosaves
+	never overwrite each other; patches are coalesced when the buffer is read.
+	"""
+	cache = frappe.cache()
+	key = get_buffer_key(request_id)
+	entry = {"patch": patch, "step": step, "total_steps": total_steps, "buffered_at": str(now_datetime())}
+
+	pipeline = cache.pipeline()
+	pipeline.rpush(key, json.dumps(entry, default=str))
+	pipeline.expire(key, BUFFER_TTL)
+	pipeline.execute()
+	cache.sadd(PENDING_SET_KEY, request_id)
+
+
+def claim_buffer(request_id):
+	"""
+	Take every pending entry of a draft's buffer, atomically
+
+	LRANGE and DEL run in one MULTI/EXEC, so a patch pushed during the claim
+	is either claimed or left for the next flush, never lost.
+
+	Returns:
+		list: Entries in the order they were buffered
+	"""
+	cache = frappe.cache()
+	key = get_buffer_key(request_id)
+
+	pipeline = cache.pipeline(transaction=True)
+	pipeline.lrange(key, 0, -1)
+	pipeline.delete(key)
+	raw_entries, _ = pipeline.execute()
+
+	release_pending(request_id)
+	return load_entries(raw_entries)
+
+
+def requeue_entries(request_id, entries):
+	"""Put claimed entries back at the head of the buffer, ahead of patches buffered since"""
+	if not entries:
+		return
+
+	cache = frappe.cache()
+	key = get_buffer_key(request_id)
+
+	pipeline = cache.pipeline()
+	pipeline.lpush(key, *(json.dumps(entry, default=str) for entry in reversed(entries)))
+	pipeline.expire(key, BUFFER_TTL)
+	pipeline.execute()
+	cache.sadd(PENDING_SET_KEY, request_id)
+
+
+def release_pending(request_id):
+	"""Drop a draft from the timer's pending set unless patches arrived in the meantime"""
+	cache = frappe.cache()
+	cache.srem(PENDING_SET_KEY, request_id)
+	if redis.Redis.llen(cache, get_buffer_key(request_id)):
+		cache.sadd(PENDING_SET_KEY, request_id)
+
+
+def discard_buffer(request_id):
+	"""Drop a draft's pending buffer without writing it"""
+	cache = frappe.cache()
+	cache.delete_value(BUFFER_KEY_PREFIX + request_id)
+	cache.srem(PENDING_SET_KEY, request_id)
+
+
+def get_patchable_fields():
+	"""Request columns that a draft patch may write directly"""
+	meta = frappe.get_meta("Request")
+	return {
+		df.fieldname for df in meta.fields
+		if df.fieldname in meta.get_valid_columns()
+	} - set(default_fields) - NON_PATCHABLE_FIELDS
+
+
+def apply_buffered_patch(request_id, form_data):
+	"""Overlay a draft's unflushed patch on its stored form data (read-your-writes)"""
+	buffered = get_buffer(request_id)
+	if not buffered:
+		return form_data
+	return apply_merge_patches(form_data, buffered["patches"])
+
+
+def flush_draft_buffer(request_id):
+	"""
+	Write a draft's coalesced patch to the database
+
+	Performs one UPDATE on the Request (changed columns plus draft_full_data and
+	step metadata) and at most one save of the linked application document.
+
+	Returns:
+		bool: True if a pending patch was written
+	"""
+	entries = claim_buffer(request_id)
+	if not entries:
+		return False
+
+	# Claimed patches go back to the head of the buffer if this write is rolled
+	# back, whether the flush itself fails or the caller's transaction does
+	requeued = []
+
+	def requeue():
+		if not requeued:
+			requeued.append(True)
+			requeue_entries(request_id, entries)
+
+	frappe.db.after_rollback.add(requeue)
+	try:
+		return write_buffered_patch(request_id, merge_entries(entries))
+	except Exception:
+		requeue()
+		raise
+
+
+def write_buffered_patch(request_id, buffered):
+	"""One UPDATE of the Request and at most one save of its application for a claimed buffer"""
+	request = frappe.db.get_value(
+		"Request", request_id,
+		["docstatus", "draft_full_data", "application_doctype", "application_name"],
+		as_dict=True
+	)
+	if not request or request.docstatus != 0:
+		return False
+
+	patches = buffered["patches"]
+	touched = {key for patch in patches for key in patch}
+
+	form_data = {}
+	if request.draft_full_data:
+		try:
+			form_data = json.loads(request.draft_full_data)
+		except ValueError:
+			frappe.log_error(f"Failed to parse draft data for {request_id}")
+	form_data = apply_merge_patches(form_data, patches)
+
+	# Touched top-level keys that are scalar Request columns are written directly
+	patchable = get_patchable_fields()
+	values = {
+		key: form_data.get(key) for key in touched
+		if key in patchable and not isinstance(form_data.get(key), (dict, list))
+	}
+	values["draft_full_data"] = json.dumps(form_data, default=str)
+	if buffered.get("step") is not None:
+		values["draft_current_step"] = buffered["step"]
+	if buffered.get("total_steps") is not None:
+		values["draft_total_steps"] = buffered["total_steps"]
+
+	frappe.db.set_value("Request", request_id, values)
+
+	# Update the linked application once per flush with only the changed keys
+	changes = {key: form_data.get(key) for key in touched}
+	if request.application_doctype == "SPISC Application" and request.application_name:
+		from councilsonline.api.requests import update_spisc_application
+
+		app_doc = frappe.get_doc("SPISC Application", request.application_name)
+		update_spisc_application(app_doc, changes)
+		app_doc.flags.ignore_mandatory = True
+		app_doc.flags.ignore_permissions = True
+		app_doc.flags.ignore_validate = True
+		app_doc.save()
+	elif request.application_doctype == "Resource Consent Application" and request.application_name:
+		from councilsonline.api.requests import update_rc_application
+
+		update_rc_application(request.application_name, changes)
+
+	return True
+
+
+def flush_stale_draft_buffers():
+	"""
+	Scheduled job: flush draft buffers that have been pending for FLUSH_AFTER_SECONDS
+
+	Returns:
+		int: Number of drafts flushed
+	"""
+	cache = frappe.cache()
+	flushed = 0
+
+	for member in cache.smembers(PENDING_SET_KEY) or []:
+		request_id = frappe.safe_decode(member)
+		buffered = get_buffer(request_id)
+
+		if not buffered:
+			# Buffer expired or was flushed elsewhere
+			release_pending(request_id)
+			continue
+
+		pending_for = (now_datetime() - get_datetime(buffered["buffered_at"])).total_seconds()
+		if pending_for < FLUSH_AFTER_SECONDS:
+			continue
+
+		try:
+			if flush_draft_buffer(request_id):
+				flushed += 1
+			frappe.db.commit()
+		except Exception as e:
+			# The rollback puts the claimed patches back at the head of the buffer for the next run
+			frappe.db.rollback()
+			frappe.log_error(f"Failed to flush draft buffer for {request_id}: {str(e)}", "Draft Autosave Flush Error")
+
+	return flushed
@@ -0,0 +1,243 @@
+"""
+Compiled Form Schema Cache
+Builds the step/section/field configuration of a Request Type once per
+(request_type, council) and serves it from Redis under a version stamp
+"""
+
+from collections import defaultdict
+
+import frappe
+
+
+SCHEMA_VERSION_KEY = "councilsonline:form_schema_version"
+SCHEMA_CACHE_TTL = 24 * 60 * 60  # Seconds; stale versions simply expire
+
+
+def get_schema_version():
+	"""Get the current form schema version stamp, creating one if missing"""
+	cache = frappe.cache()
+	version = cache.get_value(SCHEMA_VERSION_KEY)
+	if not version:
+		version = frappe.generate_hash(length=10)
+		cache.set_value(SCHEMA_VERSION_KEY, version)
+	return version
+
+
+def bump_schema_version(doc=None, method=None):
+	"""
+	Invalidate every compiled form schema by issuing a new version stamp
+
+	Hooked to Request Type and Council saves (see hooks.py); Council's child
+	tables hold the council request types and step and section overrides.
+	Old artifacts are never read again and expire on their own.
+	"""
+	frappe.cache().set_value(SCHEMA_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def resolve_request_type_name(request_type_code):
+	"""
+	Resolve a type_code or name to the Request Type name (cached per version)
+
+	Returns:
+		str: Request Type name, or None if it does not exist
+	"""
+	cache = frappe.cache()
+	key = f"councilsonline:form_schema:{get_schema_version()}:code:{request_type_code}"
+
+	name = cache.get_value(key)
+	if name is None:
+		name = (
+			frappe.db.get_value("Request Type", {"type_code": request_type_code}, "name")
+			or frappe.db.exists("Request Type", request_type_code)
+			or ""
+		)
+		cache.set_value(key, name, expires_in_sec=SCHEMA_CACHE_TTL)
+
+	return name or None
+
+
+def get_compiled_schema(request_type, council_code=None):
+	"""
+	Get the compiled form schema for a Request Type, compiling it on a cache miss
+
+	Args:
+		request_type: Request Type name
+		council_code: Optional council code for council-specific overrides
+
+	Returns:
+		dict: {"config": {...}, "steps": [...], "uses_config": bool}
+	"""
+	cache = frappe.cache()
+	key = f"councilsonline:form_schema:{get_schema_version()}:{request_type}:{council_code or ''}"
+
+	schema = cache.get_value(key)
+	if schema is None:
+		schema = compile_form_schema(request_type, council_code)
+		cache.set_value(key, schema, expires_in_sec=SCHEMA_CACHE_TTL)
+
+	return schema
+
+
+def compile_form_schema(request_type, council_code=None):
+	"""
+	Compile a Request Type's step configuration into a form schema artifact
+
+	Loads the Request Type once and indexes sections by step_code and fields by
+	section_code, so building the tree is linear in the number of rows.
+
+	Returns:
+		dict: {
+			"config": payload served by get_request_type_config,
+			"steps": enabled steps (with council overrides) for get_request_type_steps,
+			"uses_config": False when the Request Type has no step configuration
+		}
+	"""
+	rt_doc = frappe.get_doc("Request Type", request_type)
+
+	sections_by_step = defaultdict(list)
+	for section in rt_doc.get("step_sections") or []:
+		sections_by_step[section.parent_step_code].append(section)
+
+	fields_by_section = defaultdict(list)
+	for field in rt_doc.get("step_fields") or []:
+		fields_by_section[field.parent_section_code].append(field)
+
+	steps = build_enabled_steps(rt_doc, sections_by_step, fields_by_section)
+	if council_code and steps:
+		from councilsonline.api.assessments import apply_council_step_overrides
+		steps = apply_council_step_overrides(steps, rt_doc.name, council_code)
+	steps = sorted(steps, key=lambda x: x.get("step_number", 999))
+
+	return {
+		"config": build_request_type_config(rt_doc, sections_by_step, fields_by_section),
+		"steps": steps,
+		"uses_config": bool(rt_doc.get("step_configs"))
+	}
+
+
+def build_request_type_config(rt_doc, sections_by_step, fields_by_section):
+	"""Build the full (unfiltered) configuration returned to the request wizard"""
+	steps = []
+	for step_config in rt_doc.get("step_configs") or []:
+		step_data = {
+			"step_number": step_config.step_number,
+			"step_title": step_config.step_title,
+			"step_code": step_config.step_code,
+			"step_component": step_config.get("step_component", default="DynamicStepRenderer"),
+			"is_enabled": step_config.get("is_enabled", default=1),
+			"is_required": step_config.get("is_required", default=1),
+			"show_on_review": step_config.get("show_on_review", default=1),
+			"sections": []
+		}
+
+		for section in sections_by_step.get(step_config.step_code, []):
+			section_data = {
+				"section_code": section.section_code,
+				"section_title": section.section_title,
+				"section_type": section.get("section_type", default="Section"),
+				"sequence": section.get("sequence", default=1),
+				"is_enabled": section.get("is_enabled", default=1),
+				"is_required": section.get("is_required", default=1),
+				"depends_on": section.get("depends_on"),
+				"show_on_review": section.get("show_on_review", default=1),
+				"fields": []
+			}
+
+			for field in fields_by_section.get(section.section_code, []):
+				section_data["fields"].append({
+					"field_name": field.field_name,
+					"field_label": field.field_label,
+					"field_type": field.field_type,
+					"is_required": field.get("is_required", default=0),
+					"options": field.get("options"),
+					"description": field.get("description"),
+					"default_value": field.get("default_value"),
+					"depends_on": field.get("depends_on"),
+					"show_on_review": field.get("show_on_review", default=1),
+					"review_label": field.get("review_label"),
+					"parent_section_code": field.get("parent_section_code"),
+					"validation": field.get("validation"),
+					"read_only": field.get("read_only", default=0),
+				})
+
+			step_data["sections"].append(section_data)
+
+		steps.append(step_data)
+
+	return {
+		"name": rt_doc.name,
+		"type_code": rt_doc.type_code,
+		"type_name": rt_doc.type_name,
+		"category": rt_doc.category,
+		"description": rt_doc.get("description", default=""),
+		"base_fee": rt_doc.base_fee,
+		"processing_sla_days": rt_doc.processing_sla_days,
+		"fee_calculation_method": rt_doc.fee_calculation_method,
+		"requires_property": rt_doc.get("requires_property", default=1),
+		"requires_payment": rt_doc.get("requires_payment", default=1),
+		"council_meeting_available": rt_doc.get("council_meeting_available", default=1),
+		"collect_payment": rt_doc.get("collect_payment", default=0),
+		"make_payment": rt_doc.get("make_payment", default=0),
+		"default_response_role": rt_doc.get("default_response_role"),
+		"steps": steps
+	}
+
+
+def build_enabled_steps(rt_doc, sections_by_step, fields_by_section):
+	"""Build the enabled steps and sections used for rendering and step validation"""
+	steps = []
+	for step_config in rt_doc.get("step_configs") or []:
+		if not step_config.is_enabled:
+			continue
+
+		step_data = {
+			"step_number": step_config.step_number,
+			"step_code": step_config.step_code,
+			"step_title": step_config.step_title,
+			"step_component": step_config.step_component or "DynamicStepRenderer",
+			"is_enabled": step_config.is_enabled,
+			"is_required": step_config.is_required,
+			"show_on_review": step_config.show_on_review,
+			"depends_on": step_config.depends_on,
+			"sections": []
+		}
+
+		sections = sorted(
+			sections_by_step.get(step_config.step_code, []),
+			key=lambda s: s.sequence or 0
+		)
+		for section in sections:
+			if not section.is_enabled:
+				continue
+
+			section_data = {
+				"section_code": section.section_code,
+				"section_title": section.section_title,
+				"section_type": section.section_type,
+				"sequence": section.sequence,
+				"is_enabled": section.is_enabled,
+				"is_required": section.is_required,
+				"show_on_review": section.show_on_review,
+				"depends_on": section.depends_on,
+				"fields": []
+			}
+
+			for field in fields_by_section.get(section.section_code, []):
+				section_data["fields"].append({
+					"field_name": field.field_name,
+					"field_label": field.field_label,
+					"field_type": field.field_type,
+					"is_required": field.is_required,
+					"options": field.options,
+					"default_value": field.default_value,
+					"depends_on": field.depends_on,
+					"validation": field.validation,
+					"show_on_review": field.show_on_review,
+					"review_label": field.review_label or field.field_label
+				})
+
+			step_data["sections"].append(section_data)
+
+		steps.append(step_data)
+
+	return steps
@@ -0,0 +1,202 @@
+"""
+Holiday Calendar Service
+Caches each Holiday List as a sorted array of date ordinals, resolves the
+Council's effective calendar (national and regional holidays plus closure
+days) and answers working-day questions with week arithmetic plus a bisect
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+import math
+
+import frappe
+from frappe.utils import flt, getdate
+
+
+CALENDAR_KEY_PREFIX = "councilsonline:holiday_calendar:"
+DEFAULT_LIST_KEY = "councilsonline:holiday_calendar_default"
+
+# Countries whose Holiday List is used, in order, when the Council has none configured
+DEFAULT_HOLIDAY_COUNTRIES = ("Philippines", "New Zealand")
+
+
+def weekdays_through(ordinal):
+	"""
+	Number of Monday-Friday dates from ordinal 1 up to and including ``ordinal``
+
+	date.fromordinal(1) is a Monday, so every block of seven ordinals
+	contains exactly five weekdays.
+	"""
+	weeks, remainder = divmod(ordinal, 7)
+	return weeks * 5 + min(remainder, 5)
+
+
+def nth_weekday(index):
+	"""Ordinal of the ``index``-th weekday counted from ordinal 1 (inverse of weekdays_through)"""
+	weeks, remainder = divmod(index - 1, 5)
+	return weeks * 7 + remainder + 1
+
+
+class HolidayCalendar:
+	"""Working-day arithmetic over weekends plus a fixed set of holidays"""
+
+	def __init__(self, holidays=()):
+		# Only weekday holidays matter; weekends are excluded arithmetically
+		self.holidays = sorted({
+			ordinal for ordinal in holidays if date.fromordinal(ordinal).weekday() < 5
+		})
+
+	def holidays_between(self, start_ordinal, end_ordinal):
+		"""Number of weekday holidays in the inclusive ordinal range"""
+		return bisect_right(self.holidays, end_ordinal) - bisect_left(self.holidays, start_ordinal)
+
+	def is_holiday(self, check_date):
+		ordinal = getdate(check_date).toordinal()
+		index = bisect_left(self.holidays, ordinal)
+		return index < len(self.holidays) and self.holidays[index] == ordinal
+
+	def is_working_day(self, check_date):
+		check_date = getdate(check_date)
+		return check_date.weekday() < 5 and not self.is_holiday(check_date)
+
+	def working_days_between(self, start_date, end_date):
+		"""Working days from start_date to end_date, both inclusive"""
+		start = getdate(start_date).toordinal()
+		end = getdate(end_date).toordinal()
+
+		if start > end:
+			return 0
+
+		weekdays = weekdays_through(end) - weekdays_through(start - 1)
+		return weekdays - self.holidays_between(start, end)
+
+	def add_working_days(self, start_date, days):
+		"""
+		Date that is ``days`` working days after start_date
+
+		Jumps straight to the target weekday, then moves past any holidays that
+		were skipped over; each pass is one bisect, and only runs again if the
+		extension itself crosses more holidays.
+		"""
+		start_date = getdate(start_date)
+		days = math.ceil(flt(days))
+		if days <= 0:
+			return start_date
+
+		start = start_date.toordinal()
+		target = nth_weekday(weekdays_through(start) + days)
+		skipped = self.holidays_between(start + 1, target)
+
+		while skipped:
+			extended = nth_weekday(weekdays_through(target) + skipped)
+			skipped = self.holidays_between(target + 1, extended)
+			target = extended
+
+		return date.fromordinal(target)
+
+
+def get_holiday_ordinals(holiday_list):
+	"""
+	Get the sorted holiday date ordinals of a Holiday List (cached until the list is saved)
+
+	Returns:
+		list: Sorted date ordinals, empty if the list has no holidays
+	"""
+	memo = frappe.local.__dict__.setdefault("holiday_calendar_memo", {})
+	if holiday_list in memo:
+		return memo[holiday_list]
+
+	cache = frappe.cache()
+	ordinals = cache.get_value(CALENDAR_KEY_PREFIX + holiday_list)
+	if ordinals is None:
+		ordinals = sorted({
+			getdate(holiday_date).toordinal()
+			for holiday_date in frappe.get_all(
+				"Holiday",
+				filters={"parent": holiday_list, "parenttype": "Holiday List"},
+				pluck="holiday_date"
+			)
+		})
+		cache.set_value(CALENDAR_KEY_PREFIX + holiday_list, ordinals)
+
+	memo[holiday_list] = ordinals
+	return ordinals
+
+
+def get_default_holiday_list():
+	"""Get the Holiday List used when none is specified (cached until any list is saved)"""
+	cache = frappe.cache()
+	holiday_list = cache.get_value(DEFAULT_LIST_KEY)
+
+	if holiday_list is None:
+		holiday_list = ""
+		for country in DEFAULT_HOLIDAY_COUNTRIES:
+			holiday_list = frappe.db.get_value("Holiday List", {"country": country}, "name") or ""
+			if holiday_list:
+				break
+		cache.set_value(DEFAULT_LIST_KEY, holiday_list)
+
+	return holiday_list or None
+
+
+def get_council_calendar():
+	"""
+	Get the effective working-day calendar of the site's Council (built once per request)
+
+	Combines the Council's national and regional Holiday Lists with its
+	closure periods. Councils without a Holiday List fall back to
+	get_default_holiday_list.
+
+	Returns:
+		HolidayCalendar: The council calendar
+	"""
+	calendar = getattr(frappe.local, "council_calendar", None)
+	if calendar is not None:
+		return calendar
+
+	# Council is a Single, so there is one calendar per site
+	council = frappe.get_cached_doc("Council")
+	holiday_lists = (
+		council.get("holiday_list") or get_default_holiday_list(),
+		council.get("regional_holiday_list")
+	)
+
+	ordinals = []
+	for holiday_list in filter(None, holiday_lists):
+		ordinals.extend(get_holiday_ordinals(holiday_list))
+
+	for closure in council.get("closure_periods") or []:
+		if closure.from_date and closure.to_date:
+			ordinals.extend(range(
+				getdate(closure.from_date).toordinal(),
+				getdate(closure.to_date).toordinal() + 1
+			))
+
+	calendar = HolidayCalendar(ordinals)
+	frappe.local.council_calendar = calendar
+	return calendar
+
+
+def get_holiday_calendar(holiday_list=None):
+	"""
+	Get a working-day calendar
+
+	Args:
+		holiday_list: Holiday List name (optional; defaults to the council calendar)
+
+	Returns:
+		HolidayCalendar: Calendar for the given list, or get_council_calendar()
+	"""
+	if holiday_list:
+		return HolidayCalendar(get_holiday_ordinals(holiday_list))
+	return get_council_calendar()
+
+
+def invalidate_holiday_calendar(doc=None, method=None):
+	"""doc_events hook (on_update/on_trash) for Holiday List and Council"""
+	cache = frappe.cache()
+	frappe.local.council_calendar = None
+	if doc and doc.doctype == "Holiday List":
+		cache.delete_value(CALENDAR_KEY_PREFIX + doc.name)
+		frappe.local.__dict__.get("holiday_calendar_memo", {}).pop(doc.name, None)
+	cache.delete_value(DEFAULT_LIST_KEY)
@@ -0,0 +1,398 @@
+"""
+Household Graph
+Links households, the people listed in them (as head or member) and the
+bank accounts and GCash numbers those people are paid through. Each node
+stores the connected component it belongs to, so "households linked to X"
+and "components with more than N households" are single indexed queries.
+Components are maintained incrementally with union-find: adding a link
+relabels the smaller component into the larger one; removing a link
+re-splits only the affected component
+"""
+
+import re
+
+import frappe
+from frappe.utils import now
+
+from councilsonline.utils.identity_match import normalise
+
+
+INSERT_CHUNK_SIZE = 5000
+
+
+class UnionFind:
+	"""Disjoint sets with path compression and union by size"""
+
+	def __init__(self, items=()):
+		self.parent = {}
+		self.size = {}
+		for item in items:
+			self.add(item)
+
+	def add(self, item):
+		if item not in self.parent:
+			self.parent[item] = item
+			self.size[item] = 1
+
+	def find(self, item):
+		self.add(item)
+		root = item
+		while self.parent[root] != root:
+			root = self.parent[root]
+		while self.parent[item] != root:
+			self.parent[item], item = root, self.parent[item]
+		return root
+
+	def union(self, a, b):
+		root_a, root_b = self.find(a), self.find(b)
+		if root_a == root_b:
+			return root_a
+		if self.size[root_a] < self.size[root_b]:
+			root_a, root_b = root_b, root_a
+		self.parent[root_b] = root_a
+		self.size[root_a] += self.size[root_b]
+		return root_a
+
+	def groups(self):
+		"""{root: [item]}"""
+		groups = {}
+		for item in self.parent:
+			groups.setdefault(self.find(item), []).append(item)
+		return groups
+
+
+# ================================
+# Nodes and edges from source records
+# ================================
+
+def household_node(household):
+	return f"Household::{household}", "Household", household
+
+
+def person_node(user=None, full_name=None, birth_date=None):
+	"""Node of a person: their User, else their normalised name and birth date (None if neither)"""
+	if user:
+		return f"User::{user}", "Person", user
+	name = normalise(full_name)
+	if name and birth_date:
+		return f"Person::{name}::{birth_date}", "Person", name
+	return None
+
+
+def account_node(account_number):
+	number = re.sub(r"\D", "", str(account_number or ""))
+	return (f"Bank Account::{number}", "Bank Account", number) if len(number) >= 6 else None
+
+
+def gcash_node(mobile_number):
+	# 09171234567 and +639171234567 are the same number
+	number = re.sub(r"\D", "", str(mobile_number or ""))[-10:]
+	return (f"GCash::{number}", "GCash", number) if len(number) == 10 else None
+
+
+def add_edge(edges, source, a, b):
+	"""Collect an edge as {source: {(node_a, node_b): (node info a, node info b)}}"""
+	if a and b and a[0] != b[0]:
+		key = tuple(sorted((a[0], b[0])))
+		edges.setdefault(source, {})[key] = (a, b)
+
+
+def get_household_edges(households=None):
+	"""Edges from Household Records: household to head and to each member, per household"""
+	if households is not None and not households:
+		return {}
+
+	condition = "AND {column} IN %(households)s" if households is not None else ""
+	values = {"households": tuple(households or ())}
+	edges = {}
+
+	for name, head in frappe.db.sql(f"""
+		SELECT name, head_of_household FROM `tabHousehold Record`
+		WHERE 1=1 {condition.format(column="name")}
+	""", values):
+		edges.setdefault(f"Household Record::{name}", {})
+		add_edge(edges, f"Household Record::{name}", household_node(name), person_node(head))
+
+	# The head's own ("Self") row is the head, already linked above
+	for row in frappe.db.sql(f"""
+		SELECT parent, member_user, full_name, birth_date FROM `tabHousehold Member`
+		WHERE parenttype = 'Household Record' AND IFNULL(relationship_to_head, '') != 'Self'
+			{condition.format(column="parent")}
+	""", values, as_dict=True):
+		add_edge(
+			edges, f"Household Record::{row.parent}", household_node(row.parent),
+			person_node(row.member_user, row.full_name, row.birth_date)
+		)
+	return edges
+
+
+def get_user_account_edges(users=None):
+	"""Edges from User Bank Account rows: user to account number, per user"""
+	if users is not None and not users:
+		return {}
+
+	condition = "AND parent IN %(users)s" if users is not None else ""
+	edges = {f"User::{user}": {} for user in users or ()}
+	for user, account_number in frappe.db.sql(f"""
+		SELECT parent, account_number FROM `tabUser Bank Account`
+		WHERE parenttype = 'User' {condition}
+	""", {"users": tuple(users or ())}):
+		add_edge(edges, f"User::{user}", person_node(user), account_node(account_number))
+	return edges
+
+
+def get_payout_edges(beneficiaries=None):
+	"""Edges from Benefit Payouts: beneficiary to the accounts and GCash numbers paid, per beneficiary"""
+	if beneficiaries is not None and not beneficiaries:
+		return {}
+
+	condition = "AND beneficiary IN %(beneficiaries)s" if beneficiaries is not None else ""
+	edges = {f"Benefit Payout::{user}": {} for user in beneficiaries or ()}
+	for row in frappe.db.sql(f"""
+		SELECT DISTINCT beneficiary, bank_account_number, gcash_number FROM `tabBenefit Payout`
+		WHERE beneficiary IS NOT NULL {condition}
+	""", {"beneficiaries": tuple(beneficiaries or ())}, as_dict=True):
+		source = f"Benefit Payout::{row.beneficiary}"
+		add_edge(edges, source, person_node(row.beneficiary), account_node(row.bank_account_number))
+		add_edge(edges, source, person_node(row.beneficiary), gcash_node(row.gcash_number))
+	return edges
+
+
+# ================================
+# Incremental maintenance
+# ================================
+
+def ensure_nodes(nodes):
+	"""Insert missing nodes, each as its own component: nodes is {node: (node, type, reference)}"""
+	if not nodes:
+		return
+	existing = set(frappe.get_all("Household Graph Node", filters={"name": ["in", list(nodes)]}, pluck="name"))
+	timestamp = now()
+	rows = [
+		(node, timestamp, timestamp, "Administrator", "Administrator", node, node_type, reference, node)
+		for node, (_, node_type, reference) in nodes.items()
+		if node not in existing
+	]
+	if rows:
+		frappe.db.bulk_insert(
+			"Household Graph Node",
+			fields=["name", "creation", "modified", "owner", "modified_by", "node", "node_type", "reference", "component"],
+			values=rows
+		)
+
+
+def union_components(a, b):
+	"""Merge the components of two nodes, relabelling the smaller one (union by size)"""
+	components = dict(frappe.get_all(
+		"Household Graph Node", filters={"name": ["in", [a, b]]}, fields=["name", "component"], as_list=True
+	))
+	component_a, component_b = components.get(a), components.get(b)
+	if not component_a or not component_b or component_a == component_b:
+		return
+
+	sizes = dict(frappe.db.sql("""
+		SELECT component, COUNT(*) FROM `tabHousehold Graph Node`
+		WHERE component IN %(components)s
+		GROUP BY component
+	""", {"components": (component_a, component_b)}))
+	if sizes.get(component_a, 0) < sizes.get(component_b, 0):
+		component_a, component_b = component_b, component_a
+
+	frappe.db.sql("""
+		UPDATE `tabHousehold Graph Node` SET component = %(keep)s WHERE component = %(merge)s
+	""", {"keep": component_a, "merge": component_b})
+
+
+def split_components(components):
+	"""
+	Recompute components that may have fallen apart after links were removed
+
+	Each component's nodes and edges are loaded and regrouped in memory; the
+	part holding the old label keeps it and the other parts are relabelled.
+	Nodes left without any link are removed.
+	"""
+	for component in components:
+		nodes = frappe.get_all("Household Graph Node", filters={"component": component}, pluck="name")
+		if not nodes:
+			continue
+
+		sets = UnionFind(nodes)
+		linked = set()
+		for node_a, node_b in frappe.db.sql("""
+			SELECT node_a, node_b FROM `tabHousehold Graph Edge` WHERE node_a IN %(nodes)s
+		""", {"nodes": tuple(nodes)}):
+			sets.union(node_a, node_b)
+			linked.update((node_a, node_b))
+
+		isolated = [node for node in nodes if node not in linked]
+		if isolated:
+			frappe.db.delete("Household Graph Node", {"name": ["in", isolated]})
+
+		relabel = {}
+		for members in sets.groups().values():
+			members = [node for node in members if node in linked]
+			if members and component not in members:
+				label = min(members)
+				relabel.update({node: {"component": label} for node in members})
+		if relabel:
+			frappe.db.bulk_update("Household Graph Node", relabel, update_modified=False)
+
+
+def sync_edges(edges):
+	"""
+	Make the stored edges of each source match ``edges`` and update components
+
+	Args:
+		edges: {source: {(node_a, node_b): (node info a, node info b)}}, as
+			returned by the get_*_edges functions; a source with no edges has
+			its stored edges removed
+	"""
+	if not edges:
+		return
+
+	stored = {}
+	for row in frappe.get_all(
+		"Household Graph Edge",
+		filters={"source": ["in", list(edges)]},
+		fields=["name", "node_a", "node_b", "source"]
+	):
+		stored.setdefault(row.source, {})[(row.node_a, row.node_b)] = row.name
+
+	removed, added, nodes = [], [], {}
+	for source, current in edges.items():
+		previous = stored.get(source, {})
+		removed.extend((key, name) for key, name in previous.items() if key not in current)
+		for key, (a, b) in current.items():
+			if key not in previous:
+				added.append((source, key))
+				nodes[a[0]], nodes[b[0]] = a, b
+
+	ensure_nodes(nodes)
+	if added:
+		timestamp = now()
+		frappe.db.bulk_insert(
+			"Household Graph Edge",
+			fields=["name", "creation", "modified", "owner", "modified_by", "node_a", "node_b", "source"],
+			values=[
+				(frappe.generate_hash(length=12), timestamp, timestamp, "Administrator", "Administrator", *key, source)
+				for source, key in added
+			]
+		)
+		for _, (a, b) in added:
+			union_components(a, b)
+
+	if removed:
+		frappe.db.delete("Household Graph Edge", {"name": ["in", [name for _, name in removed]]})
+		affected = {node for key, _ in removed for node in key}
+		split_components(set(frappe.get_all(
+			"Household Graph Node", filters={"name": ["in", list(affected)]}, pluck="component"
+		)))
+
+
+def on_household_update(doc, method=None):
+	"""doc_events hook (on_update) for Household Record: resync its head and member links"""
+	sync_edges(get_household_edges([doc.name]))
+
+
+def on_household_delete(doc, method=None):
+	"""doc_events hook (on_trash) for Household Record"""
+	sync_edges({f"Household Record::{doc.name}": {}})
+
+
+def on_user_update(doc, method=None):
+	"""doc_events hook (on_update) for User: resync the user's bank account links"""
+	sync_edges(get_user_account_edges([doc.name]))
+
+
+def on_payout_update(doc, method=None):
+	"""doc_events hook (on_update, after_delete) for Benefit Payout: resync the beneficiary's payment links"""
+	if doc.beneficiary:
+		sync_edges(get_payout_edges([doc.beneficiary]))
+
+
+def rebuild_household_graph():
+	"""
+	Rebuild every node, edge and component from the source tables
+
+	Returns:
+		dict: {"nodes", "edges", "components"}
+	"""
+	edges = {**get_household_edges(), **get_user_account_edges(), **get_payout_edges()}
+
+	sets = UnionFind()
+	nodes = {}
+	for current in edges.values():
+		for a, b in current.values():
+			nodes[a[0]], nodes[b[0]] = a, b
+			sets.union(a[0], b[0])
+
+	frappe.db.delete("Household Graph Edge")
+	frappe.db.delete("Household Graph Node")
+
+	timestamp = now()
+	node_rows = [
+		(node, timestamp, timestamp, "Administrator", "Administrator", node, node_type, reference, sets.find(node))
+		for node, (_, node_type, reference) in nodes.items()
+	]
+	edge_rows = [
+		(frappe.generate_hash(length=12), timestamp, timestamp, "Administrator", "Administrator", *key, source)
+		for source, current in edges.items()
+		for key in current
+	]
+	for start in range(0, len(node_rows), INSERT_CHUNK_SIZE):
+		frappe.db.bulk_insert(
+			"Household Graph Node",
+			fields=["name", "creation", "modified", "owner", "modified_by", "node", "node_type", "reference", "component"],
+			values=node_rows[start:start + INSERT_CHUNK_SIZE]
+		)
+	for start in range(0, len(edge_rows), INSERT_CHUNK_SIZE):
+		frappe.db.bulk_insert(
+			"Household Graph Edge",
+			fields=["name", "creation", "modified", "owner", "modified_by", "node_a", "node_b", "source"],
+			values=edge_rows[start:start + INSERT_CHUNK_SIZE]
+		)
+
+	return {"nodes": len(node_rows), "edges": len(edge_rows), "components": len(sets.groups())}
+
+
+# ================================
+# Queries
+# ================================
+
+def get_linked_households(node):
+	"""
+	Households in the same component as a node, e.g. "User::juan@example.com"
+
+	Returns:
+		list: Household Record names, excluding the node itself
+	"""
+	component = frappe.db.get_value("Household Graph Node", node, "component")
+	if not component:
+		return []
+	return frappe.get_all(
+		"Household Graph Node",
+		filters={"component": component, "node_type": "Household", "name": ["!=", node]},
+		pluck="reference",
+		order_by="reference asc"
+	)
+
+
+def get_large_components(min_households=2, limit=100):
+	"""
+	Components linking at least ``min_households`` households, largest first
+
+	Returns:
+		list: [{"component", "households", "people", "accounts", "nodes"}]
+	"""
+	return frappe.db.sql("""
+		SELECT component,
+			SUM(node_type = 'Household') AS households,
+			SUM(node_type = 'Person') AS people,
+			SUM(node_type IN ('Bank Account', 'GCash')) AS accounts,
+			COUNT(*) AS nodes
+		FROM `tabHousehold Graph Node`
+		GROUP BY component
+		HAVING SUM(node_type = 'Household') >= %(min_households)s
+		ORDER BY households DESC, nodes DESC
+		LIMIT %(limit)s
+	""", {"min_households": min_households, "limit": limit}, as_dict=True)
@@ -0,0 +1,550 @@
+"""
+Duplicate Identity Detection
+Finds person records (KYC users and household members) that are probably
+the same person despite typos or re-registration under a slightly different
+name. Each record gets a few blocking keys (normalised surname + birth year
++ barangay, phonetic name codes, government ID numbers) persisted in
+Identity Block Key; only records sharing a key are compared, and pairs whose
+similarity reaches MATCH_THRESHOLD are kept as Identity Match Candidates.
+The index is updated per record on KYC and household changes and can be
+rebuilt for the whole population
+"""
+
+import hashlib
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+import frappe
+from frappe.utils import getdate, now
+
+
+MATCH_THRESHOLD = 0.8
+
+# Blocks larger than this are too unspecific to compare pairwise (e.g. a
+# very common surname in one barangay and year); they are skipped by both the
+# incremental and the full index so the two agree on which pairs exist
+MAX_BLOCK_SIZE = 200
+
+# Similarity weights of name, birth date and barangay agreement
+NAME_WEIGHT = 0.55
+BIRTH_WEIGHT = 0.30
+PLACE_WEIGHT = 0.15
+
+# Surname particles kept with the surname ("Dela Cruz") and suffixes dropped
+SURNAME_PARTICLES = {"DE", "DEL", "DELA", "DELAS", "DELOS", "LA", "LAS", "LOS", "SAN", "STA", "STO", "Y"}
+NAME_SUFFIXES = {"JR", "SR", "II", "III", "IV"}
+
+SOUNDEX_CODES = {
+	**dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+	"L": "4", **dict.fromkeys("MN", "5"), "R": "6"
+}
+
+INSERT_CHUNK_SIZE = 5000
+
+
+def normalise(text):
+	"""Upper-case ASCII letters and single spaces only (accents and punctuation dropped)"""
+	text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+	return " ".join(re.sub(r"[^A-Z ]", " ", text.upper()).split())
+
+
+def soundex(word):
+	"""American Soundex code of a word, e.g. soundex("Robert") == "R163"; empty for no letters"""
+	word = normalise(word).replace(" ", "")
+	if not word:
+		return ""
+
+	code = word[0]
+	previous = SOUNDEX_CODES.get(word[0], "")
+	for letter in word[1:]:
+		digit = SOUNDEX_CODES.get(letter, "")
+		if digit and digit != previous:
+			code += digit
+			if len(code) == 4:
+				break
+		# H and W do not separate letters with the same code; vowels do
+		if letter not in "HW":
+			previous = digit
+	return code.ljust(4, "0")
+
+
+def split_full_name(full_name):
+	"""
+	Split a full name into (first name, surname), keeping surname particles
+
+	e.g. "Juan Ma. dela Cruz Jr." -> ("JUAN", "DELACRUZ")
+	"""
+	tokens = [token for token in normalise(full_name).split() if token not in NAME_SUFFIXES]
+	if not tokens:
+		return "", ""
+	if len(tokens) == 1:
+		return "", tokens[0]
+
+	start = len(tokens) - 1
+	while start > 1 and tokens[start - 1] in SURNAME_PARTICLES:
+		start -= 1
+	return tokens[0], "".join(tokens[start:])
+
+
+def digits(value):
+	return re.sub(r"\D", "", str(value or ""))
+
+
+def make_identity(identity_type, record, person, first_name, surname, full_name, birth_date,
+		barangay, household=None, philsys_id=None, sss_number=None):
+	"""
+	A person record as compared by the detector
+
+	Args:
+		identity_type: "User" or "Household Member"
+		record: User or Household Member row name
+		person: User the record belongs to, if known (records of the same user are never matched)
+	"""
+	first_name = normalise(first_name).split(" ")[0]
+	surname = normalise(surname).replace(" ", "")
+	birth_date = getdate(birth_date) if birth_date else None
+	return frappe._dict(
+		identity=f"{identity_type}::{record}",
+		identity_type=identity_type,
+		record=record,
+		person=person,
+		household=household,
+		full_name=full_name,
+		first_name=first_name,
+		surname=surname,
+		name_key=f"{first_name} {surname}".strip(),
+		birth_date=birth_date,
+		barangay=normalise(barangay),
+		philsys_id=digits(philsys_id),
+		sss_number=digits(sss_number)
+	)
+
+
+def load_user_identities(users=None):
+	"""
+	Identities of users with a KYC record, with their household's barangay
+
+	Args:
+		users: Limit to these users (optional; all KYC users when omitted)
+
+	Returns:
+		list: identities, one per user
+	"""
+	if users is not None and not users:
+		return []
+
+	condition = "AND k.user IN %(users)s" if users is not None else ""
+	identities = {}
+	for row in frappe.db.sql(f"""
+		SELECT k.user, u.first_name, u.last_name, u.full_name, u.birth_date,
+			k.philsys_id, k.sss_number, h.name AS household, h.barangay
+		FROM `tabUser Identity Verification` k
+		INNER JOIN `tabUser` u ON u.name = k.user
+		LEFT JOIN `tabHousehold Record` h ON h.head_of_household = k.user
+		WHERE k.verification_status != 'Rejected' {condition}
+		ORDER BY k.modified DESC
+	""", {"users": tuple(users or ())}, as_dict=True):
+		if row.user not in identities:
+			identities[row.user] = make_identity(
+				"User", row.user, row.user, row.first_name, row.last_name, row.full_name,
+				row.birth_date, row.barangay, row.household, row.philsys_id, row.sss_number
+			)
+	return list(identities.values())
+
+
+def load_member_identities(households=None, members=None):
+	"""
+	Identities of household members, with the household's barangay
+
+	A member row is attributed to its linked user, or to the head of
+	household when it is the head's own ("Self") row.
+
+	Args:
+		households: Limit to members of these Household Records (optional)
+		members: Limit to these Household Member rows (optional)
+	"""
+	if households is not None and not households or members is not None and not members:
+		return []
+
+	conditions = []
+	if households is not None:
+		conditions.append("AND m.parent IN %(households)s")
+	if members is not None:
+		conditions.append("AND m.name IN %(members)s")
+
+	identities = []
+	for row in frappe.db.sql(f"""
+		SELECT m.name, m.parent, m.full_name, m.birth_date, m.member_user, m.relationship_to_head,
+			h.head_of_household, h.barangay
+		FROM `tabHousehold Member` m
+		INNER JOIN `tabHousehold Record` h ON h.name = m.parent
+		WHERE m.parenttype = 'Household Record' {" ".join(conditions)}
+	""", {"households": tuple(households or ()), "members": tuple(members or ())}, as_dict=True):
+		first_name, surname = split_full_name(row.full_name)
+		person = row.member_user or (row.head_of_household if row.relationship_to_head == "Self" else None)
+		identities.append(make_identity(
+			"Household Member", row.name, person, first_name, surname, row.full_name,
+			row.birth_date, row.barangay, row.parent
+		))
+	return identities
+
+
+def load_identities(identity_ids):
+	"""Identities for "<type>::<record>" ids: {identity: identity}"""
+	users, members = [], []
+	for identity in identity_ids:
+		identity_type, record = identity.split("::", 1)
+		(users if identity_type == "User" else members).append(record)
+
+	loaded = load_user_identities(users) + load_member_identities(members=members)
+	return {identity.identity: identity for identity in loaded}
+
+
+def get_blocking_keys(identity):
+	"""
+	Blocking keys of an identity; records sharing any key are compared
+
+	- surname + birth year + barangay catches typos in given names
+	- phonetic surname and first name + birth year catches spelling variants
+	  across barangays (re-registration after moving)
+	- phonetic names + barangay catches a mistyped birth year
+	- PhilSys and SSS numbers catch reuse of an ID under another name
+	"""
+	keys = set()
+	year = identity.birth_date.year if identity.birth_date else None
+	surname_code, first_code = soundex(identity.surname), soundex(identity.first_name)
+
+	if identity.surname and year and identity.barangay:
+		keys.add(f"SYB:{identity.surname}:{year}:{identity.barangay}")
+	if surname_code and first_code and year:
+		keys.add(f"PNY:{surname_code}:{first_code}:{year}")
+	if surname_code and first_code and identity.barangay:
+		keys.add(f"PNB:{surname_code}:{first_code}:{identity.barangay}")
+	if identity.philsys_id:
+		keys.add(f"PSN:{identity.philsys_id}")
+	if identity.sss_number:
+		keys.add(f"SSS:{identity.sss_number}")
+	return keys
+
+
+def birth_date_similarity(a, b):
+	"""1 for the same date, 0.7 for a likely typo in the same year, 0.5 when unknown, else 0"""
+	if not a or not b:
+		return 0.5
+	if a == b:
+		return 1.0
+	if a.year == b.year and (a.month == b.month or a.day == b.day or (a.month, a.day) == (b.day, b.month)):
+		return 0.7
+	return 0.0
+
+
+def similarity(a, b):
+	"""
+	Similarity of two identities in [0, 1] and the reasons behind it
+
+	Returns:
+		tuple: (score, [reason])
+	"""
+	if a.philsys_id and a.philsys_id == b.philsys_id:
+		return 1.0, [f"Same PhilSys ID {a.philsys_id}"]
+	if a.sss_number and a.sss_number == b.sss_number:
+		return 1.0, [f"Same SSS number {a.sss_number}"]
+
+	name = SequenceMatcher(None, a.name_key, b.name_key).ratio()
+	birth = birth_date_similarity(a.birth_date, b.birth_date)
+	place = 0.5 if not a.barangay or not b.barangay else float(a.barangay == b.barangay)
+
+	reasons = [f"Names {name * 100:.0f}% similar"]
+	if birth == 1:
+		reasons.append("Same birth date")
+	elif birth == 0.7:
+		reasons.append("Birth dates differ by a likely typo")
+	if place == 1:
+		reasons.append("Same barangay")
+
+	return NAME_WEIGHT * name + BIRTH_WEIGHT * birth + PLACE_WEIGHT * place, reasons
+
+
+def is_candidate_pair(a, b):
+	return a.identity != b.identity and not (a.person and a.person == b.person)
+
+
+def get_pair_name(a, b):
+	"""Stable Identity Match Candidate name of an identity pair"""
+	first, second = sorted((a, b))
+	return hashlib.sha1(f"{first}|{second}".encode()).hexdigest()[:16]
+
+
+def split_oversized_blocks(blocks):
+	"""
+	Drop blocks with more than ``MAX_BLOCK_SIZE`` members
+
+	Args:
+		blocks: {blocking_key: members}
+
+	Returns:
+		tuple: (blocks within the cap, number of blocks dropped)
+	"""
+	kept = {key: members for key, members in blocks.items() if len(members) <= MAX_BLOCK_SIZE}
+	return kept, len(blocks) - len(kept)
+
+
+def score_pair(pairs, a, b, key):
+	"""Score a pair once and keep it in ``pairs`` if it reaches the threshold"""
+	if not is_candidate_pair(a, b):
+		return
+	name = get_pair_name(a.identity, b.identity)
+	if name in pairs:
+		return
+
+	score, reasons = similarity(a, b)
+	if score >= MATCH_THRESHOLD:
+		first, second = sorted((a, b), key=lambda identity: identity.identity)
+		pairs[name] = (first, second, score, reasons, key)
+
+
+def write_block_keys(identities):
+	"""Replace the stored blocking keys of identities with their current keys"""
+	frappe.db.delete("Identity Block Key", {"identity": ["in", [identity.identity for identity in identities]]})
+
+	timestamp = now()
+	rows = [
+		(frappe.generate_hash(length=12), timestamp, timestamp, "Administrator", "Administrator",
+			identity.identity, identity.identity_type, identity.record, key)
+		for identity in identities
+		for key in get_blocking_keys(identity)
+	]
+	for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+		frappe.db.bulk_insert(
+			"Identity Block Key",
+			fields=["name", "creation", "modified", "owner", "modified_by", "identity", "identity_type", "record", "blocking_key"],
+			values=rows[start:start + INSERT_CHUNK_SIZE]
+		)
+
+
+def upsert_candidates(pairs):
+	"""
+	Store scored pairs as Identity Match Candidates
+
+	Existing candidates are rescored in place so review outcomes are kept;
+	new pairs are inserted as Open.
+	"""
+	if not pairs:
+		return
+
+	timestamp = now()
+	existing = set(frappe.get_all("Identity Match Candidate", filters={"name": ["in", list(pairs)]}, pluck="name"))
+	if existing:
+		frappe.db.bulk_update(
+			"Identity Match Candidate",
+			{
+				name: {
+					"similarity": score * 100,
+					"match_reasons": "\n".join(reasons),
+					"blocking_key": key,
+					"last_scored": timestamp
+				}
+				for name, (a, b, score, reasons, key) in pairs.items()
+				if name in existing
+			},
+			update_modified=False
+		)
+
+	rows = [
+		(
+			name, timestamp, timestamp, "Administrator", "Administrator", "Open", score * 100, key, timestamp,
+			a.identity, a.full_name, a.person, a.household, b.identity, b.full_name, b.person, b.household,
+			"\n".join(reasons)
+		)
+		for name, (a, b, score, reasons, key) in pairs.items()
+		if name not in existing
+	]
+	for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+		frappe.db.bulk_insert(
+			"Identity Match Candidate",
+			fields=[
+				"name", "creation", "modified", "owner", "modified_by", "status", "similarity", "blocking_key",
+				"last_scored", "identity_a", "full_name_a", "user_a", "household_a",
+				"identity_b", "full_name_b", "user_b", "household_b", "match_reasons"
+			],
+			values=rows[start:start + INSERT_CHUNK_SIZE]
+		)
+
+
+def delete_stale_candidates(identity_ids, keep):
+	"""
+	Drop Open candidates that no longer match; reviewed pairs are kept
+
+	Args:
+		identity_ids: Identities whose candidates were rescored (None for all)
+		keep: Candidate names found by the rescoring
+	"""
+	if identity_ids is None:
+		stale = set(frappe.get_all("Identity Match Candidate", filters={"status": "Open"}, pluck="name"))
+	else:
+		stale = set()
+		for field in ("identity_a", "identity_b"):
+			stale.update(frappe.get_all(
+				"Identity Match Candidate",
+				filters={"status": "Open", field: ["in", list(identity_ids)]},
+				pluck="name"
+			))
+
+	stale -= set(keep)
+	if stale:
+		frappe.db.delete("Identity Match Candidate", {"name": ["in", list(stale)]})
+
+
+def index_identities(identities):
+	"""
+	Update the index for a few identities and rescore them against their blocks
+
+	Costs a handful of queries regardless of population size: the identities'
+	keys are rewritten, records sharing a key are fetched through the key
+	index, and only those are compared. Oversized blocks are skipped exactly
+	as in ``rebuild_identity_index``.
+
+	Returns:
+		list: names of the identities' current candidates
+	"""
+	if not identities:
+		return []
+
+	write_block_keys(identities)
+
+	keys = {identity.identity: get_blocking_keys(identity) for identity in identities}
+	all_keys = set().union(*keys.values())
+	neighbours = {}
+	if all_keys:
+		for row in frappe.get_all(
+			"Identity Block Key",
+			filters={"blocking_key": ["in", list(all_keys)]},
+			fields=["identity", "blocking_key"]
+		):
+			neighbours.setdefault(row.blocking_key, set()).add(row.identity)
+	neighbours, _ = split_oversized_blocks(neighbours)
+
+	known = {identity.identity: identity for identity in identities}
+	others = {identity for members in neighbours.values() for identity in members} - set(known)
+	known.update(load_identities(others))
+
+	pairs = {}
+	for identity in identities:
+		for key in sorted(keys[identity.identity]):
+			for other in sorted(neighbours.get(key, ())):
+				if other in known:
+					score_pair(pairs, identity, known[other], key)
+
+	upsert_candidates(pairs)
+	delete_stale_candidates([identity.identity for identity in identities], keep=pairs)
+	return list(pairs)
+
+
+def index_user(user):
+	"""Reindex a KYC user's identity"""
+	return index_identities(load_user_identities([user]))
+
+
+def remove_identities(identity_ids):
+	"""Drop identities from the index along with their Open candidates"""
+	if identity_ids:
+		frappe.db.delete("Identity Block Key", {"identity": ["in", list(identity_ids)]})
+		delete_stale_candidates(identity_ids, keep=())
+
+
+def on_kyc_update(doc, method=None):
+	"""doc_events hook (on_update) for User Identity Verification"""
+	if doc.user:
+		index_user(doc.user)
+
+
+def on_household_update(doc, method=None):
+	"""doc_events hook (on_update) for Household Record: reindex its members and its head"""
+	members = load_member_identities(households=[doc.name])
+
+	before = doc.get_doc_before_save()
+	if before:
+		current = {member.record for member in members}
+		remove_identities([
+			f"Household Member::{member.name}"
+			for member in before.get("household_members") or []
+			if member.name not in current
+		])
+
+	identities = members + (load_user_identities([doc.head_of_household]) if doc.head_of_household else [])
+	index_identities(identities)
+
+
+def on_household_delete(doc, method=None):
+	"""doc_events hook (on_trash) for Household Record"""
+	remove_identities([f"Household Member::{member.name}" for member in doc.get("household_members") or []])
+
+
+def rebuild_identity_index():
+	"""
+	Rebuild blocking keys and candidates for the whole population
+
+	All identities are loaded with two queries, grouped into blocks in
+	memory and compared only within their blocks; oversized blocks are
+	skipped. Review outcomes of existing candidates are kept.
+
+	Returns:
+		dict: {"identities", "blocks", "skipped_blocks", "candidates"}
+	"""
+	identities = load_user_identities() + load_member_identities()
+
+	frappe.db.delete("Identity Block Key")
+	write_block_keys(identities)
+
+	blocks = {}
+	for identity in identities:
+		for key in get_blocking_keys(identity):
+			blocks.setdefault(key, []).append(identity)
+
+	pairs = {}
+	scored, skipped = split_oversized_blocks(blocks)
+	for key, members in scored.items():
+		for index, a in enumerate(members):
+			for b in members[index + 1:]:
+				score_pair(pairs, a, b, key)
+
+	upsert_candidates(pairs)
+	delete_stale_candidates(None, keep=pairs)
+
+	return {
+		"identities": len(identities),
+		"blocks": len(blocks),
+		"skipped_blocks": skipped,
+		"candidates": len(pairs)
+	}
+
+
+def get_identity_candidates(user):
+	"""
+	Suspected duplicates of a user's KYC identity and household rows, best first
+
+	Returns:
+		list: Identity Match Candidate rows
+	"""
+	identities = [f"User::{user}"]
+	identities += [
+		f"Household Member::{name}"
+		for name in frappe.get_all(
+			"Household Member", filters={"parenttype": "Household Record", "member_user": user}, pluck="name"
+		)
+	]
+
+	fields = [
+		"name", "status", "similarity", "match_reasons", "identity_a", "full_name_a", "user_a", "household_a",
+		"identity_b", "full_name_b", "user_b", "household_b"
+	]
+	candidates = {}
+	for field in ("identity_a", "identity_b"):
+		for row in frappe.get_all(
+			"Identity Match Candidate",
+			filters={field: ["in", identities], "status": ["!=", "Not Duplicate"]},
+			fields=fields
+		):
+			candidates[row.name] = row
+	return sorted(candidates.values(), key=lambda row: -row.similarity)
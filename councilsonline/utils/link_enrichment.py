@@ -0,0 +1,83 @@
+"""
+Link Field Enrichment Utility
+Resolves Link field values for whole result sets with one query per doctype
+"""
+
+import frappe
+
+
+def _get_memo():
+	"""Request-scoped memo of resolved link values, reset with frappe.local"""
+	if not hasattr(frappe.local, "link_enrichment_memo"):
+		frappe.local.link_enrichment_memo = {}
+	return frappe.local.link_enrichment_memo
+
+
+def get_linked_values(doctype, names, fields):
+	"""
+	Fetch fields for many records of a doctype with a single IN (...) query
+
+	Values already resolved earlier in the same request are served from the
+	memo, so only unseen names hit the database.
+
+	Args:
+		doctype: Target doctype (e.g. "User", "Council")
+		names: Iterable of record names (falsy values are ignored)
+		fields: List of fields to fetch
+
+	Returns:
+		dict: {name: frappe._dict of fields} for every name that exists
+	"""
+	fields = tuple(fields)
+	memo = _get_memo().setdefault((doctype, fields), {})
+
+	wanted = {name for name in names if name}
+	missing = [name for name in wanted if name not in memo]
+
+	if missing:
+		rows = frappe.get_all(
+			doctype,
+			filters={"name": ["in", missing]},
+			fields=["name", *fields]
+		)
+		for row in rows:
+			memo[row.name] = row
+
+		# Remember names that do not exist so they are not queried again
+		for name in missing:
+			memo.setdefault(name, None)
+
+	return {name: memo[name] for name in wanted if memo.get(name)}
+
+
+def enrich_links(rows, link_field, doctype, field_map):
+	"""
+	Add values from a linked doctype to every row of a result set
+
+	Args:
+		rows: List of dicts (e.g. from frappe.get_all)
+		link_field: Key in each row holding the linked record name
+		doctype: Doctype the link points to
+		field_map: {output_key: source_field} to copy onto each row
+
+	Returns:
+		list: The same rows, enriched in place
+
+	Usage:
+		enrich_links(requests, "council", "Council", {"council_name": "council_name"})
+	"""
+	linked = get_linked_values(
+		doctype,
+		(row.get(link_field) for row in rows),
+		sorted(set(field_map.values()))
+	)
+
+	for row in rows:
+		values = linked.get(row.get(link_field))
+		if not values:
+			continue
+		for output_key, source_field in field_map.items():
+			row[output_key] = values.get(source_field)
+
+	return rows
+
@@ -0,0 +1,187 @@
+"""
+Sequence Number Allocator
+Hands out naming-series numbers from an atomic Redis counter, in blocks per
+worker, with a high-water mark persisted ahead to tabSeries
+"""
+
+import threading
+
+import frappe
+import redis
+from frappe.utils import cint, nowdate
+
+
+SEQUENCE_KEY_PREFIX = "councilsonline:sequence:"
+PERSIST_STRIDE = 100  # Numbers covered by each tabSeries write
+
+# Process-local blocks of reserved numbers: {(site, series): [next, last]}
+_reserved_blocks = {}
+_reserved_lock = threading.Lock()
+
+
+def next_series_name(prefix, digits=5, block_size=None, seed=None):
+	"""
+	Get the next name for a naming series, e.g. next_series_name("DRAFT-2025-", 4)
+
+	The series key is the prefix itself, matching frappe.model.naming so
+	existing tabSeries counters carry over.
+
+	Args:
+		prefix: Series prefix (also the sequence key)
+		digits: Zero-padding width of the number
+		block_size: Numbers reserved per worker at a time (defaults to the
+			``sequence_block_size`` site config, else 1; blocks larger than 1
+			leave gaps and numbers are not strictly in creation order)
+		seed: Optional callable returning the current value when the series is new
+
+	Returns:
+		str: The prefixed, zero-padded name
+	"""
+	if block_size is None:
+		block_size = cint(frappe.conf.get("sequence_block_size")) or 1
+	return f"{prefix}{next_value(prefix, block_size, seed):0{digits}d}"
+
+
+def next_value(series, block_size=1, seed=None):
+	"""
+	Get the next number of a series
+
+	Numbers are served from this worker's reserved block; a new block is
+	reserved with a single atomic INCRBY when the current one is used up.
+	"""
+	key = (frappe.local.site, series)
+
+	with _reserved_lock:
+		block = _reserved_blocks.get(key)
+		if block and block[0] <= block[1]:
+			value = block[0]
+			block[0] += 1
+			return value
+
+		first, last = reserve_block(series, max(1, int(block_size)), seed)
+		_reserved_blocks[key] = [first + 1, last]
+		return first
+
+
+def reserve_block(series, size, seed=None):
+	"""
+	Atomically reserve ``size`` consecutive numbers of a series
+
+	The Redis counter is initialised from tabSeries (or ``seed``) on first use.
+	tabSeries is kept at or above every number handed out, so the series
+	survives a Redis flush, but it is written ahead in strides of
+	``sequence_persist_stride`` (default PERSIST_STRIDE) numbers: its row is
+	locked by one allocation per stride instead of by every allocation. After
+	a Redis flush, numbering resumes from the persisted mark, leaving a gap of
+	less than one stride. INCRBY is not undone when the caller's transaction
+	rolls back, so a mark written in a rolled-back transaction is written
+	again and committed on its own.
+
+	Returns:
+		tuple: (first, last) numbers of the reserved block
+	"""
+	cache = frappe.cache()
+	redis_key = cache.make_key(SEQUENCE_KEY_PREFIX + series)
+
+	# The key is already prefixed; RedisWrapper.exists would prefix it again
+	initialised = False
+	if not redis.Redis.exists(cache, redis_key):
+		current = get_persisted_value(series)
+		if current is None and seed:
+			current = seed()
+		# Only the first worker to get here initialises the counter
+		initialised = bool(cache.set(redis_key, int(current or 0), nx=True))
+
+	last = cache.incrby(redis_key, size)
+	first = last - size + 1
+
+	stride = cint(frappe.conf.get("sequence_persist_stride")) or PERSIST_STRIDE
+	if initialised or (last - 1) // stride != (first - 2) // stride:
+		# The block reaches past the persisted mark: persist the end of its stride
+		mark = ((last - 1) // stride + 1) * stride
+		persist_high_water_mark(series, mark)
+		frappe.db.after_rollback.add(lambda: repersist_high_water_mark(series, mark))
+
+	return first, last
+
+
+def get_persisted_value(series):
+	"""Get the current value of a series from tabSeries, or None if it does not exist"""
+	result = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s", series)
+	return result[0][0] if result else None
+
+
+def persist_high_water_mark(series, value):
+	"""Record the highest reserved number in tabSeries (never moves backwards)"""
+	frappe.db.sql("""
+		INSERT INTO `tabSeries` (`name`, `current`)
+		VALUES (%(series)s, %(value)s)
+		ON DUPLICATE KEY UPDATE `current` = GREATEST(`current`, VALUES(`current`))
+	""", {"series": series, "value": value})
+
+
+def repersist_high_water_mark(series, value):
+	"""after_rollback callback: write back a mark lost with the rolled-back transaction"""
+	persist_high_water_mark(series, value)
+	frappe.db.commit()
+
+
+def next_db_series_values(series_list):
+	"""
+	Take the next tabSeries number of many series at once (one upsert and one read)
+
+	For series named by frappe.model.naming, e.g. per-record prefixes like
+	"ELIG-{request}-" that are too many to keep Redis counters for.
+
+	Args:
+		series_list: Series keys; each is incremented once
+
+	Returns:
+		dict: {series: number taken}
+	"""
+	series_list = list(dict.fromkeys(series_list))
+	if not series_list:
+		return {}
+
+	frappe.db.sql(f"""
+		INSERT INTO `tabSeries` (`name`, `current`)
+		VALUES {", ".join(["(%s, 1)"] * len(series_list))}
+		ON DUPLICATE KEY UPDATE `current` = `current` + 1
+	""", series_list)
+
+	return dict(frappe.db.sql(
+		"SELECT `name`, `current` FROM `tabSeries` WHERE `name` IN %(series)s",
+		{"series": tuple(series_list)}
+	))
+
+
+def seed_db_series(series, seed):
+	"""Create the tabSeries row of a series from ``seed()`` if it does not exist yet"""
+	if get_persisted_value(series) is None:
+		# Concurrent seeders insert the same value; the first one wins
+		frappe.db.sql(
+			"INSERT IGNORE INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)",
+			(series, cint(seed()))
+		)
+
+
+def reserve_db_series(series, size):
+	"""
+	Take ``size`` consecutive tabSeries numbers of one series (one upsert and one read)
+
+	Returns:
+		tuple: (first, last) numbers taken
+	"""
+	frappe.db.sql("""
+		INSERT INTO `tabSeries` (`name`, `current`)
+		VALUES (%(series)s, %(size)s)
+		ON DUPLICATE KEY UPDATE `current` = `current` + %(size)s
+	""", {"series": series, "size": size})
+
+	last = cint(get_persisted_value(series))
+	return last - size + 1, last
+
+
+def get_year():
+	"""Current year as used by the YYYY part of naming series"""
+	return nowdate()[:4]
@@ -0,0 +1,110 @@
+"""
+Appointment Slot Holds
+Short-lived reservations of a Council Team time slot in Redis. A hold claims
+each fixed-size cell the slot covers with SET NX, so only overlapping slots
+contend with each other; bookings are confirmed against a hold instead of
+locking the whole team
+"""
+
+from datetime import timedelta
+
+import frappe
+from frappe.utils import get_datetime
+
+
+HOLD_KEY_PREFIX = "councilsonline:slot_hold:"
+HOLD_TTL = 5 * 60  # Seconds a client has to confirm a held slot
+CELL_MINUTES = 5
+
+
+def get_cells(start, end):
+	"""Cell start times covering [start, end), on CELL_MINUTES boundaries"""
+	start = get_datetime(start).replace(second=0, microsecond=0)
+	cell = start - timedelta(minutes=start.minute % CELL_MINUTES)
+	end = get_datetime(end)
+
+	cells = []
+	while cell < end:
+		cells.append(cell)
+		cell += timedelta(minutes=CELL_MINUTES)
+	return cells
+
+
+def get_cell_key(team, cell):
+	return frappe.cache().make_key(f"{HOLD_KEY_PREFIX}{team}:{cell:%Y%m%d%H%M}")
+
+
+def get_hold_key(token):
+	return f"{HOLD_KEY_PREFIX}token:{token}"
+
+
+def acquire_slot_hold(team, start, end, user=None, ttl=HOLD_TTL):
+	"""
+	Hold a team's slot for ``ttl`` seconds
+
+	Cells are claimed in time order with SET NX; if any cell is already held,
+	the cells claimed so far are released and nothing is held.
+
+	Returns:
+		str: Hold token, or None if any part of the slot is held by someone else
+	"""
+	cache = frappe.cache()
+	token = frappe.generate_hash(length=16)
+
+	claimed = []
+	for cell in get_cells(start, end):
+		key = get_cell_key(team, cell)
+		if not cache.set(key, token, nx=True, ex=ttl):
+			release_cells(claimed, token)
+			return None
+		claimed.append(key)
+
+	cache.set_value(get_hold_key(token), {
+		"team": team,
+		"start": get_datetime(start).isoformat(),
+		"end": get_datetime(end).isoformat(),
+		"user": user or frappe.session.user,
+		"cells": claimed
+	}, expires_in_sec=ttl)
+
+	return token
+
+
+def get_slot_hold(token):
+	"""
+	Get a live hold
+
+	Returns:
+		dict: {"team", "start", "end", "user", "cells"}, or None if the hold has
+		expired or any of its cells has been taken over
+	"""
+	if not token:
+		return None
+
+	cache = frappe.cache()
+	hold = cache.get_value(get_hold_key(token))
+	if not hold:
+		return None
+
+	owned = [cache.get(key) for key in hold["cells"]]
+	if any(value != token.encode() for value in owned):
+		return None
+	return hold
+
+
+def release_slot_hold(token):
+	"""Release a hold; cells already claimed by another hold are left alone"""
+	cache = frappe.cache()
+	hold = cache.get_value(get_hold_key(token))
+	if not hold:
+		return
+
+	release_cells(hold["cells"], token)
+	cache.delete_value(get_hold_key(token))
+
+
+def release_cells(keys, token):
+	cache = frappe.cache()
+	for key in keys:
+		if cache.get(key) == token.encode():
+			cache.delete(key)
@@ -0,0 +1,258 @@
+"""
+Statutory Clock Metrics
+Shared clock calculations, and the scheduled batch that refreshes working-day
+metrics and overdue flags for every open application without saving documents
+"""
+
+import frappe
+from frappe.utils import add_days, getdate, now_datetime
+
+from councilsonline.utils.holiday_calendar import get_holiday_calendar
+
+
+CLOSED_PROJECT_STATUSES = ("Completed", "Cancelled")
+DEFAULT_SLA_DAYS = 20
+UPDATE_CHUNK_SIZE = 500
+
+
+def merge_exclusion_periods(periods, started_date=None, as_of=None):
+	"""
+	Merge clock exclusion periods into disjoint, sorted date ranges
+
+	Overlapping or adjacent periods (e.g. an RFI and a s92 hold running together)
+	collapse into one range, so no day is excluded twice. Open periods run to
+	as_of, and ranges are clipped to [started_date, as_of].
+
+	Args:
+		periods: Iterable of (started_date, ended_date) pairs; ended_date may be None
+		started_date: Clock start (optional lower bound)
+		as_of: Date to measure to (defaults to today)
+
+	Returns:
+		list: [(start_date, end_date)] inclusive, non-overlapping, in order
+	"""
+	as_of = getdate(as_of or now_datetime())
+	lower = getdate(started_date) if started_date else None
+
+	ranges = []
+	for period_start, period_end in periods:
+		if not period_start:
+			continue
+		start = getdate(period_start)
+		end = min(getdate(period_end), as_of) if period_end else as_of
+		if lower and start < lower:
+			start = lower
+		if start <= end:
+			ranges.append((start, end))
+
+	merged = []
+	for start, end in sorted(ranges):
+		if merged and start <= add_days(merged[-1][1], 1):
+			if end > merged[-1][1]:
+				merged[-1] = (merged[-1][0], end)
+		else:
+			merged.append((start, end))
+
+	return merged
+
+
+def count_excluded_days(merged, calendar):
+	"""Working days covered by merged exclusion ranges (each day counted once)"""
+	return sum(calendar.working_days_between(start, end) for start, end in merged)
+
+
+def get_statutory_deadline(started_date, clock_days, merged, calendar):
+	"""
+	Working-day statutory deadline: the date the clock reaches clock_days
+
+	Walks the merged exclusion ranges once, spending the clock on the working
+	days between them. An open exclusion is treated as resuming after as_of.
+	"""
+	cursor = getdate(started_date)
+	remaining = clock_days
+
+	for start, end in merged:
+		if end < cursor:
+			continue
+		available = calendar.working_days_between(cursor, add_days(start, -1))
+		if available >= remaining:
+			break
+		remaining -= available
+		cursor = add_days(end, 1)
+
+	# The start day counts as the first working day of the clock
+	return calendar.add_working_days(add_days(cursor, -1), remaining)
+
+
+def get_clock_metrics(started_date, clock_days, exclusions=(), as_of=None, calendar=None):
+	"""
+	Calculate statutory clock metrics for a running clock
+
+	Args:
+		started_date: Clock start date/datetime
+		clock_days: Statutory timeframe in working days
+		exclusions: (started_date, ended_date) pairs of clock exclusion periods
+		as_of: Date to measure to (defaults to now)
+		calendar: HolidayCalendar to use (defaults to the council calendar)
+
+	Returns:
+		dict: working_days_elapsed, working_days_remaining, statutory_deadline, total_days_excluded
+	"""
+	calendar = calendar or get_holiday_calendar()
+	as_of = as_of or now_datetime()
+
+	merged = merge_exclusion_periods(exclusions, started_date, as_of)
+	total_excluded = count_excluded_days(merged, calendar)
+	gross_days = calendar.working_days_between(started_date, as_of)
+	elapsed = max(0, gross_days - total_excluded)
+
+	return {
+		"working_days_elapsed": elapsed,
+		"working_days_remaining": max(0, clock_days - elapsed),
+		"statutory_deadline": get_statutory_deadline(started_date, clock_days, merged, calendar),
+		"total_days_excluded": total_excluded
+	}
+
+
+def recompute_open_clocks():
+	"""
+	Scheduled job: refresh clock metrics of all open applications and Request overdue flags
+
+	Loads every open clock and its exclusions in bulk, computes metrics in memory
+	against one calendar and writes back only the rows that changed, using
+	chunked bulk UPDATEs (no document saves, hooks or modified bumps).
+
+	Returns:
+		dict: Number of rows updated per doctype
+	"""
+	calendar = get_holiday_calendar()
+	as_of = now_datetime()
+
+	result = {
+		"Assessment Project": recompute_assessment_projects(calendar, as_of),
+		"Resource Consent Application": recompute_rc_applications(calendar, as_of),
+		"Request": refresh_overdue_flags(as_of)
+	}
+	frappe.db.commit()
+	return result
+
+
+def recompute_assessment_projects(calendar, as_of):
+	"""Refresh clock metrics of Assessment Projects that are not closed"""
+	projects = frappe.get_all(
+		"Assessment Project",
+		filters={
+			"overall_status": ["not in", CLOSED_PROJECT_STATUSES],
+			"started_date": ["is", "set"],
+			"statutory_clock_days": [">", 0]
+		},
+		fields=[
+			"name", "started_date", "statutory_clock_days", "total_days_excluded",
+			"working_days_elapsed", "working_days_remaining", "statutory_deadline"
+		]
+	)
+	if not projects:
+		return 0
+
+	exclusions = get_exclusion_periods([project.name for project in projects])
+
+	updates = {}
+	for project in projects:
+		values = get_clock_metrics(
+			project.started_date, project.statutory_clock_days,
+			exclusions.get(project.name, ()), as_of, calendar
+		)
+		if has_changed(project, values):
+			updates[project.name] = values
+
+	return bulk_update("Assessment Project", updates)
+
+
+def get_exclusion_periods(projects):
+	"""
+	Load the clock exclusion periods of Assessment Projects with one query per chunk
+
+	Returns:
+		dict: {project: [(started_date, ended_date)]}
+	"""
+	exclusions = {}
+	for start in range(0, len(projects), UPDATE_CHUNK_SIZE):
+		for row in frappe.get_all(
+			"Clock Exclusion Period",
+			filters={
+				"parenttype": "Assessment Project",
+				"parent": ["in", projects[start:start + UPDATE_CHUNK_SIZE]]
+			},
+			fields=["parent", "started_date", "ended_date"]
+		):
+			exclusions.setdefault(row.parent, []).append((row.started_date, row.ended_date))
+
+	return exclusions
+
+
+def recompute_rc_applications(calendar, as_of):
+	"""Refresh working days of Resource Consent Applications whose clock is running"""
+	applications = frappe.db.sql("""
+		SELECT rca.name, rca.statutory_clock_started, rca.working_days_elapsed,
+			rca.working_days_remaining, rt.name AS request_type, rt.processing_sla_days
+		FROM `tabResource Consent Application` rca
+		LEFT JOIN `tabRequest` r ON r.name = rca.request
+		LEFT JOIN `tabRequest Type` rt ON rt.name = r.request_type
+		WHERE rca.docstatus < 2
+			AND rca.statutory_clock_started IS NOT NULL
+			AND rca.statutory_clock_stopped IS NULL
+	""", as_dict=True)
+
+	updates = {}
+	for application in applications:
+		elapsed = calendar.working_days_between(application.statutory_clock_started, as_of)
+		values = {"working_days_elapsed": elapsed}
+		if application.request_type:
+			sla_days = application.processing_sla_days or DEFAULT_SLA_DAYS
+			values["working_days_remaining"] = max(0, sla_days - elapsed)
+		if has_changed(application, values):
+			updates[application.name] = values
+
+	return bulk_update("Resource Consent Application", updates)
+
+
+def refresh_overdue_flags(as_of):
+	"""
+	Materialise Request.is_overdue (target completion date in the past) for list views
+
+	Returns:
+		int: Number of Requests whose flag changed
+	"""
+	frappe.db.sql("""
+		UPDATE `tabRequest`
+		SET `is_overdue` = IF(`target_completion_date` < %(today)s, 1, 0)
+		WHERE `docstatus` < 2
+			AND `is_overdue` != IF(`target_completion_date` < %(today)s, 1, 0)
+	""", {"today": getdate(as_of)})
+
+	return frappe.db.sql("SELECT ROW_COUNT()")[0][0]
+
+
+def has_changed(row, values):
+	"""Whether any computed value differs from the stored row"""
+	for field, value in values.items():
+		stored = row.get(field)
+		if field == "statutory_deadline":
+			stored = getdate(stored) if stored else None
+		elif stored is not None:
+			stored = int(stored)
+		if stored != value:
+			return True
+	return False
+
+
+def bulk_update(doctype, updates):
+	"""
+	Write {name: {field: value}} with chunked CASE-based UPDATE statements
+
+	Returns:
+		int: Number of rows written
+	"""
+	if updates:
+		frappe.db.bulk_update(doctype, updates, chunk_size=UPDATE_CHUNK_SIZE, update_modified=False)
+	return len(updates)
@@ -0,0 +1,323 @@
+"""
+Task Plan Materialisation
+Builds an Assessment Project's full task plan in memory from Task Templates,
+role membership, role rates and the working-hours calendar (each loaded once),
+schedules it over its dependency graph, assigns it from the capacity index,
+then writes every Project Task with a
+single bulk insert
+"""
+
+import frappe
+from frappe.utils import now, today
+
+from councilsonline.utils.assignment import AssignmentEngine, get_plan_workload, get_role_users
+from councilsonline.utils.sequence import get_year, reserve_block
+from councilsonline.utils.task_schedule import WorkingHoursTimeline, schedule_tasks
+
+
+TASK_SERIES_DIGITS = 5
+
+TEMPLATE_FIELDS = [
+	"name", "stage_type", "task_sequence", "task_title", "task_description", "estimated_hours",
+	"required_role", "required_team", "task_type", "priority", "depends_on_task"
+]
+
+TASK_FIELDS = [
+	"title", "description", "assessment_project", "assessment_stage", "request",
+	"assigned_by", "assigned_to", "assigned_role", "estimated_hours", "priority",
+	"start_date", "due_date", "task_type", "status",
+	"hourly_rate", "total_cost", "earliest_start_hours", "earliest_finish_hours"
+]
+
+
+def get_stage_templates(stage_types):
+	"""Active Task Templates for several stage types in one query: {stage_type: [template]}"""
+	templates = {}
+	if not stage_types:
+		return templates
+
+	for template in frappe.get_all(
+		"Task Template",
+		filters={"stage_type": ["in", list(stage_types)], "is_active": 1},
+		fields=TEMPLATE_FIELDS,
+		order_by="task_sequence asc"
+	):
+		templates.setdefault(template.stage_type, []).append(template)
+	return templates
+
+
+def get_role_rates(roles, on_date=None):
+	"""Current hourly rate of each role from Role Rate, in one query: {role: hourly_rate}"""
+	if not roles:
+		return {}
+
+	rates = {}
+	for row in frappe.get_all(
+		"Role Rate",
+		filters={"role": ["in", list(roles)], "is_active": 1, "effective_from": ["<=", on_date or today()]},
+		fields=["role", "hourly_rate"],
+		order_by="effective_from desc"
+	):
+		rates.setdefault(row.role, row.hourly_rate or 0)
+	return rates
+
+
+def get_plan_predecessors(stage_tasks):
+	"""
+	Predecessors of each planned task, as indexes into the plan
+
+	A template's depends_on_task links to that template's task (in the same
+	stage when it appears more than once). Otherwise a task follows the last
+	Sequential task before it in its stage, so Sequential tasks form a chain
+	and Parallel tasks branch off it.
+
+	Args:
+		stage_tasks: [[(plan index, template)]] per stage
+
+	Returns:
+		dict: {plan index: [plan index]}
+	"""
+	first_by_template = {}
+	for entries in stage_tasks:
+		for index, template in entries:
+			first_by_template.setdefault(template.name, index)
+
+	predecessors = {}
+	for entries in stage_tasks:
+		in_stage = {template.name: index for index, template in entries}
+		last_sequential = None
+		for index, template in entries:
+			depends_on = template.depends_on_task
+			if depends_on and (depends_on in in_stage or depends_on in first_by_template):
+				predecessors[index] = [in_stage.get(depends_on, first_by_template.get(depends_on))]
+			elif last_sequential is not None:
+				predecessors[index] = [last_sequential]
+			if template.task_type == "Sequential":
+				last_sequential = index
+
+	return predecessors
+
+
+def pick_assignee(engine, required_role, team_members, on_date, hours, fallback):
+	"""
+	Pick a task's assignee from the capacity index
+
+	Priority:
+	1) Least-loaded available team member with required role
+	2) Least-loaded available user with required role
+	3) Fallback (project owner)
+	"""
+	if not required_role:
+		return fallback
+
+	if team_members:
+		user = engine.pick(required_role, members=set(team_members), on_date=on_date, hours=hours)
+		if user:
+			return user
+
+	return engine.pick(required_role, on_date=on_date, hours=hours) or fallback
+
+
+def render_description(template, context):
+	"""Render a template's description with Jinja; plain text is returned as is"""
+	description = template.task_description
+	if not description:
+		return ""
+	if "{{" not in description and "{%" not in description:
+		return description
+
+	try:
+		from frappe.utils.jinja import render_template
+		return render_template(description, context)
+	except Exception as e:
+		frappe.log_error(f"Error rendering task description: {str(e)}")
+		# Return plain description if rendering fails
+		return description
+
+
+def build_task_plan(project):
+	"""
+	Compute every Project Task for an Assessment Project without touching the database
+
+	Args:
+		project: Assessment Project document with its stages
+
+	Returns:
+		tuple: (tasks, stage_hours) where tasks is a list of dicts (with the
+		stage row, template sequence, required team and predecessor indexes
+		under "_stage", "_sequence", "_team" and "_predecessors"), and
+		stage_hours is
+		[(stage row, total estimated hours)]
+	"""
+	templates_by_stage = get_stage_templates({stage.stage_type for stage in project.stages if stage.stage_type})
+	templates = [template for stage_templates in templates_by_stage.values() for template in stage_templates]
+
+	roles = {template.required_role for template in templates if template.required_role}
+	team_members = {
+		team: project.get_team_members(team)
+		for team in {template.required_team for template in templates if template.required_team}
+	}
+	engine = AssignmentEngine(get_role_users(roles))
+	role_rates = get_role_rates(roles)
+
+	assigned_by = project.project_owner or frappe.session.user
+
+	request = frappe.get_doc("Request", project.request) if project.request else None
+
+	tasks = []
+	stage_tasks = []
+	stage_hours = []
+	for stage in project.stages:
+		stage_templates = templates_by_stage.get(stage.stage_type)
+		if not stage_templates:
+			frappe.msgprint(
+				f"No task templates found for stage type: {stage.stage_type}",
+				indicator="orange"
+			)
+			continue
+
+		context = {"request": request, "stage": stage, "project": project, "doc": request}
+		stage_tasks.append([(len(tasks) + offset, template) for offset, template in enumerate(stage_templates)])
+		for template in stage_templates:
+			tasks.append({
+				"title": template.task_title,
+				"description": render_description(template, context),
+				"assessment_project": project.name,
+				"assessment_stage": stage.stage_name,
+				"request": project.request,
+				"assigned_by": assigned_by,
+				"assigned_role": template.required_role,
+				"estimated_hours": template.estimated_hours,
+				"priority": template.priority,
+				"task_type": "Auto",  # Mark as auto-generated
+				"status": "Open",
+				"hourly_rate": role_rates.get(template.required_role, 0) if template.required_role else 0,
+				"total_cost": 0,
+				"_stage": stage,
+				"_sequence": template.task_sequence,
+				"_team": template.required_team
+			})
+
+		stage_hours.append((stage, sum(template.estimated_hours or 0 for template in stage_templates)))
+
+	# Schedule the whole plan in working hours from the project start
+	predecessors = get_plan_predecessors(stage_tasks)
+	schedule = schedule_tasks(
+		{index: task["estimated_hours"] for index, task in enumerate(tasks)}, predecessors
+	)
+	timeline = WorkingHoursTimeline(project.started_date or today())
+	for index, task in enumerate(tasks):
+		entry = schedule[index]
+		task.update({
+			"earliest_start_hours": entry["earliest_start"],
+			"earliest_finish_hours": entry["earliest_finish"],
+			"start_date": timeline.start_date(entry["earliest_start"]),
+			"due_date": timeline.finish_date(entry["earliest_finish"]),
+			"_predecessors": predecessors.get(index, [])
+		})
+
+	# Assign in start order, so each pick sees the load of the tasks before it
+	for task in sorted(tasks, key=lambda task: task["earliest_start_hours"]):
+		task["assigned_to"] = pick_assignee(
+			engine,
+			task["assigned_role"],
+			team_members.get(task["_team"], ()),
+			task["start_date"],
+			task["estimated_hours"],
+			assigned_by
+		)
+
+	return tasks, stage_hours
+
+
+def materialise_task_plan(project):
+	"""
+	Create an Assessment Project's Project Tasks with one bulk insert
+
+	Tasks are linked to their predecessors and dated by the dependency
+	scheduler. Project Task hooks that matter for new tasks are applied in
+	bulk: the hourly rate is set from Role Rate as in ProjectTask.validate,
+	and the Request's activity counters and each assignee's capacity are
+	updated once for all tasks. Each stage's primary task and estimated
+	hours are set on the project's stage rows.
+
+	Args:
+		project: Assessment Project document with its stages
+
+	Returns:
+		int: Number of tasks created
+	"""
+	from councilsonline.councilsonline.doctype.request_activity_counter.request_activity_counter import (
+		OPEN_TASK_STATUSES,
+		apply_delta
+	)
+
+	from councilsonline.councilsonline.doctype.assignee_capacity.assignee_capacity import apply_capacity_delta
+
+	tasks, stage_hours = build_task_plan(project)
+	if not tasks:
+		return 0
+
+	# One reservation from the Project Task naming series for the whole plan
+	prefix = f"TASK-{get_year()}-"
+	first, _ = reserve_block(prefix, len(tasks))
+	timestamp = now()
+	user = frappe.session.user
+
+	rows = []
+	for number, task in enumerate(tasks, start=first):
+		task["name"] = f"{prefix}{number:0{TASK_SERIES_DIGITS}d}"
+		rows.append((
+			task["name"], timestamp, timestamp, user, user, 0,
+			*(task[field] for field in TASK_FIELDS)
+		))
+
+	frappe.db.bulk_insert(
+		"Project Task",
+		fields=["name", "creation", "modified", "owner", "modified_by", "docstatus", *TASK_FIELDS],
+		values=rows
+	)
+
+	dependency_rows = [
+		(
+			frappe.generate_hash(length=10), timestamp, timestamp, user, user, 0,
+			task["name"], "Project Task", "predecessors", idx,
+			tasks[predecessor]["name"], tasks[predecessor]["title"]
+		)
+		for task in tasks
+		for idx, predecessor in enumerate(task["_predecessors"], start=1)
+	]
+	if dependency_rows:
+		frappe.db.bulk_insert(
+			"Project Task Dependency",
+			fields=[
+				"name", "creation", "modified", "owner", "modified_by", "docstatus",
+				"parent", "parenttype", "parentfield", "idx", "predecessor", "predecessor_title"
+			],
+			values=dependency_rows
+		)
+
+	# Link the first task as primary task for its stage
+	for task in tasks:
+		if task["_sequence"] == 1:
+			task["_stage"].primary_task = task["name"]
+	for stage, hours in stage_hours:
+		stage.estimated_hours = hours
+		# Stage rows not saved yet are written with the project
+		if stage.name and not stage.is_new():
+			frappe.db.set_value(
+				stage.doctype, stage.name,
+				{"primary_task": stage.primary_task, "estimated_hours": stage.estimated_hours},
+				update_modified=False
+			)
+
+	for user, workload in get_plan_workload(tasks).items():
+		apply_capacity_delta(user, workload, assigned=True)
+
+	if project.request:
+		apply_delta(project.request, {
+			"tasks_count": len(tasks),
+			"open_tasks_count": sum(1 for task in tasks if task["status"] in OPEN_TASK_STATUSES)
+		})
+
+	return len(tasks)
@@ -0,0 +1,396 @@
+"""
+Task Dependency Scheduler
+Schedules Project Tasks over their predecessor graph in working hours on the
+council calendar: a topological forward pass gives earliest start and finish,
+a backward pass gives slack and the critical path, and a slipped task only
+reschedules the tasks downstream of it
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+import frappe
+from frappe.utils import flt, getdate, today
+
+from councilsonline.utils.availability import get_business_hours
+from councilsonline.utils.holiday_calendar import get_holiday_calendar
+
+
+# Slack below this many hours counts as zero (float rounding)
+CRITICAL_SLACK_HOURS = 1e-6
+
+
+def get_daily_working_hours():
+	"""
+	Working hours per weekday from the Council's business hours
+
+	Returns:
+		dict: {weekday (Monday=0): hours}; Monday-Friday 9 AM - 5 PM when not configured
+	"""
+	council = frappe.get_cached_doc("Council")
+	weekdays = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+	daily_hours = {}
+	for day_name, hours in get_business_hours(council.get("business_hours")).items():
+		length = datetime.combine(date.min, hours["end_time"]) - datetime.combine(date.min, hours["start_time"])
+		if day_name in weekdays and length.total_seconds() > 0:
+			daily_hours[weekdays.index(day_name)] = length.total_seconds() / 3600
+	return daily_hours
+
+
+class WorkingHoursTimeline:
+	"""
+	Working hours counted from a project's start date
+
+	Converts between hour offsets and dates. Days are working days on the
+	calendar with business hours on their weekday; the cumulative hours per
+	day are built lazily, once per timeline, and looked up by bisection.
+	"""
+
+	def __init__(self, start_date, calendar=None, daily_hours=None):
+		self.calendar = calendar or get_holiday_calendar()
+		self.daily_hours = daily_hours or get_daily_working_hours()
+		self.days = []
+		self.cumulative = []
+		self._next_ordinal = getdate(start_date).toordinal()
+
+	def _extend_until(self, done):
+		while not self.days or not done():
+			ordinal = self._next_ordinal
+			self._next_ordinal += 1
+			day = date.fromordinal(ordinal)
+			hours = self.daily_hours.get(day.weekday())
+			if hours and self.calendar.is_working_day(day):
+				self.days.append(day)
+				self.cumulative.append((self.cumulative[-1] if self.cumulative else 0) + hours)
+
+	def start_date(self, offset):
+		"""Day on which work starting ``offset`` hours in takes place"""
+		self._extend_until(lambda: self.cumulative[-1] > offset)
+		return self.days[bisect_right(self.cumulative, offset)]
+
+	def finish_date(self, offset):
+		"""Day by the end of which ``offset`` hours of work are done"""
+		self._extend_until(lambda: self.cumulative[-1] >= offset)
+		return self.days[bisect_left(self.cumulative, offset)]
+
+	def hours_through(self, day):
+		"""Working hours from the start to the end of ``day`` (0 before the start)"""
+		day = getdate(day)
+		self._extend_until(lambda: self.days[-1] >= day)
+		index = bisect_right(self.days, day) - 1
+		return self.cumulative[index] if index >= 0 else 0
+
+
+def topological_order(tasks, predecessors):
+	"""
+	Order tasks so every task comes after its predecessors (Kahn's algorithm)
+
+	Args:
+		tasks: Task keys, in their preferred order for ties
+		predecessors: {task: [predecessor]}; predecessors outside ``tasks`` are ignored
+
+	Returns:
+		list: Task keys in topological order
+	"""
+	tasks = list(tasks)
+	known = set(tasks)
+	successors = {task: [] for task in tasks}
+	pending = {}
+	for task in tasks:
+		preds = {pred for pred in predecessors.get(task, ()) if pred in known}
+		pending[task] = len(preds)
+		for pred in preds:
+			successors[pred].append(task)
+
+	ready = [task for task in tasks if not pending[task]]
+	order = []
+	while ready:
+		task = ready.pop(0)
+		order.append(task)
+		for successor in successors[task]:
+			pending[successor] -= 1
+			if not pending[successor]:
+				ready.append(successor)
+
+	if len(order) != len(tasks):
+		blocked = [task for task in tasks if pending[task]]
+		frappe.throw(f"Task dependencies form a cycle: {', '.join(map(str, blocked))}")
+
+	return order
+
+
+def schedule_tasks(durations, predecessors, release=None):
+	"""
+	Critical-path schedule of a task graph in working hours
+
+	Args:
+		durations: {task: hours}
+		predecessors: {task: [predecessor]} (finish-to-start)
+		release: {task: earliest start hours} for tasks that cannot start earlier (optional)
+
+	Returns:
+		dict: {task: {"earliest_start", "earliest_finish", "latest_start",
+		"latest_finish", "slack", "critical"}}, in topological order
+	"""
+	release = release or {}
+	order = topological_order(durations, predecessors)
+
+	schedule = {}
+	for task in order:
+		start = max(
+			[schedule[pred]["earliest_finish"] for pred in predecessors.get(task, ()) if pred in schedule]
+			+ [release.get(task, 0)]
+		)
+		schedule[task] = {"earliest_start": start, "earliest_finish": start + flt(durations[task])}
+
+	finish = max((entry["earliest_finish"] for entry in schedule.values()), default=0)
+	successors = {task: [] for task in order}
+	for task in order:
+		for pred in predecessors.get(task, ()):
+			if pred in successors:
+				successors[pred].append(task)
+
+	for task in reversed(order):
+		entry = schedule[task]
+		entry["latest_finish"] = min(
+			(schedule[successor]["latest_start"] for successor in successors[task]), default=finish
+		)
+		entry["latest_start"] = entry["latest_finish"] - flt(durations[task])
+		entry["slack"] = entry["latest_start"] - entry["earliest_start"]
+		entry["critical"] = entry["slack"] <= CRITICAL_SLACK_HOURS
+
+	return schedule
+
+
+def get_critical_path(schedule, predecessors):
+	"""
+	The chain of critical tasks that finishes last
+
+	Returns:
+		list: Task keys from the first critical task to the last
+	"""
+	if not schedule:
+		return []
+
+	task = max(schedule, key=lambda key: schedule[key]["earliest_finish"])
+	path = [task]
+	while True:
+		start = schedule[task]["earliest_start"]
+		driving = [
+			pred for pred in predecessors.get(task, ())
+			if pred in schedule and schedule[pred]["critical"]
+			and abs(schedule[pred]["earliest_finish"] - start) <= CRITICAL_SLACK_HOURS
+		]
+		if not driving:
+			return path[::-1]
+		task = driving[0]
+		path.append(task)
+
+
+def get_project_timeline(assessment_project):
+	"""Working-hours timeline from an Assessment Project's start date"""
+	started = frappe.db.get_value("Assessment Project", assessment_project, "started_date")
+	return WorkingHoursTimeline(started or today())
+
+
+def get_predecessors(task_names):
+	"""Predecessors of Project Tasks in one query: {task: [predecessor]}"""
+	predecessors = {}
+	if not task_names:
+		return predecessors
+
+	for row in frappe.get_all(
+		"Project Task Dependency",
+		filters={"parent": ["in", list(task_names)], "parenttype": "Project Task"},
+		fields=["parent", "predecessor"],
+		order_by="idx asc"
+	):
+		predecessors.setdefault(row.parent, []).append(row.predecessor)
+	return predecessors
+
+
+def get_successors(task_names):
+	"""Direct successors of Project Tasks in one query"""
+	if not task_names:
+		return []
+	return frappe.get_all(
+		"Project Task Dependency",
+		filters={"predecessor": ["in", list(task_names)], "parenttype": "Project Task"},
+		pluck="parent",
+		distinct=True
+	)
+
+
+def get_downstream_tasks(task_name):
+	"""All tasks that depend on a task, directly or transitively (one query per level)"""
+	downstream = set()
+	frontier = {task_name}
+	while frontier:
+		frontier = set(get_successors(frontier)) - downstream - {task_name}
+		downstream |= frontier
+	return downstream
+
+
+def reschedule_successors(task_name):
+	"""
+	Propagate a task's earliest finish to the tasks downstream of it
+
+	Only the downstream subgraph is read; its tasks are visited in
+	topological order and only tasks whose dates move are written. Completed
+	tasks keep their dates.
+
+	Returns:
+		int: Number of tasks rescheduled
+	"""
+	downstream = get_downstream_tasks(task_name)
+	if not downstream:
+		return 0
+
+	predecessors = get_predecessors(downstream)
+	involved = downstream | {pred for preds in predecessors.values() for pred in preds}
+	tasks = {
+		task.name: task
+		for task in frappe.get_all(
+			"Project Task",
+			filters={"name": ["in", list(involved)]},
+			fields=[
+				"name", "status", "assessment_project", "estimated_hours",
+				"earliest_start_hours", "earliest_finish_hours"
+			]
+		)
+	}
+
+	timelines = {}
+	updates = {}
+	for name in topological_order(sorted(downstream), predecessors):
+		task = tasks.get(name)
+		if not task or task.status == "Completed" or not task.assessment_project:
+			continue
+
+		start = max(
+			(flt(tasks[pred].earliest_finish_hours) for pred in predecessors.get(name, ()) if pred in tasks),
+			default=0
+		)
+		finish = start + flt(task.estimated_hours)
+		if abs(start - flt(task.earliest_start_hours)) <= CRITICAL_SLACK_HOURS and \
+				abs(finish - flt(task.earliest_finish_hours)) <= CRITICAL_SLACK_HOURS:
+			continue
+
+		if task.assessment_project not in timelines:
+			timelines[task.assessment_project] = get_project_timeline(task.assessment_project)
+		timeline = timelines[task.assessment_project]
+
+		# Later tasks in the pass read the new values
+		task.earliest_start_hours, task.earliest_finish_hours = start, finish
+		updates[name] = {
+			"earliest_start_hours": start,
+			"earliest_finish_hours": finish,
+			"start_date": timeline.start_date(start),
+			"due_date": timeline.finish_date(finish)
+		}
+
+	if updates:
+		frappe.db.bulk_update("Project Task", updates, update_modified=False)
+	return len(updates)
+
+
+def get_project_schedule(assessment_project):
+	"""
+	Full critical-path schedule of an Assessment Project's tasks
+
+	Returns:
+		dict: {"tasks": [{name, title, status, earliest/latest start and finish
+		(hours and dates), slack_hours, critical}], "critical_path": [task name],
+		"finish_date": date}
+	"""
+	tasks = frappe.get_all(
+		"Project Task",
+		filters={"assessment_project": assessment_project},
+		fields=["name", "title", "status", "estimated_hours", "earliest_start_hours"],
+		order_by="earliest_start_hours asc, name asc"
+	)
+	if not tasks:
+		return {"tasks": [], "critical_path": [], "finish_date": None}
+
+	predecessors = get_predecessors([task.name for task in tasks])
+	schedule = schedule_tasks(
+		{task.name: task.estimated_hours for task in tasks},
+		predecessors,
+		# Tasks without predecessors keep their planned start
+		release={task.name: flt(task.earliest_start_hours) for task in tasks if not predecessors.get(task.name)}
+	)
+	timeline = get_project_timeline(assessment_project)
+
+	rows = []
+	for task in tasks:
+		entry = schedule[task.name]
+		rows.append({
+			"name": task.name,
+			"title": task.title,
+			"status": task.status,
+			"predecessors": predecessors.get(task.name, []),
+			"earliest_start_hours": entry["earliest_start"],
+			"earliest_finish_hours": entry["earliest_finish"],
+			"latest_start_hours": entry["latest_start"],
+			"latest_finish_hours": entry["latest_finish"],
+			"slack_hours": entry["slack"],
+			"critical": entry["critical"],
+			"earliest_start_date": timeline.start_date(entry["earliest_start"]),
+			"earliest_finish_date": timeline.finish_date(entry["earliest_finish"]),
+			"latest_finish_date": timeline.finish_date(entry["latest_finish"])
+		})
+
+	finish = max(entry["earliest_finish"] for entry in schedule.values())
+	return {
+		"tasks": rows,
+		"critical_path": get_critical_path(schedule, predecessors),
+		"finish_date": timeline.finish_date(finish)
+	}
+
+
+def reschedule_project(assessment_project):
+	"""
+	Recompute the earliest start and finish of all of a project's open tasks
+
+	Tasks without predecessors keep their planned start; completed tasks keep
+	their dates. Only tasks whose schedule moves are written, with one bulk
+	update.
+
+	Returns:
+		int: Number of tasks rescheduled
+	"""
+	tasks = frappe.get_all(
+		"Project Task",
+		filters={"assessment_project": assessment_project},
+		fields=["name", "status", "estimated_hours", "earliest_start_hours", "earliest_finish_hours"]
+	)
+	if not tasks:
+		return 0
+
+	predecessors = get_predecessors([task.name for task in tasks])
+	schedule = schedule_tasks(
+		{task.name: task.estimated_hours for task in tasks},
+		predecessors,
+		release={task.name: flt(task.earliest_start_hours) for task in tasks if not predecessors.get(task.name)}
+	)
+	timeline = get_project_timeline(assessment_project)
+
+	updates = {}
+	for task in tasks:
+		entry = schedule[task.name]
+		if task.status == "Completed" or (
+			abs(entry["earliest_start"] - flt(task.earliest_start_hours)) <= CRITICAL_SLACK_HOURS
+			and abs(entry["earliest_finish"] - flt(task.earliest_finish_hours)) <= CRITICAL_SLACK_HOURS
+		):
+			continue
+		updates[task.name] = {
+			"earliest_start_hours": entry["earliest_start"],
+			"earliest_finish_hours": entry["earliest_finish"],
+			"start_date": timeline.start_date(entry["earliest_start"]),
+			"due_date": timeline.finish_date(entry["earliest_finish"])
+		}
+
+	if updates:
+		frappe.db.bulk_update("Project Task", updates, update_modified=False)
+	return len(updates)